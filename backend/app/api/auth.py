@@ -5,7 +5,7 @@ from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.schemas.auth import BusinessRegistration, BusinessRegistrationResponse, LoginRequest, LoginResponse
-from app.services.auth_service import register_business, login_user, RegistrationError, AuthenticationError
+from app.services.auth_service import register_business, login_user, RegistrationError, AuthenticationError, LoginRateLimitError
 from app.core.logger import get_logger
 
 logger = get_logger("app.api.auth")
@@ -80,6 +80,14 @@ def login_endpoint(
         logger.info(f"Login successful for user: {login_data.email}")
         return result
 
+    except LoginRateLimitError as e:
+        logger.warning(f"Login rate limited for {login_data.email}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
     except AuthenticationError as e:
         logger.warning(f"Login failed for {login_data.email}: {e}")
         raise HTTPException(
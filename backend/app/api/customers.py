@@ -1,6 +1,7 @@
 """Customer API endpoints"""
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
@@ -40,23 +41,31 @@ router = APIRouter(prefix="/customers", tags=["Customers"])
 
 @router.get(
     "",
-    response_model=list[CustomerWithRelations],
+    responses={status.HTTP_200_OK: {"model": list[CustomerWithRelations]}},
     summary="Get all customers",
     description="Retrieve all customers for the authenticated user's business with nested customer_users and pets.",
 )
 def list_customers(
     business_id: BusinessId,
     db: Session = Depends(get_db),
-) -> list[CustomerWithRelations]:
+) -> StreamingResponse:
     """
     Get all customers for the current user's business.
 
     Requires authentication. Business ID is extracted from JWT token.
-    Returns customers with nested customer_users and pets.
+    Returns customers with nested customer_users and pets, streamed as a JSON
+    array so serialization starts before all rows are loaded.
     """
+    # Run the query and serialize the first customer before any bytes are
+    # sent, so a failure still returns a 500 instead of a truncated 200
     try:
         customers = get_customers(db, business_id)
-        return customers
+        first = next(customers, None)
+        first_json = (
+            CustomerWithRelations.model_validate(first).model_dump_json()
+            if first is not None
+            else None
+        )
     except Exception as e:
         logger.error(f"Error fetching customers: {e}")
         raise HTTPException(
@@ -64,6 +73,22 @@ def list_customers(
             detail="Failed to fetch customers",
         )
 
+    def stream_customers():
+        if first_json is None:
+            yield "[]"
+            return
+        yield "[" + first_json
+        try:
+            for customer in customers:
+                yield "," + CustomerWithRelations.model_validate(customer).model_dump_json()
+        except Exception as e:
+            # Headers are already sent; log and end the stream
+            logger.error(f"Error streaming customers: {e}")
+            raise
+        yield "]"
+
+    return StreamingResponse(stream_customers(), media_type="application/json")
+
 
 @router.get(
     "/{customer_id}",
@@ -1,6 +1,7 @@
 """Pet API endpoints"""
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
@@ -20,6 +21,7 @@ from app.services.pet_service import (
     get_pets_by_customer,
     get_pet_by_id,
     add_pet_to_customer,
+    add_pets_bulk,
     update_pet,
     delete_pet,
     search_pets,
@@ -32,45 +34,49 @@ logger = get_logger("app.api.pets")
 router = APIRouter(tags=["Pets"])
 
 
+def _pet_with_customer_json(pet) -> str:
+    """Serialize a pet with its customer's account name"""
+    return PetWithCustomerSchema(
+        id=pet.id,
+        customer_id=pet.customer_id,
+        business_id=pet.business_id,
+        name=pet.name,
+        species=pet.species,
+        breed=pet.breed,
+        birth_date=pet.birth_date,
+        age=pet.age,
+        weight=pet.weight,
+        special_notes=pet.special_notes,
+        notes=pet.notes or [],
+        created_at=pet.created_at,
+        updated_at=pet.updated_at,
+        account_name=pet.customer.account_name if pet.customer else "",
+    ).model_dump_json()
+
+
 @router.get(
     "/pets",
-    response_model=list[PetWithCustomerSchema],
+    responses={status.HTTP_200_OK: {"model": list[PetWithCustomerSchema]}},
     summary="Get all pets",
     description="Retrieve all pets for the authenticated business.",
 )
 def list_all_pets(
     business_id: BusinessId,
     db: Session = Depends(get_db),
-) -> list[PetWithCustomerSchema]:
+) -> StreamingResponse:
     """
     Get all pets for a business with customer information.
 
     Requires authentication. Business ID is extracted from JWT token.
+    Pets are streamed as a JSON array so serialization starts before all
+    rows are loaded.
     """
+    # Run the query and serialize the first pet before any bytes are sent,
+    # so a failure still returns a 500 instead of a truncated 200
     try:
         pets = get_all_pets(db, business_id)
-
-        # Transform to include customer account_name
-        result = []
-        for pet in pets:
-            pet_dict = {
-                "id": pet.id,
-                "customer_id": pet.customer_id,
-                "business_id": pet.business_id,
-                "name": pet.name,
-                "species": pet.species,
-                "breed": pet.breed,
-                "age": pet.age,
-                "weight": pet.weight,
-                "special_notes": pet.special_notes,
-                "notes": pet.notes or [],
-                "created_at": pet.created_at,
-                "updated_at": pet.updated_at,
-                "account_name": pet.customer.account_name if pet.customer else "",
-            }
-            result.append(PetWithCustomerSchema(**pet_dict))
-
-        return result
+        first = next(pets, None)
+        first_json = _pet_with_customer_json(first) if first is not None else None
     except Exception as e:
         logger.error(f"Error fetching all pets for business {business_id}: {e}")
         raise HTTPException(
@@ -78,6 +84,22 @@ def list_all_pets(
             detail="Failed to fetch pets",
         )
 
+    def stream_pets():
+        if first_json is None:
+            yield "[]"
+            return
+        yield "[" + first_json
+        try:
+            for pet in pets:
+                yield "," + _pet_with_customer_json(pet)
+        except Exception as e:
+            # Headers are already sent; log and end the stream
+            logger.error(f"Error streaming pets for business {business_id}: {e}")
+            raise
+        yield "]"
+
+    return StreamingResponse(stream_pets(), media_type="application/json")
+
 
 @router.get(
     "/pets/search",
@@ -190,6 +212,50 @@ def add_pet_to_customer_endpoint(
         )
 
 
+@router.post(
+    "/customers/{customer_id}/pets/bulk",
+    response_model=list[PetSchema],
+    status_code=status.HTTP_201_CREATED,
+    summary="Add several pets",
+    description="Add several pets to an existing customer in one request. Requires owner or staff role.",
+)
+def add_pets_bulk_endpoint(
+    customer_id: int,
+    pets_data: list[PetAdd],
+    current_user: OwnerOrStaffUser,
+    db: Session = Depends(get_db),
+) -> list[PetSchema]:
+    """
+    Add several pets to an existing customer with a single INSERT.
+
+    Requires owner or staff role (admin permissions).
+    Business ID is extracted from JWT token.
+    Pets are returned in request order.
+    """
+    try:
+        logger.info(f"Adding {len(pets_data)} pets to customer {customer_id}")
+        return add_pets_bulk(db, customer_id, pets_data, current_user.business_id)
+
+    except PetServiceError as e:
+        logger.warning(f"Adding pets failed: {e}")
+        if "not found" in str(e).lower():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=str(e),
+            )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+    except Exception as e:
+        logger.error(f"Unexpected error adding pets to customer {customer_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred while adding pets",
+        )
+
+
 @router.get(
     "/pets/{pet_id}",
     response_model=PetWithCustomerSchema,
@@ -223,6 +289,7 @@ def get_pet(
         "name": pet.name,
         "species": pet.species,
         "breed": pet.breed,
+        "birth_date": pet.birth_date,
         "age": pet.age,
         "weight": pet.weight,
         "special_notes": pet.special_notes,
@@ -5,8 +5,16 @@ from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.dependencies import BusinessId, OwnerOrStaffUser, CurrentUser
-from app.schemas.service_category import ServiceCategory, ServiceCategoryCreate
-from app.services.service_category_service import create_service_category, ServiceCategoryError
+from app.schemas.service_category import (
+    ServiceCategory,
+    ServiceCategoryBulkCreate,
+    ServiceCategoryCreate,
+)
+from app.services.service_category_service import (
+    create_service_categories,
+    create_service_category,
+    ServiceCategoryError,
+)
 from app.models.service_category import ServiceCategory as ServiceCategoryModel
 from app.core.logger import get_logger
 
@@ -74,3 +82,32 @@ def create_category(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected error occurred while creating service category",
         )
+
+
+@router.post(
+    "/bulk",
+    response_model=list[ServiceCategory],
+    status_code=status.HTTP_201_CREATED,
+    summary="Create several service categories",
+    description="Create several service categories for the authenticated business in one request, skipping names that already exist. Requires owner or staff role.",
+)
+def create_categories_bulk(
+    data: ServiceCategoryBulkCreate,
+    business_id: BusinessId,
+    current_user: OwnerOrStaffUser,
+    db: Session = Depends(get_db),
+) -> list[ServiceCategory]:
+    try:
+        return create_service_categories(db, business_id, data.names)
+    except ServiceCategoryError as e:
+        logger.warning(f"Bulk service category creation failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error creating service categories: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An unexpected error occurred while creating service categories",
+        )
@@ -3,7 +3,7 @@
 from collections.abc import Generator
 
 from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from sqlalchemy.orm import DeclarativeBase, Session, raiseload, sessionmaker
 
 from .config import settings
 
@@ -19,10 +19,23 @@ engine = create_engine(
     settings.database_url,
     echo=False,  # Disable verbose SQL logging
     pool_pre_ping=True,  # Verify connections before use
+    pool_size=settings.SQLALCHEMY_POOL_SIZE,
+    max_overflow=settings.SQLALCHEMY_MAX_OVERFLOW,
+    pool_recycle=settings.SQLALCHEMY_POOL_RECYCLE,  # Recycle before server/PgBouncer idle timeouts
+    pool_timeout=settings.SQLALCHEMY_POOL_TIMEOUT,  # Fail fast instead of queueing when exhausted
+    pool_use_lifo=True,  # Reuse warm connections first so idle ones can expire
+    connect_args={
+        # Bound worst-case query time
+        "options": f"-c statement_timeout={settings.SQLALCHEMY_STATEMENT_TIMEOUT_MS}"
+    },
 )
 
 # Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False keeps committed attribute values on the instances, so
+# returning an object after commit doesn't trigger a reload SELECT
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -35,3 +48,16 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+def lazy_load_guard(*options):
+    """
+    Return loader options with a raiseload("*") guard appended in DEBUG mode.
+
+    Any relationship not explicitly eager-loaded by the given options raises
+    on access instead of silently issuing a lazy SELECT, so hidden N+1 loads
+    surface during development. In production the options pass through as-is.
+    """
+    if settings.DEBUG:
+        return (*options, raiseload("*"))
+    return options
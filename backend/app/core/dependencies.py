@@ -64,7 +64,7 @@ def get_current_user(
             )
 
         # Fetch user from database to verify they still exist and are active
-        user = db.query(BusinessUser).filter(BusinessUser.id == int(user_id)).first()
+        user = db.get(BusinessUser, int(user_id))
 
         if user is None:
             raise HTTPException(
@@ -5,7 +5,11 @@ This module provides encryption/decryption functions for storing sensitive
 data like OAuth tokens and payment credentials.
 """
 
+import hashlib
 import json
+import threading
+from collections import OrderedDict
+
 from cryptography.fernet import Fernet
 
 from app.core.config import settings
@@ -13,6 +17,15 @@ from app.core.logger import get_logger
 
 logger = get_logger("app.core.encryption")
 
+# Per-process LRU of decrypted payloads, keyed by a 128-bit BLAKE2b digest of
+# the ciphertext. Rotating credentials re-encrypts them into new ciphertext and
+# therefore a new key, so stale entries are never served and no explicit
+# invalidation (or expiry) is needed.
+DECRYPT_CACHE_MAX_SIZE = 1024
+
+_decrypt_cache: OrderedDict[bytes, dict] = OrderedDict()
+_decrypt_cache_lock = threading.Lock()
+
 
 def get_encryption_key() -> bytes:
     """
@@ -79,6 +92,42 @@ def decrypt_data(encrypted_str: str) -> dict:
         raise
 
 
+def decrypt_data_cached(encrypted_str: str) -> dict:
+    """
+    Decrypt a Fernet-encrypted string, reusing recent results.
+
+    Previously decrypted ciphertexts are served from memory instead of
+    repeating the Fernet work. A shallow copy is returned so callers can
+    update their credentials dict freely.
+
+    Args:
+        encrypted_str: Encrypted string
+
+    Returns:
+        dict: Decrypted dictionary
+
+    Raises:
+        ValueError: If encryption key is not configured or decryption fails
+    """
+    cache_key = hashlib.blake2b(encrypted_str.encode(), digest_size=16).digest()
+
+    with _decrypt_cache_lock:
+        cached = _decrypt_cache.get(cache_key)
+        if cached is not None:
+            _decrypt_cache.move_to_end(cache_key)
+            return dict(cached)
+
+    data = decrypt_data(encrypted_str)
+
+    with _decrypt_cache_lock:
+        _decrypt_cache[cache_key] = data
+        _decrypt_cache.move_to_end(cache_key)
+        while len(_decrypt_cache) > DECRYPT_CACHE_MAX_SIZE:
+            _decrypt_cache.popitem(last=False)
+
+    return dict(data)
+
+
 def generate_encryption_key() -> str:
     """
     Generate a new Fernet encryption key.
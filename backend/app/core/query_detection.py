@@ -0,0 +1,152 @@
+"""
+N+1 query detection for development and test runs.
+
+Counts the SQL statements executed while handling a request and flags any
+statement that repeats NPLUSONE_THRESHOLD or more times - the signature of a
+lazy load inside a loop. Findings are logged as structured records naming the
+request path, the repeated statement and the service/API frame that issued it.
+
+Tracking is done by plain ASGI middleware and ends when the final response body
+chunk is sent, so statements issued while a streaming response is being
+produced (yield_per / selectinload batches) are counted too.
+"""
+
+import traceback
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger("app.core.query_detection")
+
+# Source directories whose frames are reported as the origin of a query
+_ORIGIN_MARKERS = ("app/services/", "app/api/")
+
+
+class NPlusOneError(Exception):
+    """Raised when a request repeats a query past the threshold and NPLUSONE_RAISE is set"""
+
+    pass
+
+
+@dataclass
+class RequestQueryStats:
+    """Per-request statement counters"""
+
+    counts: Counter = field(default_factory=Counter)
+    origins: dict[str, str] = field(default_factory=dict)
+
+
+_request_stats: ContextVar[RequestQueryStats | None] = ContextVar(
+    "request_query_stats", default=None
+)
+
+
+def _query_origin() -> str:
+    """Return 'path:line in func' of the innermost service/API frame on the stack"""
+    for frame in reversed(traceback.extract_stack()):
+        filename = frame.filename.replace("\\", "/")
+        if any(marker in filename for marker in _ORIGIN_MARKERS):
+            return f"{filename}:{frame.lineno} in {frame.name}"
+    return "unknown"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_stats.get()
+    if stats is None:
+        return
+    stats.counts[statement] += 1
+    if stats.counts[statement] == settings.NPLUSONE_THRESHOLD:
+        stats.origins[statement] = _query_origin()
+
+
+def install_query_detection() -> None:
+    """Attach the statement counter to all engines (idempotent)"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+
+
+def _report_repeated_queries(
+    stats: RequestQueryStats, method: str, path: str, raise_error: bool
+) -> None:
+    """
+    Log statements that crossed the threshold during a request.
+
+    Raises:
+        NPlusOneError: If a statement crossed the threshold and raise_error is set
+    """
+    offenders = [
+        (statement, count)
+        for statement, count in stats.counts.items()
+        if count >= settings.NPLUSONE_THRESHOLD
+    ]
+    for statement, count in offenders:
+        origin = stats.origins.get(statement, "unknown")
+        logger.warning(
+            f"Potential N+1 query: {method} {path} ran a statement {count}x from {origin}",
+            extra={
+                "event": "nplusone",
+                "method": method,
+                "path": path,
+                "count": count,
+                "origin": origin,
+                "statement": statement,
+            },
+        )
+
+    if offenders and raise_error:
+        statement, count = offenders[0]
+        raise NPlusOneError(
+            f"{method} {path} executed a statement {count} times "
+            f"(from {stats.origins.get(statement, 'unknown')}): {statement}"
+        )
+
+
+class NPlusOneDetectionMiddleware:
+    """Flag statements repeated within a single request, including its streamed body"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        path = scope["path"]
+        stats = RequestQueryStats()
+        token = _request_stats.set(stats)
+        finished = False
+
+        async def send_wrapper(message: Message) -> None:
+            # The last body chunk has been produced: every query for it has run
+            nonlocal finished
+            if (
+                not finished
+                and message["type"] == "http.response.body"
+                and not message.get("more_body", False)
+            ):
+                finished = True
+                _report_repeated_queries(stats, method, path, settings.NPLUSONE_RAISE)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            # Log findings, but never replace the exception already in flight
+            if not finished:
+                finished = True
+                _report_repeated_queries(stats, method, path, raise_error=False)
+            raise
+        finally:
+            _request_stats.reset(token)
+
+        if not finished:
+            _report_repeated_queries(stats, method, path, settings.NPLUSONE_RAISE)
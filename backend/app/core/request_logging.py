@@ -0,0 +1,173 @@
+"""
+Request/response debug logging (enabled when DEBUG=true).
+
+Implemented as plain ASGI middleware: the request body is captured from the
+receive channel as the application reads it and the response is observed on
+the send channel, so no Request/Response wrappers or extra tasks are created
+per request (as BaseHTTPMiddleware would).
+"""
+
+import logging
+import time
+import uuid
+
+from starlette.datastructures import URL, Headers, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.logger import get_logger
+
+try:
+    import orjson
+except ImportError:  # optional speedup; fall back to the stdlib
+    import json
+
+    orjson = None
+
+debug_logger = get_logger("app.debug")
+
+# Methods whose request body is logged
+_BODY_METHODS = {"POST", "PUT", "PATCH"}
+
+# Request headers left out of the log
+_SENSITIVE_HEADERS = frozenset({"authorization", "cookie", "x-api-key"})
+
+
+def loads_json(data: bytes | str):
+    """
+    Parse JSON from bytes or str, using orjson when installed.
+
+    Raises:
+        ValueError: If the data is not valid (UTF-8) JSON
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_json(obj) -> str:
+    """Serialize to a compact JSON string, using orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+class DebugLoggingMiddleware:
+    """Log each HTTP request and response, including bodies of failed responses"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Skip all formatting when the records would be discarded anyway
+        if scope["type"] != "http" or not debug_logger.isEnabledFor(logging.INFO):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = str(uuid.uuid4())
+        method = scope["method"]
+        headers = Headers(scope=scope)
+
+        # Log request start
+        debug_logger.info("=" * 80)
+        debug_logger.info("[%s] REQUEST START: %s %s", request_id, method, scope["path"])
+        debug_logger.info("[%s] Full URL: %s", request_id, URL(scope=scope))
+        client = scope.get("client")
+        debug_logger.info("[%s] Client: %s", request_id, client[0] if client else "Unknown")
+
+        # Log authorization header presence (but not the token value)
+        if headers.get("authorization"):
+            debug_logger.info("[%s] Authorization: Bearer <token present>", request_id)
+        else:
+            debug_logger.info("[%s] Authorization: <missing>", request_id)
+
+        # Log headers (excluding sensitive ones)
+        headers_to_log = {
+            k: v for k, v in headers.items() if k not in _SENSITIVE_HEADERS
+        }
+        if headers_to_log:
+            debug_logger.info("[%s] Headers: %s", request_id, dumps_json(headers_to_log))
+
+        # Log query parameters
+        if scope["query_string"]:
+            debug_logger.info(
+                "[%s] Query Params: %s", request_id, QueryParams(scope["query_string"])
+            )
+
+        debug_logger.info("[%s] %s", request_id, "-" * 60)
+
+        request_chunks: list[bytes] = []
+        log_request_body = method in _BODY_METHODS
+
+        async def receive_wrapper() -> Message:
+            # Capture the body as the application reads it
+            nonlocal log_request_body
+            message = await receive()
+            if log_request_body and message["type"] == "http.request":
+                request_chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    log_request_body = False
+                    _log_request_body(request_id, b"".join(request_chunks))
+            return message
+
+        status_code = 0
+        response_chunks: list[bytes] = []
+
+        async def send_wrapper(message: Message) -> None:
+            # Observe the status and headers, keeping error bodies for logging
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                debug_logger.info("[%s] RESPONSE", request_id)
+                debug_logger.info("[%s] Status Code: %s", request_id, status_code)
+                debug_logger.info(
+                    "[%s] Response Headers: %s", request_id, dict(Headers(raw=message["headers"]))
+                )
+            elif message["type"] == "http.response.body" and status_code >= 400:
+                response_chunks.append(message.get("body", b""))
+            await send(message)
+
+        # Process request and measure time
+        start_time = time.time()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        except Exception as e:
+            process_time = time.time() - start_time
+            debug_logger.error(
+                "[%s] REQUEST FAILED after %.4fs: %s", request_id, process_time, e
+            )
+            debug_logger.info("=" * 80)
+            raise
+
+        process_time = time.time() - start_time
+        debug_logger.info("[%s] Process Time: %.4fs", request_id, process_time)
+
+        # Log response body for error status codes
+        if status_code >= 400:
+            _log_response_body(request_id, b"".join(response_chunks))
+
+        debug_logger.info("[%s] REQUEST END", request_id)
+        debug_logger.info("=" * 80)
+
+
+def _log_request_body(request_id: str, body: bytes) -> None:
+    if not body:
+        debug_logger.info("[%s] Request Body: <empty>", request_id)
+        return
+    # Log JSON bodies compactly on one line
+    try:
+        body_json = loads_json(body)
+        debug_logger.info("[%s] Request Body (JSON): %s", request_id, dumps_json(body_json))
+    except ValueError:
+        # If not JSON or can't decode, log as string (limit to 1000 chars)
+        debug_logger.info("[%s] Request Body (raw): %s...", request_id, body[:1000])
+
+
+def _log_response_body(request_id: str, body: bytes) -> None:
+    if not body:
+        debug_logger.info("[%s] Response Body: <empty>", request_id)
+        return
+    try:
+        body_json = loads_json(body)
+        debug_logger.info("[%s] Response Body: %s", request_id, dumps_json(body_json))
+    except ValueError:
+        debug_logger.info("[%s] Response Body: %s", request_id, body.decode(errors="replace"))
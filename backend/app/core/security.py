@@ -1,11 +1,44 @@
 """Security utilities for password hashing and verification"""
 
+import hashlib
+import hmac
+import math
+import threading
+import time
+from collections import OrderedDict, deque
 from datetime import datetime, timedelta, timezone
 import bcrypt
 from jose import jwt
 
 from app.core.config import settings
 
+# Short-lived cache of bcrypt verification outcomes so rapid client retries
+# don't pay the full hashing cost each time. Only booleans are stored, keyed
+# by an HMAC of the submitted password under the stored hash.
+VERIFY_CACHE_TTL_SECONDS = 30
+VERIFY_CACHE_MAX_SIZE = 10000
+
+# Maximum number of uncached bcrypt verifications per key (email) per window
+VERIFY_RATE_LIMIT_ATTEMPTS = 20
+VERIFY_RATE_LIMIT_WINDOW_SECONDS = 60
+
+_verify_cache: OrderedDict[bytes, tuple[float, bool]] = OrderedDict()
+_verify_attempts: dict[str, deque[float]] = {}
+_verify_lock = threading.Lock()
+
+
+# Default access token lifetime
+_ACCESS_TOKEN_LIFETIME = timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
+
+
+class VerifyRateLimitError(Exception):
+    """Raised when too many uncached password verifications are attempted"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        # Seconds until the oldest attempt leaves the window
+        self.retry_after = retry_after
+
 
 def hash_password(password: str) -> str:
     """
@@ -45,6 +78,67 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(password_bytes, hashed_bytes)
 
 
+def verify_password_cached(
+    plain_password: str, hashed_password: str, rate_limit_key: str | None = None
+) -> bool:
+    """
+    Verify a password against its hash, reusing recent outcomes
+
+    Repeated verifications of the same password against the same hash within
+    VERIFY_CACHE_TTL_SECONDS are answered from memory. Cache misses are
+    rate-limited per rate_limit_key to block brute force attempts.
+
+    Args:
+        plain_password: Plain text password to verify
+        hashed_password: Hashed password to verify against
+        rate_limit_key: Optional key (e.g. email) to rate-limit cache misses by
+
+    Returns:
+        True if password matches, False otherwise
+
+    Raises:
+        VerifyRateLimitError: If rate_limit_key exceeded its verification budget
+    """
+    cache_key = hmac.new(
+        hashed_password.encode("utf-8"),
+        plain_password.encode("utf-8"),
+        hashlib.sha256,
+    ).digest()
+    now = time.monotonic()
+
+    with _verify_lock:
+        cached = _verify_cache.get(cache_key)
+        if cached is not None and cached[0] > now:
+            _verify_cache.move_to_end(cache_key)
+            return cached[1]
+
+        if rate_limit_key is not None:
+            attempts = _verify_attempts.setdefault(rate_limit_key, deque())
+            while attempts and attempts[0] <= now - VERIFY_RATE_LIMIT_WINDOW_SECONDS:
+                attempts.popleft()
+            if len(attempts) >= VERIFY_RATE_LIMIT_ATTEMPTS:
+                retry_after = attempts[0] + VERIFY_RATE_LIMIT_WINDOW_SECONDS - now
+                raise VerifyRateLimitError(
+                    "Too many login attempts", retry_after=max(1, math.ceil(retry_after))
+                )
+            attempts.append(now)
+
+    result = verify_password(plain_password, hashed_password)
+
+    with _verify_lock:
+        _verify_cache[cache_key] = (now + VERIFY_CACHE_TTL_SECONDS, result)
+        _verify_cache.move_to_end(cache_key)
+        while len(_verify_cache) > VERIFY_CACHE_MAX_SIZE:
+            _verify_cache.popitem(last=False)
+        if len(_verify_attempts) > VERIFY_CACHE_MAX_SIZE:
+            # Drop keys whose attempt windows have fully expired
+            cutoff = now - VERIFY_RATE_LIMIT_WINDOW_SECONDS
+            for key in [k for k, v in _verify_attempts.items() if not v or v[-1] <= cutoff]:
+                del _verify_attempts[key]
+
+    return result
+
+
 def hash_pin(pin: str) -> str:
     """
     Hash a PIN using bcrypt (same as password)
@@ -72,41 +166,47 @@ def verify_pin(plain_pin: str, hashed_pin: str) -> bool:
     return verify_password(plain_pin, hashed_pin)
 
 
-def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
+def create_user_access_token(
+    user_id: int,
+    email: str,
+    business_id: int,
+    role: str | None,
+    expires_delta: timedelta | None = None,
+) -> str:
     """
-    Create a JWT access token
+    Create a JWT access token for a business user
+
+    This is the single place token claims are built. The clock is read once
+    for both exp and iat.
 
     Args:
-        data: Data to encode in the token (should include 'sub' for user_id)
+        user_id: Business user ID (encoded as the 'sub' claim)
+        email: User email
+        business_id: Business the user belongs to
+        role: User role name
         expires_delta: Optional custom expiration time
 
     Returns:
         Encoded JWT token
     """
-    to_encode = data.copy()
-
-    if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
-    else:
-        expire = datetime.now(timezone.utc) + timedelta(
-            minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES
-        )
-
-    to_encode.update({
-        "exp": expire,
-        "iat": datetime.now(timezone.utc),
+    now = datetime.now(timezone.utc)
+    claims = {
+        "sub": str(user_id),  # python-jose requires a string subject
+        "email": email,
+        "business_id": business_id,
+        "role": role,
+        "exp": now + (expires_delta or _ACCESS_TOKEN_LIFETIME),
+        "iat": now,
         "iss": settings.JWT_ISSUER,
         "aud": settings.JWT_AUDIENCE,
-    })
+    }
 
-    encoded_jwt = jwt.encode(
-        to_encode,
+    return jwt.encode(
+        claims,
         settings.JWT_SECRET_KEY,
         algorithm=settings.JWT_ALGORITHM
     )
 
-    return encoded_jwt
-
 
 def decode_access_token(token: str) -> dict:
     """
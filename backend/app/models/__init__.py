@@ -21,6 +21,7 @@ from app.models.time_block import TimeBlock
 from app.models.payment_configuration import PaymentConfiguration, PaymentProvider
 from app.models.payment_device import PaymentDevice
 from app.models.order import Order
+from app.models.order_number_counter import OrderNumberCounter
 from app.models.payment import Payment
 
 __all__ = [
@@ -46,5 +47,6 @@ __all__ = [
     "PaymentProvider",
     "PaymentDevice",
     "Order",
+    "OrderNumberCounter",
     "Payment",
 ]
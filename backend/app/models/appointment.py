@@ -1,7 +1,7 @@
 """Appointment model"""
 
 from datetime import datetime, timezone
-from sqlalchemy import String, DateTime, Integer, Text, ForeignKey, Table, Column, Boolean
+from sqlalchemy import String, DateTime, Integer, Text, ForeignKey, Table, Column, Boolean, Index, Computed
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -25,6 +25,8 @@ class Appointment(Base):
     """Appointment for pet grooming service"""
 
     __tablename__ = "appointments"
+    # Load the generated appointment_end in the INSERT/UPDATE's RETURNING clause
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     business_id: Mapped[int] = mapped_column(
@@ -43,6 +45,15 @@ class Appointment(Base):
         DateTime(timezone=True), nullable=False, index=True
     )
     duration_minutes: Mapped[int] = mapped_column(Integer, nullable=False, default=60)
+    # Stored end time for overlap checks (computed in UTC so the expression is
+    # immutable, as generated columns require)
+    appointment_end: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        Computed(
+            "((appointment_datetime AT TIME ZONE 'UTC') + duration_minutes * interval '1 minute') AT TIME ZONE 'UTC'",
+            persisted=True,
+        ),
+    )
     status_id: Mapped[int] = mapped_column(
         ForeignKey("appointment_statuses.id", ondelete="RESTRICT"), nullable=False, index=True
     )
@@ -68,6 +79,24 @@ class Appointment(Base):
     services: Mapped[list["Service"]] = relationship(
         secondary="appointment_services", back_populates="appointments"
     )
+    order: Mapped["Order | None"] = relationship(back_populates="appointment")
+
+    __table_args__ = (
+        # Staff schedule overlap checks; INCLUDE makes them index-only scans
+        Index(
+            "ix_appointments_business_staff_datetime",
+            "business_id",
+            "staff_id",
+            "appointment_datetime",
+            postgresql_include=["duration_minutes"],
+        ),
+        Index(
+            "ix_appointments_business_staff_end",
+            "business_id",
+            "staff_id",
+            "appointment_end",
+        ),
+    )
 
     @property
     def status_name(self) -> str | None:
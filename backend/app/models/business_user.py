@@ -2,7 +2,7 @@
 
 from datetime import datetime, timezone
 from decimal import Decimal
-from sqlalchemy import String, DateTime, Boolean, ForeignKey, Enum as SQLEnum, Numeric
+from sqlalchemy import String, DateTime, Boolean, ForeignKey, Enum as SQLEnum, Numeric, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
 
@@ -107,6 +107,16 @@ class BusinessUser(Base):
         back_populates="business_user", cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        # Active staff lookups (e.g. time block validation) probe only live rows
+        Index(
+            "ix_business_users_active",
+            "id",
+            "business_id",
+            postgresql_where=text("is_active"),
+        ),
+    )
+
     @property
     def role_name(self) -> str | None:
         """Convenience to access the role name directly."""
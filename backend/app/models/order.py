@@ -94,6 +94,11 @@ class Order(Base):
         nullable=False,
         default=0
     )
+    tax_rate: Mapped[Decimal] = mapped_column(
+        Numeric(5, 4),
+        nullable=False,
+        default=0
+    )  # Rate applied to the discounted subtotal (e.g., 0.0825)
     tip: Mapped[Decimal] = mapped_column(
         Numeric(10, 2),
         nullable=False,
@@ -177,7 +182,10 @@ class Order(Base):
     business: Mapped["Business"] = relationship("Business")
     customer: Mapped["Customer | None"] = relationship("Customer")
     pet: Mapped["Pet | None"] = relationship("Pet")
-    appointment: Mapped["Appointment | None"] = relationship("Appointment")
+    appointment: Mapped["Appointment | None"] = relationship(
+        "Appointment",
+        back_populates="order"
+    )
     groomer: Mapped["BusinessUser | None"] = relationship(
         "BusinessUser",
         foreign_keys=[groomer_id]
@@ -194,5 +202,10 @@ class Order(Base):
         Index("idx_orders_business_created", "business_id", "created_at"),
     )
 
+    @property
+    def total_cents(self) -> int:
+        """Order total in integer cents (exact; Numeric(10, 2) has two places)"""
+        return int(self.total.scaleb(2))
+
     def __repr__(self) -> str:
         return f"<Order {self.order_number} - {self.payment_status}>"
@@ -0,0 +1,22 @@
+"""Order number counter model"""
+
+from datetime import date
+from sqlalchemy import Date, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class OrderNumberCounter(Base):
+    """Per-business daily sequence used to reserve collision-free order numbers"""
+
+    __tablename__ = "order_number_counters"
+
+    business_id: Mapped[int] = mapped_column(
+        ForeignKey("businesses.id", ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    last_value: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<OrderNumberCounter(business_id={self.business_id}, day={self.day}, last_value={self.last_value})>"
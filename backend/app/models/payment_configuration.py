@@ -8,7 +8,7 @@ payment provider credentials and settings (OAuth tokens, API keys, etc.).
 from datetime import datetime, timezone
 from enum import Enum
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text, Enum as SQLEnum
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, Text, func, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -37,6 +37,8 @@ class PaymentConfiguration(Base):
     """
 
     __tablename__ = "payment_configurations"
+    # Fetch server-generated updated_at via RETURNING instead of a reload
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     business_id: Mapped[int] = mapped_column(
@@ -59,11 +61,12 @@ class PaymentConfiguration(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, default=utc_now
     )
+    # Stamped by the database on every INSERT/UPDATE
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
-        default=utc_now,
-        onupdate=utc_now,
+        server_default=func.now(),
+        onupdate=func.now(),
     )
 
     # Relationships
@@ -72,5 +75,16 @@ class PaymentConfiguration(Base):
         "PaymentDevice", back_populates="configuration", cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        # Serves every lookup in payment_service: (business, provider) and
+        # (business, provider, active) as well as the business-only prefix
+        Index(
+            "ix_payment_configurations_business_provider_active",
+            "business_id",
+            "provider",
+            "is_active",
+        ),
+    )
+
     def __repr__(self) -> str:
         return f"<PaymentConfiguration(id={self.id}, business_id={self.business_id}, provider={self.provider.value})>"
@@ -7,7 +7,7 @@ terminals (Square Terminal, Clover devices, etc.) paired to a business.
 
 from datetime import datetime, timezone
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, func
 from sqlalchemy.dialects.postgresql import JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -27,6 +27,8 @@ class PaymentDevice(Base):
     """
 
     __tablename__ = "payment_devices"
+    # Fetch server-generated updated_at via RETURNING instead of a reload
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     business_id: Mapped[int] = mapped_column(
@@ -59,11 +61,12 @@ class PaymentDevice(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, default=utc_now
     )
+    # Stamped by the database on every INSERT/UPDATE
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
-        default=utc_now,
-        onupdate=utc_now,
+        server_default=func.now(),
+        onupdate=func.now(),
     )
 
     # Provider-specific device metadata (device model, serial number, etc.)
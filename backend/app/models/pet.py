@@ -1,7 +1,8 @@
 """Pet model"""
 
-from datetime import datetime, timezone
-from sqlalchemy import String, DateTime, Integer, Text, ForeignKey, Float, JSON
+from datetime import date, datetime, timezone
+from sqlalchemy import String, Date, DateTime, Integer, Text, ForeignKey, Float, JSON, case, cast, func
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -25,7 +26,9 @@ class Pet(Base):
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     species: Mapped[str] = mapped_column(String(50), nullable=False)
     breed: Mapped[str | None] = mapped_column(String(100))
-    age: Mapped[int | None] = mapped_column(Integer)
+    birth_date: Mapped[date | None] = mapped_column(Date)
+    # Manually entered age, used only when birth_date is unknown
+    _age: Mapped[int | None] = mapped_column("age", Integer)
     weight: Mapped[float | None] = mapped_column(Float)
     special_notes: Mapped[str | None] = mapped_column(Text)
     notes: Mapped[list[dict] | None] = mapped_column(
@@ -50,5 +53,31 @@ class Pet(Base):
         back_populates="pet", cascade="all, delete-orphan"
     )
 
+    @hybrid_property
+    def age(self) -> int | None:
+        """Age in whole years, derived from birth_date when known so it never goes stale"""
+        if self.birth_date is None:
+            return self._age
+        today = datetime.now(timezone.utc).date()
+        birth_date = self.birth_date
+        return today.year - birth_date.year - (
+            (today.month, today.day) < (birth_date.month, birth_date.day)
+        )
+
+    @age.inplace.setter
+    def _age_setter(self, value: int | None) -> None:
+        self._age = value
+
+    @age.inplace.expression
+    @classmethod
+    def _age_expression(cls):
+        return case(
+            (
+                cls.birth_date.is_not(None),
+                cast(func.extract("year", func.age(cls.birth_date)), Integer),
+            ),
+            else_=cls._age,
+        )
+
     def __repr__(self) -> str:
         return f"<Pet(id={self.id}, name='{self.name}', species='{self.species}')>"
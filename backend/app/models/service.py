@@ -1,6 +1,7 @@
 """Service model - Main service/offering model with multi-tenant support"""
 
 from datetime import datetime, timezone
+from decimal import Decimal
 from sqlalchemy import (
     String,
     Text,
@@ -93,7 +94,7 @@ class Service(Base):
 
     # Duration and Pricing
     duration_minutes: Mapped[int] = mapped_column(Integer, nullable=False)
-    price: Mapped[float] = mapped_column(Numeric(10, 2), nullable=False)
+    price: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
     tax_rate: Mapped[float | None] = mapped_column(
         Numeric(5, 2)
     )  # Stored as percentage (e.g., 8.5 for 8.5%)
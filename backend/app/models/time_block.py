@@ -1,7 +1,7 @@
 """Time block model for groomer schedule blocking"""
 
 from datetime import datetime, timezone
-from sqlalchemy import String, DateTime, Integer, Text, ForeignKey
+from sqlalchemy import String, DateTime, Integer, Text, ForeignKey, Index, Computed
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -11,6 +11,8 @@ class TimeBlock(Base):
     """Time block for non-appointment schedule blocking (lunch, meetings, etc.)"""
 
     __tablename__ = "time_blocks"
+    # Load the generated block_end in the INSERT/UPDATE's RETURNING clause
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     business_id: Mapped[int] = mapped_column(
@@ -23,6 +25,15 @@ class TimeBlock(Base):
         DateTime(timezone=True), nullable=False, index=True
     )
     duration_minutes: Mapped[int] = mapped_column(Integer, nullable=False, default=60)
+    # Stored end time for overlap checks (computed in UTC so the expression is
+    # immutable, as generated columns require)
+    block_end: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        Computed(
+            "((block_datetime AT TIME ZONE 'UTC') + duration_minutes * interval '1 minute') AT TIME ZONE 'UTC'",
+            persisted=True,
+        ),
+    )
     reason: Mapped[str] = mapped_column(String(50), nullable=False)
     description: Mapped[str | None] = mapped_column(Text)
     created_at: Mapped[datetime] = mapped_column(
@@ -38,5 +49,22 @@ class TimeBlock(Base):
     business: Mapped["Business"] = relationship()
     staff_member: Mapped["BusinessUser"] = relationship()
 
+    __table_args__ = (
+        # Staff schedule overlap checks; INCLUDE makes them index-only scans
+        Index(
+            "ix_time_blocks_business_staff_datetime",
+            "business_id",
+            "staff_id",
+            "block_datetime",
+            postgresql_include=["duration_minutes"],
+        ),
+        Index(
+            "ix_time_blocks_business_staff_end",
+            "business_id",
+            "staff_id",
+            "block_end",
+        ),
+    )
+
     def __repr__(self) -> str:
         return f"<TimeBlock(id={self.id}, staff_id={self.staff_id}, datetime='{self.block_datetime}', reason='{self.reason}')>"
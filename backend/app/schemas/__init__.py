@@ -9,6 +9,7 @@ from app.schemas.business_user import (
 from app.schemas.animal_breed import AnimalBreed as AnimalBreedSchema
 from app.schemas.service_category import (
     ServiceCategory,
+    ServiceCategoryBulkCreate,
     ServiceCategoryCreate,
 )
 from app.schemas.customer import Customer, CustomerCreate, CustomerUpdate
@@ -30,6 +31,7 @@ __all__ = [
     "BusinessUserUpdate",
     "AnimalBreedSchema",
     "ServiceCategory",
+    "ServiceCategoryBulkCreate",
     "ServiceCategoryCreate",
     "Customer",
     "CustomerCreate",
@@ -12,6 +12,7 @@ class PetBase(BaseModel):
     name: str = Field(..., max_length=100)
     species: str = Field(..., max_length=50)
     breed: str | None = Field(None, max_length=100)
+    birth_date: date | None = None
     age: int | None = None
     weight: float | None = None
     special_notes: str | None = None
@@ -42,6 +43,7 @@ class PetUpdate(BaseModel):
     name: str | None = Field(None, max_length=100)
     species: str | None = Field(None, max_length=50)
     breed: str | None = Field(None, max_length=100)
+    birth_date: date | None = None
     age: int | None = None
     weight: float | None = None
     special_notes: str | None = None
@@ -1,6 +1,8 @@
 """Service category schemas"""
 
 from datetime import datetime
+from typing import Annotated
+
 from pydantic import BaseModel, Field
 
 
@@ -16,6 +18,12 @@ class ServiceCategoryCreate(ServiceCategoryBase):
     pass
 
 
+class ServiceCategoryBulkCreate(BaseModel):
+    """Schema for creating several service categories at once"""
+
+    names: list[Annotated[str, Field(max_length=255)]] = Field(..., min_length=1)
+
+
 class ServiceCategory(ServiceCategoryBase):
     """Response schema for service category"""
 
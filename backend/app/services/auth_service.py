@@ -5,9 +5,14 @@ from sqlalchemy.exc import IntegrityError
 
 from app.models.business import Business
 from app.models.business_user import BusinessUser, BusinessUserRoleName
-from app.services.business_user_service import get_role_by_name
+from app.services.business_user_service import get_business_user_by_email, get_role_by_name
 from app.schemas.auth import BusinessRegistration, BusinessRegistrationResponse, LoginRequest, LoginResponse
-from app.core.security import hash_password, verify_password, create_access_token
+from app.core.security import (
+    hash_password,
+    verify_password_cached,
+    create_user_access_token,
+    VerifyRateLimitError,
+)
 from app.core.logger import get_logger
 
 logger = get_logger("app.services.auth")
@@ -25,6 +30,15 @@ class AuthenticationError(Exception):
     pass
 
 
+class LoginRateLimitError(AuthenticationError):
+    """Raised when an account has too many recent login attempts"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        # Seconds the client should wait before trying again
+        self.retry_after = retry_after
+
+
 def register_business(
     db: Session, registration_data: BusinessRegistration
 ) -> BusinessRegistrationResponse:
@@ -43,11 +57,7 @@ def register_business(
     """
     try:
         # Pre-flight check to avoid integrity errors on duplicate email
-        existing_user = (
-            db.query(BusinessUser)
-            .filter(BusinessUser.email == registration_data.email)
-            .first()
-        )
+        existing_user = get_business_user_by_email(db, registration_data.email)
         if existing_user:
             logger.warning(f"Registration blocked - email already registered: {registration_data.email}")
             raise RegistrationError("Email already registered")
@@ -70,7 +80,6 @@ def register_business(
         owner = BusinessUser(
             business_id=business.id,
             role_id=owner_role.id,
-            role=owner_role,
             email=registration_data.email,
             password_hash=password_hash,
             first_name=registration_data.first_name,
@@ -78,20 +87,24 @@ def register_business(
             is_active=True,
         )
         db.add(owner)
-        db.commit()
-        db.refresh(business)
-        db.refresh(owner)
-
-        logger.info(
-            f"Created owner user: {owner.email} for business {business.name} (User ID: {owner.id})"
-        )
+        db.flush()  # Flush to get the owner ID
 
-        return BusinessRegistrationResponse(
+        # Build the response before commit expires the instances, so no
+        # read-back SELECTs are needed; the fields come straight from rows we
+        # just wrote, so skip re-validation
+        response = BusinessRegistrationResponse.model_construct(
             business_id=business.id,
             user_id=owner.id,
             business_name=business.name,
             email=owner.email,
         )
+        db.commit()
+
+        logger.info(
+            f"Created owner user: {response.email} for business {response.business_name} (User ID: {response.user_id})"
+        )
+
+        return response
 
     except IntegrityError as e:
         db.rollback()
@@ -123,10 +136,11 @@ def login_user(db: Session, login_data: LoginRequest) -> LoginResponse:
 
     Raises:
         AuthenticationError: If credentials are invalid or user is inactive
+        LoginRateLimitError: If the account has too many recent login attempts
     """
     try:
         # Find user by email
-        user = db.query(BusinessUser).filter(BusinessUser.email == login_data.email).first()
+        user = get_business_user_by_email(db, login_data.email)
 
         if not user:
             logger.warning(f"Login attempt for non-existent email: {login_data.email}")
@@ -137,23 +151,31 @@ def login_user(db: Session, login_data: LoginRequest) -> LoginResponse:
             logger.warning(f"Login attempt for inactive user: {login_data.email}")
             raise AuthenticationError("Account is inactive")
 
-        # Verify password
-        if not user.password_hash or not verify_password(login_data.password, user.password_hash):
+        # Verify password (repeat attempts within a short window hit the cache)
+        try:
+            password_ok = bool(user.password_hash) and verify_password_cached(
+                login_data.password, user.password_hash, rate_limit_key=user.email
+            )
+        except VerifyRateLimitError as e:
+            logger.warning(f"Login rate limit exceeded for user: {login_data.email}")
+            raise LoginRateLimitError(
+                "Too many login attempts. Please try again later",
+                retry_after=e.retry_after,
+            )
+
+        if not password_ok:
             logger.warning(f"Invalid password attempt for user: {login_data.email}")
             raise AuthenticationError("Invalid email or password")
 
         # Create access token with user information
-        token_data = {
-            "sub": str(user.id),
-            "email": user.email,
-            "business_id": user.business_id,
-            "role": user.role_name,
-        }
-        access_token = create_access_token(data=token_data)
+        access_token = create_user_access_token(
+            user.id, user.email, user.business_id, user.role_name
+        )
 
         logger.info(f"User logged in successfully: {user.email} (ID: {user.id})")
 
-        return LoginResponse(
+        # Server-produced values; skip re-validation on the login hot path
+        return LoginResponse.model_construct(
             access_token=access_token,
             token_type="bearer",
             user_id=user.id,
@@ -1,7 +1,7 @@
 """Business user service for CRUD operations"""
 
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import lambda_stmt, select
 
 from app.models.business_user import (
     BusinessUser,
@@ -11,6 +11,7 @@ from app.models.business_user import (
 )
 from app.schemas.business_user import BusinessUserCreate, BusinessUserUpdate
 from app.core.security import hash_password, hash_pin
+from app.services.service_service import invalidate_services_cache
 from app.core.logger import get_logger
 
 logger = get_logger("app.services.business_user_service")
@@ -59,12 +60,14 @@ def get_business_users(db: Session, business_id: int) -> list[BusinessUser]:
     Returns:
         List of business users
     """
-    return (
-        db.query(BusinessUser)
-        .filter(BusinessUser.business_id == business_id)
+    # lambda_stmt caches the constructed statement and its compiled form;
+    # business_id is extracted as a bound parameter on each call
+    stmt = lambda_stmt(
+        lambda: select(BusinessUser)
+        .where(BusinessUser.business_id == business_id)
         .order_by(BusinessUser.created_at.desc())
-        .all()
     )
+    return list(db.scalars(stmt).all())
 
 
 def get_business_user_by_id(
@@ -81,16 +84,9 @@ def get_business_user_by_id(
     Returns:
         BusinessUser if found, None otherwise
     """
-    return (
-        db.query(BusinessUser)
-        .filter(
-            and_(
-                BusinessUser.id == user_id,
-                BusinessUser.business_id == business_id,
-            )
-        )
-        .first()
-    )
+    # Session.get checks the identity map before emitting a SELECT
+    user = db.get(BusinessUser, user_id)
+    return user if user and user.business_id == business_id else None
 
 
 def get_business_user_by_email(db: Session, email: str) -> BusinessUser | None:
@@ -104,7 +100,8 @@ def get_business_user_by_email(db: Session, email: str) -> BusinessUser | None:
     Returns:
         BusinessUser if found, None otherwise
     """
-    return db.query(BusinessUser).filter(BusinessUser.email == email).first()
+    stmt = lambda_stmt(lambda: select(BusinessUser).where(BusinessUser.email == email))
+    return db.scalars(stmt).first()
 
 
 def create_business_user(
@@ -149,7 +146,6 @@ def create_business_user(
     db_user = BusinessUser(
         business_id=business_id,
         role_id=role.id,
-        role=role,
         email=user_data.email,
         password_hash=password_hash,
         pin_hash=pin_hash,
@@ -265,6 +261,8 @@ def update_business_user(
     try:
         db.commit()
         db.refresh(db_user)
+        # Cached service listings embed staff members
+        invalidate_services_cache(business_id)
         logger.info(f"Updated business user {user_id}")
         return db_user
     except Exception as e:
@@ -305,6 +303,7 @@ def delete_business_user(db: Session, user_id: int, business_id: int) -> Busines
     try:
         db.commit()
         db.refresh(db_user)
+        invalidate_services_cache(business_id)
         logger.info(f"Deactivated business user {user_id}")
         return db_user
     except Exception as e:
@@ -1,7 +1,9 @@
 """Customer service for CRUD operations"""
 
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import JSON, Date, Float, String, insert, literal, select
+from sqlalchemy.dialects.postgresql import JSONB
+from collections.abc import Iterator
 from datetime import datetime, timezone
 
 from app.models.customer import Customer
@@ -19,6 +21,9 @@ from app.core.logger import get_logger
 
 logger = get_logger("app.services.customer_service")
 
+# Number of customers fetched per batch when streaming customer lists
+CUSTOMER_STREAM_BATCH_SIZE = 200
+
 
 class CustomerServiceError(Exception):
     """Base exception for customer service errors"""
@@ -26,26 +31,30 @@ class CustomerServiceError(Exception):
     pass
 
 
-def get_customers(db: Session, business_id: int) -> list[Customer]:
+def get_customers(db: Session, business_id: int) -> Iterator[Customer]:
     """
-    Get all customers for a specific business with nested relations.
+    Stream all customers for a specific business with nested relations.
+
+    Rows are fetched in batches of CUSTOMER_STREAM_BATCH_SIZE (with their
+    selectin-loaded relations) so the full list is never held in memory.
 
     Args:
         db: Database session
         business_id: Business ID to filter by
 
-    Returns:
-        List of customers with customer_users and pets
+    Yields:
+        Customers with customer_users and pets
     """
-    return (
-        db.query(Customer)
-        .filter(Customer.business_id == business_id)
+    stmt = (
+        select(Customer)
+        .where(Customer.business_id == business_id)
         .options(
-            joinedload(Customer.customer_users), joinedload(Customer.pets)
+            selectinload(Customer.customer_users), selectinload(Customer.pets)
         )
         .order_by(Customer.created_at.desc())
-        .all()
+        .execution_options(yield_per=CUSTOMER_STREAM_BATCH_SIZE)
     )
+    yield from db.scalars(stmt)
 
 
 def get_customer_by_id(
@@ -62,19 +71,13 @@ def get_customer_by_id(
     Returns:
         Customer with nested relations if found, None otherwise
     """
-    return (
-        db.query(Customer)
-        .filter(
-            and_(
-                Customer.id == customer_id,
-                Customer.business_id == business_id,
-            )
-        )
-        .options(
-            joinedload(Customer.customer_users), joinedload(Customer.pets)
-        )
-        .first()
+    # Session.get checks the identity map before emitting a SELECT
+    customer = db.get(
+        Customer,
+        customer_id,
+        options=[selectinload(Customer.customer_users), selectinload(Customer.pets)],
     )
+    return customer if customer and customer.business_id == business_id else None
 
 
 def create_customer_with_relations(
@@ -100,95 +103,128 @@ def create_customer_with_relations(
             f"{customer_data.customer_user.last_name} - {customer_data.pet.name}"
         )
 
-        # Create customer
-        db_customer = Customer(
-            business_id=business_id,
-            account_name=account_name,
-            status="active",
-            address_line1=customer_data.address_line1,
-            address_line2=customer_data.address_line2,
-            city=customer_data.city,
-            state=customer_data.state,
-            country=customer_data.country,
-            postal_code=customer_data.postal_code,
-        )
-
-        db.add(db_customer)
-        db.flush()  # Flush to get customer ID
-
-        # Create customer_user (primary contact)
-        db_customer_user = CustomerUser(
-            customer_id=db_customer.id,
-            business_id=business_id,
-            email=customer_data.customer_user.email,
-            first_name=customer_data.customer_user.first_name,
-            last_name=customer_data.customer_user.last_name,
-            phone=customer_data.customer_user.phone,
-            is_primary_contact=True,  # First customer user is always primary
-        )
-
-        db.add(db_customer_user)
+        # Resolve animal type (species) and optional breed name in one round-trip
+        lookup = db.execute(
+            select(AnimalType.name, AnimalBreed.name)
+            .select_from(AnimalType)
+            .outerjoin(AnimalBreed, AnimalBreed.id == customer_data.pet.breed_id)
+            .where(AnimalType.id == customer_data.pet.animal_type_id)
+        ).one_or_none()
 
-        # Get animal type to determine species
-        animal_type = (
-            db.query(AnimalType)
-            .filter(AnimalType.id == customer_data.pet.animal_type_id)
-            .first()
-        )
-
-        if not animal_type:
+        if not lookup:
             raise CustomerServiceError(
                 f"Animal type {customer_data.pet.animal_type_id} not found"
             )
 
-        # Get breed name if breed_id provided
-        breed_name = None
-        if customer_data.pet.breed_id:
-            breed = (
-                db.query(AnimalBreed)
-                .filter(AnimalBreed.id == customer_data.pet.breed_id)
-                .first()
+        species, breed_name = lookup
+
+        # Insert customer, primary customer_user and pet in one statement:
+        # the customer insert is a data-modifying CTE whose RETURNING id feeds
+        # the two dependent inserts. Column defaults are set explicitly since
+        # nested inserts do not run the ORM's Python-side defaults.
+        now = datetime.now(timezone.utc)
+
+        new_customer = (
+            insert(Customer)
+            .values(
+                business_id=business_id,
+                account_name=account_name,
+                status="active",
+                address_line1=customer_data.address_line1,
+                address_line2=customer_data.address_line2,
+                city=customer_data.city,
+                state=customer_data.state,
+                country=customer_data.country,
+                postal_code=customer_data.postal_code,
+                notes=[],
+                created_at=now,
+                updated_at=now,
             )
-            if breed:
-                breed_name = breed.name
-
-        # Calculate age from birth_date if provided
-        age = None
-        if customer_data.pet.birth_date:
-            today = datetime.now(timezone.utc).date()
-            age = (
-                today.year
-                - customer_data.pet.birth_date.year
-                - (
-                    (today.month, today.day)
-                    < (customer_data.pet.birth_date.month, customer_data.pet.birth_date.day)
-                )
+            .returning(Customer.id)
+            .cte("new_customer")
+        )
+
+        # Create customer_user (primary contact)
+        new_customer_user = (
+            insert(CustomerUser)
+            .from_select(
+                [
+                    CustomerUser.customer_id,
+                    CustomerUser.business_id,
+                    CustomerUser.email,
+                    CustomerUser.first_name,
+                    CustomerUser.last_name,
+                    CustomerUser.phone,
+                    CustomerUser.is_primary_contact,
+                    CustomerUser.notes,
+                    CustomerUser.created_at,
+                    CustomerUser.updated_at,
+                ],
+                select(
+                    new_customer.c.id,
+                    literal(business_id),
+                    literal(customer_data.customer_user.email),
+                    literal(customer_data.customer_user.first_name),
+                    literal(customer_data.customer_user.last_name),
+                    literal(customer_data.customer_user.phone, String),
+                    literal(True),  # First customer user is always primary
+                    literal([], JSONB),
+                    literal(now),
+                    literal(now),
+                ),
+                include_defaults=False,
             )
+            .cte("new_customer_user")
+        )
 
         # Create pet
-        db_pet = Pet(
-            customer_id=db_customer.id,
-            business_id=business_id,
-            name=customer_data.pet.name,
-            species=animal_type.name,
-            breed=breed_name,
-            age=age,
-            weight=customer_data.pet.weight,
-            special_notes=(
-                f"Spayed/Neutered: {'Yes' if customer_data.pet.spayed_neutered else 'No'}"
-            ),
+        new_pet = (
+            insert(Pet)
+            .from_select(
+                [
+                    Pet.customer_id,
+                    Pet.business_id,
+                    Pet.name,
+                    Pet.species,
+                    Pet.breed,
+                    Pet.birth_date,
+                    Pet.weight,
+                    Pet.special_notes,
+                    Pet.notes,
+                    Pet.created_at,
+                    Pet.updated_at,
+                ],
+                select(
+                    new_customer.c.id,
+                    literal(business_id),
+                    literal(customer_data.pet.name),
+                    literal(species),
+                    literal(breed_name, String),
+                    literal(customer_data.pet.birth_date, Date),
+                    literal(customer_data.pet.weight, Float),
+                    literal(
+                        f"Spayed/Neutered: {'Yes' if customer_data.pet.spayed_neutered else 'No'}"
+                    ),
+                    literal([], JSON),
+                    literal(now),
+                    literal(now),
+                ),
+                include_defaults=False,
+            )
+            .add_cte(new_customer_user)
+            .returning(Pet.customer_id)
         )
 
-        db.add(db_pet)
+        customer_id = db.execute(new_pet).scalar_one()
 
         # Commit transaction
         db.commit()
 
-        # Refresh to get all relationships
-        db.refresh(db_customer)
+        # Load the created customer with its relations for the response
+        db_customer = get_customer_by_id(db, customer_id, business_id)
 
         logger.info(
-            f"Created customer {db_customer.id} for business {business_id}: {account_name}"
+            f"Created customer {customer_id} for business {business_id}: {account_name}"
         )
 
         return db_customer
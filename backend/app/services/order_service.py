@@ -2,40 +2,71 @@
 Order service for managing business orders
 """
 
-from datetime import datetime, timezone
+import time
+from datetime import date, datetime, timezone
 from decimal import Decimal
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import select
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from app.core.database import lazy_load_guard
 from app.models.order import Order
+from app.models.order_number_counter import OrderNumberCounter
 from app.models.appointment import Appointment
-from app.models.pet import Pet
-from app.models.business_user import BusinessUser
 from app.models.service import Service
 from app.core.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Shared Decimal constants (immutable, so parsed once per process)
+_CENT = Decimal("0.01")
+_ZERO = Decimal("0.00")
+
+# Unique index allowing one order per appointment
+_APPOINTMENT_ORDER_INDEX = "ix_orders_appointment_id"
+
 
 class OrderService:
     """Service for managing orders"""
 
     @staticmethod
-    def generate_order_number(business_id: int) -> str:
+    def generate_order_number(db: Session, business_id: int) -> str:
         """
-        Generate unique order number for a business.
+        Reserve the next order number for a business.
+
+        A per-business daily counter is incremented with a single atomic
+        upsert, so concurrent orders never collide and numbers sort in
+        creation order.
 
-        Format: ORD-{timestamp}-{business_id}
-        Example: ORD-20251205134500-42
+        Format: ORD-{yyyymmdd}-{business_id}-{sequence}
+        Example: ORD-20251205-42-00017
         """
-        timestamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
-        return f"ORD-{timestamp}-{business_id}"
+        # gmtime() + integer formatting avoids tz-aware datetime construction
+        # and strftime format parsing on every call
+        ts = time.gmtime()
+        day = date(ts.tm_year, ts.tm_mon, ts.tm_mday)
+
+        stmt = pg_insert(OrderNumberCounter).values(
+            business_id=business_id, day=day, last_value=1
+        )
+        seq = db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[OrderNumberCounter.business_id, OrderNumberCounter.day],
+                set_={"last_value": OrderNumberCounter.last_value + 1},
+            ).returning(OrderNumberCounter.last_value)
+        ).scalar_one()
+
+        return (
+            f"ORD-{ts.tm_year:04d}{ts.tm_mon:02d}{ts.tm_mday:02d}"
+            f"-{business_id}-{seq:05d}"
+        )
 
     @staticmethod
     def create_order_from_appointment(
         db: Session,
         appointment_id: int,
         business_id: int,
-        tax_rate: Decimal = Decimal("0.00")
+        tax_rate: Decimal = _ZERO
     ) -> Order:
         """
         Create an order from an appointment.
@@ -52,9 +83,14 @@ class OrderService:
         Raises:
             ValueError: If appointment not found or already has an order
         """
-        # Load appointment with relationships (eagerly load services)
+        # Load appointment with everything needed for the order in one query:
+        # services, pet and groomer for denormalization
         stmt = select(Appointment).options(
-            joinedload(Appointment.services)
+            *lazy_load_guard(
+                joinedload(Appointment.services),
+                joinedload(Appointment.pet),
+                joinedload(Appointment.staff_member),
+            )
         ).where(
             Appointment.id == appointment_id,
             Appointment.business_id == business_id
@@ -64,22 +100,8 @@ class OrderService:
         if not appointment:
             raise ValueError(f"Appointment {appointment_id} not found")
 
-        # Check if order already exists for this appointment
-        existing_order = db.execute(
-            select(Order).where(Order.appointment_id == appointment_id)
-        ).scalar_one_or_none()
-
-        if existing_order:
-            raise ValueError(f"Order already exists for appointment {appointment_id}")
-
-        # Load related data for denormalization
-        pet = db.execute(
-            select(Pet).where(Pet.id == appointment.pet_id)
-        ).scalar_one_or_none() if appointment.pet_id else None
-
-        groomer = db.execute(
-            select(BusinessUser).where(BusinessUser.id == appointment.staff_id)
-        ).scalar_one_or_none()
+        pet = appointment.pet
+        groomer = appointment.staff_member
 
         # Get service from appointment_services relationship
         service = appointment.services[0] if appointment.services else None
@@ -91,8 +113,9 @@ class OrderService:
             logger.warning(f"No service found for appointment {appointment_id}")
 
         # Calculate financial totals
-        subtotal = Decimal(str(service.price)) if service and service.price else Decimal("0.00")
-        tax = (subtotal * tax_rate).quantize(Decimal("0.01"))
+        # Numeric(10, 2) already loads as a quantized Decimal
+        subtotal = service.price if service and service.price else _ZERO
+        tax = (subtotal * tax_rate).quantize(_CENT)
         total = subtotal + tax
 
         # Create order
@@ -104,10 +127,11 @@ class OrderService:
             groomer_id=appointment.staff_id,  # staff_id maps to groomer_id in orders
             service_id=service.id if service else None,
             order_type="appointment",
-            order_number=OrderService.generate_order_number(business_id),
+            order_number=OrderService.generate_order_number(db, business_id),
             subtotal=subtotal,
             tax=tax,
-            tip=Decimal("0.00"),
+            tax_rate=tax_rate,
+            tip=_ZERO,
             total=total,
             service_title=service.name if service else "Unknown Service",
             groomer_name=f"{groomer.first_name} {groomer.last_name}" if groomer else "Unknown Groomer",
@@ -116,9 +140,18 @@ class OrderService:
             payment_status="unpaid"
         )
 
-        db.add(order)
-        db.commit()
-        db.refresh(order)
+        # One order per appointment is enforced by the unique index on
+        # orders.appointment_id, which is also safe under concurrent creates
+        try:
+            db.add(order)
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            if getattr(getattr(e.orig, "diag", None), "constraint_name", None) == (
+                _APPOINTMENT_ORDER_INDEX
+            ):
+                raise ValueError(f"Order already exists for appointment {appointment_id}")
+            raise
 
         logger.info(f"Created order {order.order_number} from appointment {appointment_id}")
         return order
@@ -140,16 +173,14 @@ class OrderService:
         Returns:
             Order: Updated order
         """
-        order = db.execute(
-            select(Order).where(Order.id == order_id)
-        ).scalar_one_or_none()
+        # Identity-map hit when the order is already loaded (e.g. via a payment)
+        order = db.get(Order, order_id, options=lazy_load_guard())
 
         if not order:
             raise ValueError(f"Order {order_id} not found")
 
         order.payment_status = payment_status
         db.commit()
-        db.refresh(order)
 
         logger.info(f"Updated order {order.order_number} payment status to {payment_status}")
         return order
@@ -171,9 +202,8 @@ class OrderService:
         Returns:
             Order: Updated order
         """
-        order = db.execute(
-            select(Order).where(Order.id == order_id)
-        ).scalar_one_or_none()
+        # Identity-map hit when the order is already loaded (e.g. via a payment)
+        order = db.get(Order, order_id, options=lazy_load_guard())
 
         if not order:
             raise ValueError(f"Order {order_id} not found")
@@ -183,7 +213,6 @@ class OrderService:
         subtotal_after_discount = order.subtotal - order.discount_amount
         order.total = subtotal_after_discount + order.tax + order.tip
         db.commit()
-        db.refresh(order)
 
         logger.info(f"Added tip ${tip_amount} to order {order.order_number}")
         return order
@@ -217,66 +246,61 @@ class OrderService:
         Returns:
             Order: Updated order with recalculated totals
         """
-        order = db.execute(
-            select(Order).where(
-                Order.id == order_id,
-                Order.business_id == business_id
-            )
-        ).scalar_one_or_none()
-
-        if not order:
-            raise ValueError(f"Order {order_id} not found")
-
-        # Update discount fields
-        order.discount_type = discount_type
-        order.discount_value = discount_value
-
-        # Calculate discount amount
+        # Discount amount, capped at the subtotal (evaluated server-side)
         if discount_type and discount_value:
             if discount_type == "percentage":
                 # Percentage discount: subtotal * (percentage / 100)
-                discount_amount = (order.subtotal * discount_value / 100).quantize(Decimal("0.01"))
+                discount_amount = func.round(Order.subtotal * discount_value / 100, 2)
             else:  # dollar
                 # Fixed dollar discount
-                discount_amount = Decimal(str(discount_value)).quantize(Decimal("0.01"))
+                discount_amount = Decimal(str(discount_value)).quantize(_CENT)
 
             # Ensure discount doesn't exceed subtotal
-            discount_amount = min(discount_amount, order.subtotal)
+            discount_amount = func.least(discount_amount, Order.subtotal)
         else:
             # No discount
-            discount_amount = Decimal("0.00")
-
-        order.discount_amount = discount_amount
-
-        # Recalculate totals
-        subtotal_after_discount = order.subtotal - discount_amount
-
-        # Calculate tax on discounted amount
-        # Extract tax rate from existing tax and subtotal
-        if order.subtotal > 0:
-            tax_rate = order.tax / order.subtotal
-        else:
-            tax_rate = Decimal("0.00")
-
-        order.tax = (subtotal_after_discount * tax_rate).quantize(Decimal("0.01"))
-
-        # Calculate final total
-        order.total = subtotal_after_discount + order.tax + order.tip
+            discount_amount = _ZERO
+
+        subtotal_after_discount = Order.subtotal - discount_amount
+
+        # Calculate tax on discounted amount using the order's stored rate
+        tax = func.round(subtotal_after_discount * Order.tax_rate, 2)
+
+        # Single UPDATE ... RETURNING; the SET expressions all read the
+        # pre-update row, so no SELECT/refresh round-trips are needed
+        order = db.scalars(
+            update(Order)
+            .where(Order.id == order_id, Order.business_id == business_id)
+            .values(
+                discount_type=discount_type,
+                discount_value=discount_value,
+                discount_amount=discount_amount,
+                tax=tax,
+                total=subtotal_after_discount + tax + Order.tip,
+            )
+            .returning(Order)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        ).one_or_none()
 
-        db.commit()
-        db.refresh(order)
+        if not order:
+            raise ValueError(f"Order {order_id} not found")
 
         logger.info(
             f"Updated discount for order {order.order_number}: "
-            f"{discount_type or 'none'} {discount_value or 0} = ${discount_amount} off, "
+            f"{discount_type or 'none'} {discount_value or 0} = ${order.discount_amount} off, "
             f"new total: ${order.total}"
         )
+
+        db.commit()
+
         return order
 
     @staticmethod
     def complete_order(
         db: Session,
-        order_id: int
+        order_id: int,
+        now: datetime | None = None,
+        commit: bool = True
     ) -> Order:
         """
         Mark order as completed.
@@ -284,21 +308,22 @@ class OrderService:
         Args:
             db: Database session
             order_id: Order ID
+            now: Completion timestamp (defaults to the current UTC time)
+            commit: Commit immediately; pass False when the caller commits
 
         Returns:
             Order: Completed order
         """
-        order = db.execute(
-            select(Order).where(Order.id == order_id)
-        ).scalar_one_or_none()
+        # Identity-map hit when the order is already loaded (e.g. via a payment)
+        order = db.get(Order, order_id, options=lazy_load_guard())
 
         if not order:
             raise ValueError(f"Order {order_id} not found")
 
         order.order_status = "completed"
-        order.completed_at = datetime.now(timezone.utc)
-        db.commit()
-        db.refresh(order)
+        order.completed_at = now or datetime.now(timezone.utc)
+        if commit:
+            db.commit()
 
         logger.info(f"Completed order {order.order_number}")
         return order
@@ -306,11 +331,10 @@ class OrderService:
     @staticmethod
     def get_order_by_id(db: Session, order_id: int, business_id: int) -> Order | None:
         """Get order by ID for a specific business"""
-        stmt = select(Order).where(
-            Order.id == order_id,
-            Order.business_id == business_id
-        )
-        return db.execute(stmt).scalar_one_or_none()
+        order = db.get(Order, order_id, options=lazy_load_guard())
+        if order is None or order.business_id != business_id:
+            return None
+        return order
 
     @staticmethod
     def get_order_by_appointment(
@@ -319,7 +343,7 @@ class OrderService:
         business_id: int
     ) -> Order | None:
         """Get order for a specific appointment"""
-        stmt = select(Order).where(
+        stmt = select(Order).options(*lazy_load_guard()).where(
             Order.appointment_id == appointment_id,
             Order.business_id == business_id
         )
@@ -2,42 +2,118 @@
 Payment processing service for handling terminal payments
 """
 
+import logging
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from decimal import Decimal
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import select
+from app.core.database import lazy_load_guard
 from app.models.payment import Payment
 from app.models.order import Order
 from app.models.payment_device import PaymentDevice
 from app.models.payment_configuration import PaymentConfiguration
-from app.services.providers.square_provider import SquarePaymentProvider
+from app.services.payment_provider_interface import PaymentProviderInterface
+from app.services.payment_service import get_provider_for_configuration
 from app.services.order_service import OrderService
-from app.core.encryption import decrypt_data
 from app.core.logger import get_logger
 
 logger = get_logger(__name__)
 
+_ZERO = Decimal("0.00")
+
+# How long an in-flight terminal checkout is served from the poll cache
+POLL_CACHE_TTL_SECONDS = 600
+
+
+@dataclass
+class _InFlightCheckout:
+    """Poll projection of a pending terminal payment"""
+
+    business_id: int
+    checkout_id: str
+    provider: PaymentProviderInterface
+    status: str
+    square_status: str
+    payment_status: str | None
+    expires_at: float
+    square_payment_id: str | None = None
+
+
+# Pending checkouts by payment ID. Polls that see no Square status change are
+# answered from here without touching Postgres; transitions fall through to
+# the database path, which records them and refreshes or drops the entry.
+_poll_cache: dict[int, _InFlightCheckout] = {}
+_poll_cache_lock = threading.Lock()
+
 
 class PaymentProcessingService:
     """Service for processing payments through Square Terminal"""
 
+    @staticmethod
+    def _cache_in_flight(
+        payment: Payment,
+        provider: PaymentProviderInterface,
+        square_status: str,
+        payment_status: str | None,
+        square_payment_id: str | None = None,
+    ) -> None:
+        """Remember a pending checkout so unchanged polls skip the database"""
+        entry = _InFlightCheckout(
+            business_id=payment.business_id,
+            checkout_id=payment.square_checkout_id,
+            provider=provider,
+            status=payment.status,
+            square_status=square_status,
+            payment_status=payment_status,
+            expires_at=time.monotonic() + POLL_CACHE_TTL_SECONDS,
+            square_payment_id=square_payment_id,
+        )
+        with _poll_cache_lock:
+            _poll_cache[payment.id] = entry
+
+    @staticmethod
+    def _get_in_flight(payment_id: int, business_id: int) -> _InFlightCheckout | None:
+        """Return the cached pending checkout for a payment, if still fresh"""
+        with _poll_cache_lock:
+            entry = _poll_cache.get(payment_id)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                del _poll_cache[payment_id]
+                return None
+        if entry.business_id != business_id:
+            return None
+        return entry
+
+    @staticmethod
+    def _drop_in_flight(payment_id: int) -> None:
+        with _poll_cache_lock:
+            _poll_cache.pop(payment_id, None)
+
     @staticmethod
     def initiate_terminal_payment(
         db: Session,
         order_id: int,
         business_id: int,
         payment_device_id: int,
-        processed_by_id: int | None = None
+        processed_by_id: int | None = None,
+        commit: bool = True
     ) -> Payment:
         """
         Initiate a payment on Square Terminal.
 
         Flow:
         1. Load order and device
-        2. Create payment record with status="pending"
-        3. Create Square terminal checkout
-        4. Update payment with checkout ID
-        5. Update order payment_status to "pending"
+        2. Create Square terminal checkout
+        3. Insert payment record (status="pending") with the checkout ID
+        4. Update order payment_status to "pending" (and commit, unless the
+           caller owns the transaction)
+
+        Nothing is written until Square responds, so the transaction is not
+        held open across the network call.
 
         Args:
             db: Database session
@@ -45,6 +121,7 @@ class PaymentProcessingService:
             business_id: Business ID
             payment_device_id: Payment device ID to use
             processed_by_id: Business user initiating the payment
+            commit: Commit immediately; pass False when the caller commits
 
         Returns:
             Payment: Created payment record
@@ -53,14 +130,9 @@ class PaymentProcessingService:
             ValueError: If order/device not found or payment config missing
         """
         # Load order
-        order = db.execute(
-            select(Order).where(
-                Order.id == order_id,
-                Order.business_id == business_id
-            )
-        ).scalar_one_or_none()
+        order = db.get(Order, order_id, options=lazy_load_guard())
 
-        if not order:
+        if not order or order.business_id != business_id:
             raise ValueError(f"Order {order_id} not found")
 
         if order.payment_status == "paid":
@@ -68,7 +140,9 @@ class PaymentProcessingService:
 
         # Load payment device
         device = db.execute(
-            select(PaymentDevice).where(
+            select(PaymentDevice).options(
+                *lazy_load_guard(joinedload(PaymentDevice.configuration))
+            ).where(
                 PaymentDevice.id == payment_device_id,
                 PaymentDevice.business_id == business_id,
                 PaymentDevice.is_active == True
@@ -84,59 +158,43 @@ class PaymentProcessingService:
         if not config or not config.is_active:
             raise ValueError(f"Payment device configuration is not active")
 
-        # Decrypt credentials
-        credentials = decrypt_data(config.encrypted_credentials)
-
-        # Create payment record
-        payment = Payment(
-            business_id=business_id,
-            order_id=order_id,
-            payment_device_id=payment_device_id,
-            processed_by_id=processed_by_id,
-            payment_type="charge",
-            payment_method="square_terminal",
-            amount=order.total,
-            status="pending"
-        )
 
-        db.add(payment)
-        db.flush()  # Get payment ID without committing
-
-        # Initialize Square provider
-        provider = SquarePaymentProvider(
-            credentials=credentials,
-            provider_settings=config.settings
-        )
+        # Reuse the provider (and its HTTP connection pool) for this configuration
+        provider = get_provider_for_configuration(config)
 
         try:
             # Create terminal checkout
-            amount_cents = int(order.total * 100)  # Convert to cents
-
-            # Log detailed payment information
-            logger.info("=" * 80)
-            logger.info("SQUARE TERMINAL PAYMENT INITIATION")
-            logger.info("=" * 80)
-            logger.info(f"Order Details:")
-            logger.info(f"  Order ID: {order.id}")
-            logger.info(f"  Order Number: {order.order_number}")
-            logger.info(f"  Service: {order.service_title}")
-            logger.info(f"  Groomer: {order.groomer_name}")
-            logger.info(f"  Pet: {order.pet_name}")
-            logger.info(f"Financial Breakdown:")
-            logger.info(f"  Subtotal: ${order.subtotal:.2f}")
-            if order.discount_amount and order.discount_amount > 0:
-                logger.info(f"  Discount: -${order.discount_amount:.2f} ({order.discount_type}: {order.discount_value})")
-                logger.info(f"  After Discount: ${order.subtotal - order.discount_amount:.2f}")
-            logger.info(f"  Tax:      ${order.tax:.2f}")
-            logger.info(f"  Tip:      ${order.tip:.2f}")
-            logger.info(f"  Total:    ${order.total:.2f}")
-            logger.info(f"Square Terminal Request:")
-            logger.info(f"  Device ID: {device.device_id}")
-            logger.info(f"  Device Name: {device.device_name}")
-            logger.info(f"  Amount (cents): {amount_cents}")
-            logger.info(f"  Amount (dollars): ${amount_cents / 100:.2f}")
-            logger.info(f"  Reference: {order.order_number}")
-            logger.info("=" * 80)
+            amount_cents = order.total_cents
+
+            # One structured record per initiation; the human-readable
+            # breakdown is only formatted when DEBUG logging is enabled
+            payload = {
+                "event": "square_terminal_init",
+                "order_id": order.id,
+                "order_number": order.order_number,
+                "subtotal": float(order.subtotal),
+                "discount_amount": float(order.discount_amount or 0),
+                "tax": float(order.tax),
+                "tip": float(order.tip),
+                "total": float(order.total),
+                "amount_cents": amount_cents,
+                "device_id": device.device_id,
+            }
+            logger.info(
+                f"Initiating Square Terminal checkout for order {order.order_number}: "
+                f"{amount_cents} cents on device {device.device_id}",
+                extra=payload,
+            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    f"Order {order.order_number} breakdown: "
+                    f"service={order.service_title!r} groomer={order.groomer_name!r} "
+                    f"pet={order.pet_name!r} subtotal=${order.subtotal:.2f} "
+                    f"discount=-${order.discount_amount or 0:.2f} "
+                    f"({order.discount_type}: {order.discount_value}) "
+                    f"tax=${order.tax:.2f} tip=${order.tip:.2f} total=${order.total:.2f} "
+                    f"device={device.device_name!r}"
+                )
 
             checkout_result = provider.create_terminal_checkout(
                 device_id=device.device_id,
@@ -145,29 +203,53 @@ class PaymentProcessingService:
                 note=f"Order {order.order_number} - {order.service_title}"
             )
 
-            # Update payment with Square checkout info
-            payment.square_checkout_id = checkout_result["checkout_id"]
-            payment.payment_metadata = {
-                "square_status": checkout_result["status"],
-                "created_at": checkout_result.get("created_at"),
-                "device_id": device.device_id
-            }
+            # Write the payment and order status under a SAVEPOINT so a failure
+            # here only unwinds this step, not other work pending on the session
+            with db.begin_nested():
+                # Create payment record with the Square checkout info
+                payment = Payment(
+                    business_id=business_id,
+                    order_id=order_id,
+                    payment_device_id=payment_device_id,
+                    processed_by_id=processed_by_id,
+                    payment_type="charge",
+                    payment_method="square_terminal",
+                    amount=order.total,
+                    status="pending",
+                    square_checkout_id=checkout_result["checkout_id"],
+                    payment_metadata={
+                        "square_status": checkout_result["status"],
+                        "created_at": checkout_result.get("created_at"),
+                        "device_id": device.device_id
+                    },
+                )
+                db.add(payment)
 
-            # Update order payment status
-            order.payment_status = "pending"
+                # Update order payment status
+                order.payment_status = "pending"
 
-            db.commit()
-            db.refresh(payment)
+            if commit:
+                db.commit()
+                # Only committed payments are cached; otherwise the first poll
+                # loads the payment from the database and caches it there
+                PaymentProcessingService._cache_in_flight(
+                    payment, provider, checkout_result["status"], order.payment_status
+                )
 
-            logger.info(f"Square Terminal checkout created successfully:")
-            logger.info(f"  Checkout ID: {payment.square_checkout_id}")
-            logger.info(f"  Status: {checkout_result['status']}")
-            logger.info("=" * 80)
+            logger.info(
+                f"Square Terminal checkout {payment.square_checkout_id} created "
+                f"({checkout_result['status']}) for order {payload['order_number']}",
+                extra={
+                    "event": "square_terminal_checkout_created",
+                    "payment_id": payment.id,
+                    "checkout_id": payment.square_checkout_id,
+                    "status": checkout_result["status"],
+                },
+            )
 
             return payment
 
         except Exception as e:
-            db.rollback()
             logger.error(f"Failed to initiate terminal payment: {e}")
             raise
 
@@ -188,9 +270,35 @@ class PaymentProcessingService:
         Returns:
             dict: Payment status information
         """
-        # Load payment
+        # Fast path: pending checkout whose Square status hasn't changed
+        checkout_status = None
+        payment_details = None
+        in_flight = PaymentProcessingService._get_in_flight(payment_id, business_id)
+        if in_flight is not None:
+            checkout_status, payment_details = in_flight.provider.get_checkout_with_payment(
+                in_flight.checkout_id, in_flight.square_payment_id
+            )
+            if checkout_status["status"] == in_flight.square_status:
+                return {
+                    "payment_id": payment_id,
+                    "status": in_flight.status,
+                    "square_status": in_flight.square_status,
+                    "payment_status": in_flight.payment_status,
+                    "tip_money": checkout_status.get("tip_money"),
+                    "total_money": checkout_status.get("total_money"),
+                    "receipt_url": checkout_status.get("receipt_url"),
+                }
+
+        # Load payment with its order, device and device configuration in one query
         payment = db.execute(
-            select(Payment).where(
+            select(Payment).options(
+                *lazy_load_guard(
+                    joinedload(Payment.order),
+                    joinedload(Payment.payment_device).joinedload(
+                        PaymentDevice.configuration
+                    ),
+                )
+            ).where(
                 Payment.id == payment_id,
                 Payment.business_id == business_id
             )
@@ -202,12 +310,7 @@ class PaymentProcessingService:
         if not payment.square_checkout_id:
             raise ValueError(f"Payment {payment_id} has no Square checkout ID")
 
-        # Load payment configuration
-        device = db.execute(
-            select(PaymentDevice).where(
-                PaymentDevice.id == payment.payment_device_id
-            )
-        ).scalar_one_or_none()
+        device = payment.payment_device
 
         if not device:
             raise ValueError(f"Payment device not found")
@@ -218,18 +321,16 @@ class PaymentProcessingService:
         if not config or not config.is_active:
             raise ValueError(f"Payment device configuration is not active")
 
-        # Decrypt credentials
-        credentials = decrypt_data(config.encrypted_credentials)
 
-        # Initialize Square provider
-        provider = SquarePaymentProvider(
-            credentials=credentials,
-            provider_settings=config.settings
-        )
+        # Reuse the provider (and its HTTP connection pool) for this configuration
+        provider = get_provider_for_configuration(config)
 
         try:
-            # Get checkout status from Square
-            checkout_status = provider.get_terminal_checkout(payment.square_checkout_id)
+            # Get checkout status from Square (unless the fast path already did)
+            if checkout_status is None:
+                checkout_status, payment_details = provider.get_checkout_with_payment(
+                    payment.square_checkout_id
+                )
 
             # Update payment metadata
             payment.payment_metadata = {
@@ -243,16 +344,8 @@ class PaymentProcessingService:
 
             # Handle completed payment
             if status == "COMPLETED":
-                # If checkout has a payment_id, fetch the actual payment details
-                # The payment object may have tip information that's not in the checkout
-                payment_details = None
-                if checkout_status.get("payment_id"):
-                    try:
-                        payment_details = provider.get_payment(checkout_status["payment_id"])
-                        logger.info(f"Retrieved payment details for payment_id: {checkout_status['payment_id']}")
-                    except Exception as e:
-                        logger.warning(f"Could not fetch payment details: {e}")
-
+                # payment_details comes from the Payments API and may carry tip
+                # information that's not in the checkout
                 PaymentProcessingService._complete_payment(
                     db, payment, checkout_status, payment_details
                 )
@@ -264,7 +357,17 @@ class PaymentProcessingService:
                 )
 
             db.commit()
-            db.refresh(payment)
+
+            if payment.status == "pending":
+                PaymentProcessingService._cache_in_flight(
+                    payment,
+                    provider,
+                    status,
+                    payment.order.payment_status if payment.order else None,
+                    checkout_status.get("payment_id"),
+                )
+            else:
+                PaymentProcessingService._drop_in_flight(payment.id)
 
             return {
                 "payment_id": payment.id,
@@ -287,68 +390,43 @@ class PaymentProcessingService:
         checkout_status: dict,
         payment_details: dict | None = None
     ):
-        """Complete a payment and update order"""
+        """Complete a payment and update order (committed by the caller)"""
+        now = datetime.now(timezone.utc)
         payment.status = "completed"
-        payment.completed_at = datetime.now(timezone.utc)
+        payment.completed_at = now
         payment.square_payment_id = checkout_status.get("payment_id")
         payment.square_receipt_url = checkout_status.get("receipt_url")
 
-        # Log the full checkout status for debugging
-        logger.info("=" * 80)
-        logger.info("SQUARE TERMINAL PAYMENT COMPLETION")
-        logger.info("=" * 80)
-        logger.info(f"Payment ID: {payment.id}")
-        logger.info(f"Checkout Status Data:")
-        logger.info(f"  amount_money: {checkout_status.get('amount_money')}")
-        logger.info(f"  tip_money: {checkout_status.get('tip_money')}")
-        logger.info(f"  total_money: {checkout_status.get('total_money')}")
-
-        if payment_details:
-            logger.info(f"Payment Details Data:")
-            logger.info(f"  amount_money: {payment_details.get('amount_money')}")
-            logger.info(f"  tip_money: {payment_details.get('tip_money')}")
-            logger.info(f"  total_money: {payment_details.get('total_money')}")
-
         # Extract tip - try payment_details first, then checkout_status
-        tip_money = None
-        if payment_details and payment_details.get("tip_money"):
-            tip_money = payment_details.get("tip_money")
-            logger.info("Using tip from payment_details")
-        elif checkout_status.get("tip_money"):
-            tip_money = checkout_status.get("tip_money")
-            logger.info("Using tip from checkout_status")
-
-        tip_dollars = Decimal("0.00")
-
-        logger.info(f"Tip Money Object: {tip_money}")
-        logger.info(f"Tip Money Type: {type(tip_money)}")
-        if tip_money:
-            logger.info(f"Tip Money hasattr 'amount': {hasattr(tip_money, 'amount')}")
-            if hasattr(tip_money, '__dict__'):
-                logger.info(f"Tip Money attributes: {tip_money.__dict__}")
-
-        if tip_money and hasattr(tip_money, 'amount'):
-            tip_cents = tip_money.amount
-            tip_dollars = Decimal(tip_cents) / 100
-            logger.info(f"Extracted tip: {tip_cents} cents = ${tip_dollars}")
+        tip_money = (payment_details or {}).get("tip_money") or checkout_status.get("tip_money")
+        if isinstance(tip_money, dict):
+            tip_cents = tip_money.get("amount")
+        else:
+            tip_cents = getattr(tip_money, "amount", None)
 
+        tip_dollars = Decimal(tip_cents) / 100 if tip_cents else _ZERO
+        if tip_cents:
             # Store tip on payment record only (not on order)
             payment.tip_amount = tip_dollars
-        else:
-            logger.warning("No tip found in checkout_status or payment_details")
 
-        logger.info(f"Final payment.tip_amount: {payment.tip_amount}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"Payment {payment.id} completion data: "
+                f"checkout amount/tip/total={checkout_status.get('amount_money')}/"
+                f"{checkout_status.get('tip_money')}/{checkout_status.get('total_money')} "
+                f"details tip={(payment_details or {}).get('tip_money')} "
+                f"-> tip {tip_cents} cents"
+            )
 
         # Update order payment status
         if payment.order:
             payment.order.payment_status = "paid"
-            OrderService.complete_order(db, payment.order_id)
+            OrderService.complete_order(db, payment.order_id, now=now, commit=False)
 
         logger.info(
             f"Completed payment {payment.id} for order {payment.order.order_number if payment.order else 'N/A'} "
             f"(tip amount: ${tip_dollars:.2f})"
         )
-        logger.info("=" * 80)
 
     @staticmethod
     def _fail_payment(
@@ -387,9 +465,16 @@ class PaymentProcessingService:
         Returns:
             Payment: Cancelled payment
         """
-        # Load payment
+        # Load payment with its order, device and device configuration in one query
         payment = db.execute(
-            select(Payment).where(
+            select(Payment).options(
+                *lazy_load_guard(
+                    joinedload(Payment.order),
+                    joinedload(Payment.payment_device).joinedload(
+                        PaymentDevice.configuration
+                    ),
+                )
+            ).where(
                 Payment.id == payment_id,
                 Payment.business_id == business_id
             )
@@ -404,12 +489,7 @@ class PaymentProcessingService:
         if not payment.square_checkout_id:
             raise ValueError(f"Payment has no Square checkout ID")
 
-        # Load payment configuration
-        device = db.execute(
-            select(PaymentDevice).where(
-                PaymentDevice.id == payment.payment_device_id
-            )
-        ).scalar_one_or_none()
+        device = payment.payment_device
 
         if not device:
             raise ValueError(f"Payment device not found")
@@ -420,14 +500,9 @@ class PaymentProcessingService:
         if not config or not config.is_active:
             raise ValueError(f"Payment device configuration is not active")
 
-        # Decrypt credentials
-        credentials = decrypt_data(config.encrypted_credentials)
 
-        # Initialize Square provider
-        provider = SquarePaymentProvider(
-            credentials=credentials,
-            provider_settings=config.settings
-        )
+        # Reuse the provider (and its HTTP connection pool) for this configuration
+        provider = get_provider_for_configuration(config)
 
         try:
             # Cancel checkout on Square
@@ -442,7 +517,8 @@ class PaymentProcessingService:
                 payment.order.payment_status = "unpaid"
 
             db.commit()
-            db.refresh(payment)
+
+            PaymentProcessingService._drop_in_flight(payment.id)
 
             logger.info(f"Cancelled payment {payment.id}")
             return payment
@@ -5,9 +5,82 @@ This module defines the abstract base class for payment provider implementations
 ensuring a consistent interface across different providers (Square, Clover, etc.).
 """
 
+import threading
+import time
 from abc import ABC, abstractmethod
-from datetime import datetime, timezone
-from typing import Any
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any, ClassVar, TypedDict
+
+import httpx
+
+# Treat tokens this close to expiry as expired so a request never races the
+# provider's clock
+TOKEN_EXPIRY_SKEW = timedelta(seconds=60)
+_EXPIRY_SKEW_SECONDS = TOKEN_EXPIRY_SKEW.total_seconds()
+
+# Bound once; is_token_expired runs before every provider API call
+_UTC = timezone.utc
+_now = datetime.now
+
+
+def token_expires_at(credentials: dict[str, Any]) -> datetime | None:
+    """
+    Read the access-token expiry from provider credentials.
+
+    Args:
+        credentials: Decrypted provider credentials
+
+    Returns:
+        datetime | None: Expiry time, or None if unknown
+    """
+    expires_at = credentials.get("expires_at")
+    if expires_at and isinstance(expires_at, str):
+        expires_at = datetime.fromisoformat(expires_at)
+    return expires_at or None
+
+
+class DeviceInfo(TypedDict):
+    """Provider device as returned by get_device_info / list_devices"""
+
+    device_id: str | None
+    name: str | None
+    status: Any
+    location_id: str | None
+
+
+class LocationInfo(TypedDict):
+    """Provider location as returned by get_locations"""
+
+    location_id: str | None
+    name: str | None
+    address: Any
+    status: str | None
+    merchant_id: str | None
+
+
+_refresh_locks: dict[str, threading.Lock] = {}
+_refresh_locks_guard = threading.Lock()
+
+
+def token_refresh_lock(merchant_id: str) -> threading.Lock:
+    """
+    Get the lock serializing token refreshes for a merchant.
+
+    Providers rotate refresh tokens, so two concurrent refreshes with the same
+    refresh token fail for whichever request loses the race.
+
+    Args:
+        merchant_id: Provider merchant ID
+
+    Returns:
+        threading.Lock: Lock shared by all refreshes of this merchant
+    """
+    with _refresh_locks_guard:
+        lock = _refresh_locks.get(merchant_id)
+        if lock is None:
+            lock = _refresh_locks[merchant_id] = threading.Lock()
+        return lock
 
 
 class PaymentProviderInterface(ABC):
@@ -18,6 +91,13 @@ class PaymentProviderInterface(ABC):
     to ensure consistent behavior across different providers.
     """
 
+    # Shared keep-alive HTTP client for provider SDKs and API calls, so TCP and
+    # TLS handshakes are amortized across provider instances and requests
+    _http: ClassVar[httpx.Client] = httpx.Client(
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        timeout=10.0,
+    )
+
     def __init__(self, credentials: dict[str, Any], settings: dict[str, Any] | None = None):
         """
         Initialize payment provider with credentials.
@@ -29,6 +109,25 @@ class PaymentProviderInterface(ABC):
         self.credentials = credentials
         self.settings = settings or {}
 
+        # Parsed expires_at, re-parsed only when the raw credential changes
+        self._expires_at_raw: Any = None
+        self._expires_at: datetime | None = None
+        # Epoch seconds until which the token counts as valid (expiry - skew)
+        self._valid_until = 0.0
+        # Refreshes and persists the stored credentials (set for providers
+        # backed by a payment configuration)
+        self._token_refresher: Callable[[], dict[str, Any]] | None = None
+
+    def set_token_refresher(self, refresher: Callable[[], dict[str, Any]]) -> None:
+        """
+        Route expired-token refreshes through the credential store.
+
+        Args:
+            refresher: Returns the current stored credentials, refreshing and
+                persisting them first if the stored token is expiring
+        """
+        self._token_refresher = refresher
+
     @abstractmethod
     def get_oauth_authorization_url(self, state: str, redirect_uri: str) -> str:
         """
@@ -118,7 +217,7 @@ class PaymentProviderInterface(ABC):
         pass
 
     @abstractmethod
-    def get_device_info(self, device_id: str) -> dict[str, Any]:
+    def get_device_info(self, device_id: str) -> DeviceInfo:
         """
         Get information about a paired device.
 
@@ -136,7 +235,7 @@ class PaymentProviderInterface(ABC):
         pass
 
     @abstractmethod
-    def list_devices(self, location_id: str | None = None) -> list[dict[str, Any]]:
+    def list_devices(self, location_id: str | None = None) -> list[DeviceInfo]:
         """
         List all devices for the account.
 
@@ -149,7 +248,7 @@ class PaymentProviderInterface(ABC):
         pass
 
     @abstractmethod
-    def get_locations(self) -> list[dict[str, Any]]:
+    def get_locations(self) -> list[LocationInfo]:
         """
         Get all locations for the merchant account.
 
@@ -170,32 +269,82 @@ class PaymentProviderInterface(ABC):
             expires_at: Token expiration datetime
 
         Returns:
-            bool: True if token is expired or expiration is unknown
+            bool: True if token is expired (or within the skew window of
+                expiring) or expiration is unknown
         """
         if expires_at is None:
             return True
-        return datetime.now(timezone.utc) >= expires_at
+        return _now(_UTC) + TOKEN_EXPIRY_SKEW >= expires_at
+
+    def token_expires_at(self) -> datetime | None:
+        """
+        Get the access-token expiry, parsing the stored ISO string only once.
+
+        Returns:
+            datetime | None: Expiry time, or None if unknown
+        """
+        raw = self.credentials.get("expires_at")
+        if raw is not self._expires_at_raw:
+            self._set_expires_at(raw, token_expires_at(self.credentials))
+        return self._expires_at
+
+    def _set_expires_at(self, raw: Any, expires_at: datetime | None) -> None:
+        self._expires_at_raw = raw
+        self._expires_at = expires_at
+        self._valid_until = (
+            expires_at.timestamp() - _EXPIRY_SKEW_SECONDS if expires_at is not None else 0.0
+        )
+
+    def _remember_expires_at(self, expires_at: datetime) -> None:
+        """
+        Seed the parsed-expiry cache after new credentials were stored.
+
+        Args:
+            expires_at: Expiry already parsed from the provider's token response
+        """
+        self._set_expires_at(self.credentials.get("expires_at"), expires_at)
 
     def ensure_valid_token(self) -> dict[str, Any]:
         """
         Ensure access token is valid, refreshing if necessary.
 
+        Tokens are normally refreshed ahead of expiry by the background
+        TokenRefreshScheduler; the inline refresh here is only a fallback.
+
         Returns:
             dict: Current valid credentials
 
         Raises:
             Exception: If token refresh fails
         """
-        expires_at = self.credentials.get("expires_at")
-        if expires_at and isinstance(expires_at, str):
-            expires_at = datetime.fromisoformat(expires_at)
-
-        if self.is_token_expired(expires_at):
-            refresh_token = self.credentials.get("refresh_token")
-            if not refresh_token:
-                raise ValueError("No refresh token available")
-
-            new_credentials = self.refresh_access_token(refresh_token)
-            self.credentials.update(new_credentials)
+        # Fast path: stored expiry unchanged since it was parsed and still
+        # comfortably in the future - a single float comparison
+        if (
+            self.credentials.get("expires_at") is self._expires_at_raw
+            and time.time() < self._valid_until
+        ):
+            return self.credentials
+
+        if self.is_token_expired(self.token_expires_at()):
+            if self._token_refresher is not None:
+                # Re-read the stored credentials under the refresh locks, so
+                # a token another worker already rotated is picked up and a
+                # new one is persisted rather than kept only in memory
+                self.credentials.update(self._token_refresher())
+                return self.credentials
+
+            merchant_id = self.credentials.get("merchant_id") or str(id(self))
+            with token_refresh_lock(merchant_id):
+                # Another thread sharing this provider may have refreshed
+                # while we waited for the lock
+                if not self.is_token_expired(self.token_expires_at()):
+                    return self.credentials
+
+                refresh_token = self.credentials.get("refresh_token")
+                if not refresh_token:
+                    raise ValueError("No refresh token available")
+
+                new_credentials = self.refresh_access_token(refresh_token)
+                self.credentials.update(new_credentials)
 
         return self.credentials
@@ -6,21 +6,34 @@ OAuth flows, and device pairing. It acts as the interface between API
 endpoints and provider implementations.
 """
 
+import atexit
 import secrets
+import threading
+import time
 from datetime import datetime, timezone
 from typing import Any
 
+from sqlalchemy import case, insert, lambda_stmt, literal, select, update
 from sqlalchemy.orm import Session
 
-from app.core.encryption import decrypt_data, encrypt_data
+from app.core.database import SessionLocal
+from app.core.encryption import decrypt_data_cached, encrypt_data
 from app.core.logger import get_logger
 from app.models.payment_configuration import PaymentConfiguration, PaymentProvider
 from app.models.payment_device import PaymentDevice
-from app.services.payment_provider_interface import PaymentProviderInterface
+from app.services.payment_provider_interface import (
+    PaymentProviderInterface,
+    token_expires_at,
+)
 from app.services.providers.square_provider import SquarePaymentProvider
+from app.services.token_refresh_scheduler import token_refresh_scheduler
 
 logger = get_logger("app.services.payment")
 
+# Bound once for the hot write paths below
+_UTC = timezone.utc
+_now = datetime.now
+
 
 class PaymentServiceError(Exception):
     """Custom exception for payment service errors."""
@@ -28,6 +41,77 @@ class PaymentServiceError(Exception):
     pass
 
 
+# Provider instances keyed by configuration ID and reused while the
+# configuration row is unchanged, so each SDK client's HTTP connection pool
+# (and TLS sessions) stay warm across polls
+_provider_cache: dict[int, tuple[tuple, PaymentProviderInterface]] = {}
+_provider_cache_lock = threading.RLock()
+
+# get_payment_provider results by (business_id, requested provider), so hot
+# endpoints skip the configuration query. Entries live until the token
+# expires (at most BUSINESS_PROVIDER_CACHE_TTL_SECONDS) and are dropped when
+# the business's configuration is updated or deleted.
+BUSINESS_PROVIDER_CACHE_TTL_SECONDS = 3600
+_business_provider_cache: dict[
+    tuple[int, PaymentProvider | None], tuple[float, PaymentProviderInterface]
+] = {}
+
+
+def _invalidate_business_providers(business_id: int, provider: PaymentProvider) -> None:
+    """Drop cached get_payment_provider results for a business's configuration"""
+    with _provider_cache_lock:
+        _business_provider_cache.pop((business_id, provider), None)
+        _business_provider_cache.pop((business_id, None), None)
+
+
+def get_provider_for_configuration(
+    config: PaymentConfiguration,
+) -> PaymentProviderInterface:
+    """
+    Get a (cached) provider instance for a payment configuration.
+
+    The cached instance is replaced whenever the configuration's business or
+    updated_at changes, e.g. after credentials are re-authorized.
+
+    Args:
+        config: Active payment configuration
+
+    Returns:
+        PaymentProviderInterface: Provider instance
+
+    Raises:
+        PaymentServiceError: If the provider is not supported
+    """
+    version = (config.business_id, config.updated_at)
+
+    with _provider_cache_lock:
+        cached = _provider_cache.get(config.id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    credentials = decrypt_data_cached(config.encrypted_credentials)
+
+    if config.provider == PaymentProvider.SQUARE:
+        provider_instance = SquarePaymentProvider(credentials, config.settings)
+    elif config.provider == PaymentProvider.CLOVER:
+        raise PaymentServiceError("Clover provider not yet implemented")
+    else:
+        raise PaymentServiceError(f"Unsupported provider: {config.provider}")
+
+    config_id = config.id
+    provider_instance.set_token_refresher(
+        lambda: token_refresh_scheduler.refresh_credentials(config_id)
+    )
+
+    with _provider_cache_lock:
+        _provider_cache[config.id] = (version, provider_instance)
+
+    # Keep the token fresh in the background from now on
+    token_refresh_scheduler.schedule(config.id, token_expires_at(credentials))
+
+    return provider_instance
+
+
 def get_payment_provider(
     db: Session, business_id: int, provider: PaymentProvider | None = None
 ) -> PaymentProviderInterface:
@@ -45,30 +129,34 @@ def get_payment_provider(
     Raises:
         PaymentServiceError: If no configuration found or provider not supported
     """
-    query = db.query(PaymentConfiguration).filter(
-        PaymentConfiguration.business_id == business_id
-    )
+    cache_key = (business_id, provider)
+    with _provider_cache_lock:
+        cached = _business_provider_cache.get(cache_key)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
 
-    if provider:
-        query = query.filter(PaymentConfiguration.provider == provider)
-
-    config = query.filter(PaymentConfiguration.is_active == True).first()
+    config = get_payment_configuration(db, business_id, provider)
 
     if not config:
         raise PaymentServiceError(
             f"No active payment configuration found for provider: {provider or 'any'}"
         )
 
-    # Decrypt credentials
-    credentials = decrypt_data(config.encrypted_credentials)
+    provider_instance = get_provider_for_configuration(config)
 
-    # Create provider instance
-    if config.provider == PaymentProvider.SQUARE:
-        return SquarePaymentProvider(credentials, config.settings)
-    elif config.provider == PaymentProvider.CLOVER:
-        raise PaymentServiceError("Clover provider not yet implemented")
-    else:
-        raise PaymentServiceError(f"Unsupported provider: {config.provider}")
+    # Cache until the token expires, so a refreshed token rolls the entry
+    ttl = BUSINESS_PROVIDER_CACHE_TTL_SECONDS
+    expires_at = provider_instance.token_expires_at()
+    if expires_at is not None:
+        ttl = min(ttl, expires_at.timestamp() - time.time())
+    if ttl > 0:
+        with _provider_cache_lock:
+            _business_provider_cache[cache_key] = (
+                time.monotonic() + ttl,
+                provider_instance,
+            )
+
+    return provider_instance
 
 
 def get_payment_configuration(
@@ -143,8 +231,8 @@ def create_or_update_payment_configuration(
         existing.encrypted_credentials = encrypted_credentials
         existing.settings = settings or existing.settings
         existing.is_active = True
-        existing.updated_at = datetime.now(timezone.utc)
         db.commit()
+        _invalidate_business_providers(business_id, provider)
         db.refresh(existing)
         logger.info(
             f"Updated payment configuration for business {business_id}, provider {provider.value}"
@@ -162,6 +250,7 @@ def create_or_update_payment_configuration(
         db.add(config)
         db.commit()
         db.refresh(config)
+        _invalidate_business_providers(business_id, provider)
         logger.info(
             f"Created payment configuration for business {business_id}, provider {provider.value}"
         )
@@ -201,8 +290,12 @@ def delete_payment_configuration(
     except Exception as e:
         logger.warning(f"Failed to revoke provider access: {e}")
 
+    config_id = config.id
     db.delete(config)
     db.commit()
+    _invalidate_business_providers(business_id, provider)
+    with _provider_cache_lock:
+        _provider_cache.pop(config_id, None)
     logger.info(
         f"Deleted payment configuration for business {business_id}, provider {provider.value}"
     )
@@ -223,26 +316,42 @@ def create_payment_device(
     Returns:
         PaymentDevice: Created device
     """
-    # Get active payment configuration
-    config = get_payment_configuration(db, business_id)
-    if not config:
-        raise PaymentServiceError("No active payment configuration found")
-
-    device = PaymentDevice(
-        business_id=business_id,
-        configuration_id=config.id,
-        device_id=device_data["device_id"],
-        device_name=device_data["device_name"],
-        location_id=device_data["location_id"],
-        pairing_code=device_data.get("pairing_code"),
-        paired_at=datetime.now(timezone.utc),
-        device_metadata=device_data.get("device_metadata"),
-        is_active=True,
+    # INSERT ... SELECT from the active configuration, so resolving the
+    # configuration and creating the device take one statement
+    values = {
+        "business_id": business_id,
+        "device_id": device_data["device_id"],
+        "device_name": device_data["device_name"],
+        "location_id": device_data["location_id"],
+        "pairing_code": device_data.get("pairing_code"),
+        "paired_at": _now(_UTC),
+        "device_metadata": device_data.get("device_metadata"),
+        "is_active": True,
+    }
+    active_config = (
+        select(
+            PaymentConfiguration.id,
+            *(
+                literal(value, PaymentDevice.__table__.c[name].type)
+                for name, value in values.items()
+            ),
+        )
+        .where(
+            PaymentConfiguration.business_id == business_id,
+            PaymentConfiguration.is_active == True,
+        )
+        .limit(1)
     )
+    device = db.scalars(
+        insert(PaymentDevice)
+        .from_select(["configuration_id", *values], active_config)
+        .returning(PaymentDevice)
+    ).one_or_none()
+
+    if device is None:
+        raise PaymentServiceError("No active payment configuration found")
 
-    db.add(device)
     db.commit()
-    db.refresh(device)
     logger.info(
         f"Created payment device {device.device_id} for business {business_id}"
     )
@@ -263,13 +372,10 @@ def get_payment_device(
     Returns:
         PaymentDevice | None: Device or None
     """
-    return (
-        db.query(PaymentDevice)
-        .filter(
-            PaymentDevice.business_id == business_id, PaymentDevice.id == device_id
-        )
-        .first()
-    )
+    device = db.get(PaymentDevice, device_id)
+    if device is None or device.business_id != business_id:
+        return None
+    return device
 
 
 def list_payment_devices(db: Session, business_id: int) -> list[PaymentDevice]:
@@ -283,12 +389,12 @@ def list_payment_devices(db: Session, business_id: int) -> list[PaymentDevice]:
     Returns:
         list[PaymentDevice]: List of devices
     """
-    return (
-        db.query(PaymentDevice)
-        .filter(PaymentDevice.business_id == business_id)
+    stmt = lambda_stmt(
+        lambda: select(PaymentDevice)
+        .where(PaymentDevice.business_id == business_id)
         .order_by(PaymentDevice.created_at.desc())
-        .all()
     )
+    return list(db.scalars(stmt).all())
 
 
 def update_payment_device(
@@ -314,7 +420,6 @@ def update_payment_device(
         if hasattr(device, key) and value is not None:
             setattr(device, key, value)
 
-    device.updated_at = datetime.now(timezone.utc)
     db.commit()
     db.refresh(device)
     logger.info(f"Updated payment device {device_id} for business {business_id}")
@@ -343,15 +448,67 @@ def delete_payment_device(db: Session, business_id: int, device_id: int) -> bool
     return True
 
 
+# Buffered device last_used_at writes (see update_device_last_used)
+DEVICE_LAST_USED_FLUSH_SECONDS = 5
+DEVICE_LAST_USED_FLUSH_SIZE = 100
+_last_used_buffer: dict[int, datetime] = {}
+_last_used_lock = threading.Lock()
+_last_used_timer: threading.Timer | None = None
+
+
 def update_device_last_used(db: Session, device_id: int) -> None:
     """
-    Update the last_used_at timestamp for a device.
+    Record that a device was just used.
+
+    Writes are buffered per device and flushed in a single UPDATE every
+    DEVICE_LAST_USED_FLUSH_SECONDS (or once DEVICE_LAST_USED_FLUSH_SIZE devices
+    are pending), so terminal events don't each cost a transaction.
 
     Args:
-        db: Database session
+        db: Database session (unused; the flush runs on its own session)
         device_id: Device ID
     """
-    device = db.query(PaymentDevice).filter(PaymentDevice.id == device_id).first()
-    if device:
-        device.last_used_at = datetime.now(timezone.utc)
+    global _last_used_timer
+    with _last_used_lock:
+        _last_used_buffer[device_id] = _now(_UTC)
+        flush_now = len(_last_used_buffer) >= DEVICE_LAST_USED_FLUSH_SIZE
+        if not flush_now and _last_used_timer is None:
+            _last_used_timer = threading.Timer(
+                DEVICE_LAST_USED_FLUSH_SECONDS, flush_device_last_used
+            )
+            _last_used_timer.daemon = True
+            _last_used_timer.start()
+
+    if flush_now:
+        flush_device_last_used()
+
+
+def flush_device_last_used() -> None:
+    """Write all buffered device last_used_at timestamps in one UPDATE."""
+    global _last_used_timer
+    with _last_used_lock:
+        pending = dict(_last_used_buffer)
+        _last_used_buffer.clear()
+        if _last_used_timer is not None:
+            _last_used_timer.cancel()
+            _last_used_timer = None
+
+    if not pending:
+        return
+
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(PaymentDevice)
+            .where(PaymentDevice.id.in_(pending))
+            .values(last_used_at=case(pending, value=PaymentDevice.id))
+            .execution_options(synchronize_session=False)
+        )
         db.commit()
+    except Exception as e:
+        logger.error(f"Failed to flush device last_used_at for {len(pending)} devices: {e}")
+    finally:
+        db.close()
+
+
+atexit.register(flush_device_last_used)
@@ -1,8 +1,8 @@
 """Pet service for CRUD operations"""
 
-from sqlalchemy.orm import Session, joinedload, aliased
-from sqlalchemy import and_, or_, func
-from datetime import datetime, timezone
+from sqlalchemy.orm import Session, aliased, selectinload
+from sqlalchemy import and_, or_, func, insert, lambda_stmt, literal, select
+from collections.abc import Iterator
 
 from app.models.pet import Pet
 from app.models.customer import Customer
@@ -14,6 +14,9 @@ from app.core.logger import get_logger
 
 logger = get_logger("app.services.pet_service")
 
+# Rows fetched per round-trip when streaming pet listings
+PET_STREAM_BATCH_SIZE = 500
+
 
 class PetServiceError(Exception):
     """Base exception for pet service errors"""
@@ -21,24 +24,32 @@ class PetServiceError(Exception):
     pass
 
 
-def get_all_pets(db: Session, business_id: int) -> list[Pet]:
+def get_all_pets(db: Session, business_id: int) -> Iterator[Pet]:
     """
-    Get all pets for a business with customer information.
+    Stream all pets for a business with customer information.
+
+    Rows are fetched in batches of PET_STREAM_BATCH_SIZE (with their
+    selectin-loaded customers) so the full list is never held in memory.
 
     Args:
         db: Database session
         business_id: Business ID to filter pets
 
-    Returns:
-        List of all pets for the business with customer relationship loaded
+    Yields:
+        Pets for the business with customer relationship loaded
     """
-    return (
-        db.query(Pet)
-        .options(joinedload(Pet.customer))
-        .filter(Pet.business_id == business_id)
+    # One IN-list query per batch for the distinct customers, fetching only
+    # what the list renders, instead of joining a full customer row onto
+    # every pet. lambda_stmt caches the statement; business_id is bound per call.
+    stmt = lambda_stmt(
+        lambda: select(Pet)
+        .options(
+            selectinload(Pet.customer).load_only(Customer.id, Customer.account_name)
+        )
+        .where(Pet.business_id == business_id)
         .order_by(Pet.created_at.desc())
-        .all()
     )
+    yield from db.scalars(stmt, execution_options={"yield_per": PET_STREAM_BATCH_SIZE})
 
 
 def get_pets_by_customer(db: Session, customer_id: int, business_id: int) -> list[Pet]:
@@ -53,17 +64,12 @@ def get_pets_by_customer(db: Session, customer_id: int, business_id: int) -> lis
     Returns:
         List of pets for the customer
     """
-    return (
-        db.query(Pet)
-        .filter(
-            and_(
-                Pet.customer_id == customer_id,
-                Pet.business_id == business_id,
-            )
-        )
+    stmt = lambda_stmt(
+        lambda: select(Pet)
+        .where(Pet.customer_id == customer_id, Pet.business_id == business_id)
         .order_by(Pet.created_at.desc())
-        .all()
     )
+    return list(db.scalars(stmt).all())
 
 
 def get_pet_by_id(db: Session, pet_id: int, business_id: int) -> Pet | None:
@@ -78,16 +84,10 @@ def get_pet_by_id(db: Session, pet_id: int, business_id: int) -> Pet | None:
     Returns:
         Pet if found, None otherwise
     """
-    return (
-        db.query(Pet)
-        .filter(
-            and_(
-                Pet.id == pet_id,
-                Pet.business_id == business_id,
-            )
-        )
-        .first()
-    )
+    pet = db.get(Pet, pet_id)
+    if pet is None or pet.business_id != business_id:
+        return None
+    return pet
 
 
 def add_pet_to_customer(
@@ -108,78 +108,39 @@ def add_pet_to_customer(
     Raises:
         PetServiceError: If customer not found or validation fails
     """
-    # Verify customer exists and belongs to business
-    db_customer = (
-        db.query(Customer)
-        .filter(
-            and_(
-                Customer.id == customer_id,
-                Customer.business_id == business_id,
-            )
+    # Verify the customer and resolve the species and breed names in one
+    # round-trip; each scalar subquery yields NULL when its row is missing
+    customer_exists, species, breed_name = db.execute(
+        select(
+            select(literal(True))
+            .where(Customer.id == customer_id, Customer.business_id == business_id)
+            .scalar_subquery(),
+            select(AnimalType.name)
+            .where(AnimalType.id == pet_data.animal_type_id)
+            .scalar_subquery(),
+            select(AnimalBreed.name)
+            .where(AnimalBreed.id == pet_data.breed_id)
+            .scalar_subquery(),
         )
-        .first()
-    )
+    ).one()
 
-    if not db_customer:
+    if not customer_exists:
         raise PetServiceError(
             f"Customer {customer_id} not found for business {business_id}"
         )
 
-    # Get animal type to determine species
-    animal_type = (
-        db.query(AnimalType)
-        .filter(AnimalType.id == pet_data.animal_type_id)
-        .first()
-    )
-
-    if not animal_type:
+    if not species:
         raise PetServiceError(
             f"Animal type {pet_data.animal_type_id} not found"
         )
 
-    # Get breed name if breed_id provided
-    breed_name = None
-    if pet_data.breed_id:
-        breed = (
-            db.query(AnimalBreed)
-            .filter(AnimalBreed.id == pet_data.breed_id)
-            .first()
-        )
-        if breed:
-            breed_name = breed.name
-
-    # Calculate age from birth_date if provided
-    age = None
-    if pet_data.birth_date:
-        today = datetime.now(timezone.utc).date()
-        age = (
-            today.year
-            - pet_data.birth_date.year
-            - (
-                (today.month, today.day)
-                < (pet_data.birth_date.month, pet_data.birth_date.day)
-            )
-        )
-
-    # Build special notes with spayed/neutered status
-    special_notes = f"Spayed/Neutered: {'Yes' if pet_data.spayed_neutered else 'No'}"
-
     try:
-        # Create new pet
-        db_pet = Pet(
-            customer_id=customer_id,
-            business_id=business_id,
-            name=pet_data.name,
-            species=animal_type.name,
-            breed=breed_name,
-            age=age,
-            weight=pet_data.weight,
-            special_notes=special_notes,
-        )
-
-        db.add(db_pet)
+        # INSERT ... RETURNING: one statement creates and loads the pet
+        db_pet = db.scalars(
+            insert(Pet).returning(Pet),
+            [_new_pet_values(customer_id, business_id, pet_data, species, breed_name)],
+        ).one()
         db.commit()
-        db.refresh(db_pet)
 
         logger.info(
             f"Added pet {db_pet.id} ({db_pet.name}) to customer {customer_id}"
@@ -193,6 +154,109 @@ def add_pet_to_customer(
         raise PetServiceError(f"Failed to add pet: {str(e)}")
 
 
+def add_pets_bulk(
+    db: Session, customer_id: int, pets_data: list[PetAdd], business_id: int
+) -> list[Pet]:
+    """
+    Add several pets to an existing customer with a single INSERT.
+
+    Args:
+        db: Database session
+        customer_id: Customer ID to add pets to
+        pets_data: Pet data for each new pet
+        business_id: Business ID to verify ownership
+
+    Returns:
+        Created Pets, in input order
+
+    Raises:
+        PetServiceError: If customer or an animal type is not found
+    """
+    if not pets_data:
+        return []
+
+    customer_exists = db.execute(
+        select(literal(True)).where(
+            Customer.id == customer_id, Customer.business_id == business_id
+        )
+    ).scalar()
+    if not customer_exists:
+        raise PetServiceError(
+            f"Customer {customer_id} not found for business {business_id}"
+        )
+
+    type_ids = {pet.animal_type_id for pet in pets_data}
+    species_by_type = dict(
+        db.execute(
+            select(AnimalType.id, AnimalType.name).where(AnimalType.id.in_(type_ids))
+        ).all()
+    )
+    missing = type_ids - species_by_type.keys()
+    if missing:
+        raise PetServiceError(f"Animal type {min(missing)} not found")
+
+    breed_ids = {pet.breed_id for pet in pets_data if pet.breed_id}
+    breed_names = (
+        dict(
+            db.execute(
+                select(AnimalBreed.id, AnimalBreed.name).where(AnimalBreed.id.in_(breed_ids))
+            ).all()
+        )
+        if breed_ids
+        else {}
+    )
+
+    try:
+        db_pets = list(
+            db.scalars(
+                insert(Pet).returning(Pet, sort_by_parameter_order=True),
+                [
+                    _new_pet_values(
+                        customer_id,
+                        business_id,
+                        pet,
+                        species_by_type[pet.animal_type_id],
+                        breed_names.get(pet.breed_id),
+                    )
+                    for pet in pets_data
+                ],
+            )
+        )
+        db.commit()
+
+        logger.info(f"Added {len(db_pets)} pets to customer {customer_id}")
+
+        return db_pets
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error adding pets to customer {customer_id}: {e}")
+        raise PetServiceError(f"Failed to add pets: {str(e)}")
+
+
+def _new_pet_values(
+    customer_id: int,
+    business_id: int,
+    pet_data: PetAdd,
+    species: str,
+    breed_name: str | None,
+) -> dict:
+    """Build the column values for a new pet from PetAdd data"""
+    # Build special notes with spayed/neutered status
+    special_notes = f"Spayed/Neutered: {'Yes' if pet_data.spayed_neutered else 'No'}"
+
+    return {
+        "customer_id": customer_id,
+        "business_id": business_id,
+        "name": pet_data.name,
+        "species": species,
+        "breed": breed_name,
+        "birth_date": pet_data.birth_date,
+        "weight": pet_data.weight,
+        "special_notes": special_notes,
+    }
+
+
 def update_pet(
     db: Session, pet_id: int, pet_data: PetUpdate, business_id: int
 ) -> Pet:
@@ -227,7 +291,12 @@ def update_pet(
     if pet_data.breed is not None:
         db_pet.breed = pet_data.breed
 
-    if pet_data.age is not None:
+    if pet_data.birth_date is not None:
+        db_pet.birth_date = pet_data.birth_date
+    elif pet_data.age is not None and pet_data.age != db_pet.age:
+        # An age that contradicts the known birth date replaces it; echoing
+        # back the derived age leaves the birth date in place
+        db_pet.birth_date = None
         db_pet.age = pet_data.age
 
     if pet_data.weight is not None:
@@ -236,9 +305,12 @@ def update_pet(
     if pet_data.special_notes is not None:
         db_pet.special_notes = pet_data.special_notes
 
+    # No-op PATCH (nothing provided, or same values): skip the transaction
+    if not db.is_modified(db_pet):
+        return db_pet
+
     try:
         db.commit()
-        db.refresh(db_pet)
         logger.info(f"Updated pet {pet_id}")
         return db_pet
     except Exception as e:
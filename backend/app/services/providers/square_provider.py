@@ -5,20 +5,257 @@ This module implements the PaymentProviderInterface for Square,
 handling OAuth authorization and Terminal device pairing.
 """
 
-import secrets
+import base64
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Callable, TypedDict, TypeVar
 from urllib.parse import urlencode
 
+import httpx
 from square import Square
 from square.client import SquareEnvironment
+from square.core.api_error import ApiError
 
 from app.core.config import settings
 from app.core.logger import get_logger
-from app.services.payment_provider_interface import PaymentProviderInterface
+from app.services.payment_provider_interface import (
+    DeviceInfo,
+    LocationInfo,
+    PaymentProviderInterface,
+)
 
 logger = get_logger("app.services.providers.square")
 
+# Provider failures logged compactly and re-raised; anything else propagates
+# untouched with its full traceback
+_SQUARE_ERRORS = (ApiError, httpx.HTTPError)
+
+
+def _error_summary(error: Exception) -> str:
+    """Short description of a provider error: HTTP status for API errors, else the type."""
+    status_code = getattr(error, "status_code", None)
+    return f"HTTP {status_code}" if status_code is not None else type(error).__name__
+
+
+# Retries for throttled (429) or failing (5xx / transport) Square calls
+SQUARE_RETRY_ATTEMPTS = 4
+SQUARE_RETRY_BASE_SECONDS = 0.5
+SQUARE_RETRY_MAX_SECONDS = 8.0
+
+_T = TypeVar("_T")
+
+
+def _retry_delay(error: Exception, attempt: int) -> float | None:
+    """
+    Seconds to wait before retrying a failed Square call, or None if not retryable.
+
+    Honors Retry-After on throttled responses; otherwise exponential backoff
+    with full jitter.
+    """
+    if isinstance(error, ApiError):
+        status_code = error.status_code or 0
+        if status_code != 429 and status_code < 500:
+            return None
+        retry_after = (getattr(error, "headers", None) or {}).get("retry-after")
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), SQUARE_RETRY_MAX_SECONDS)
+            except ValueError:
+                pass
+    elif not isinstance(error, httpx.TransportError):
+        return None
+    return random.uniform(0, min(SQUARE_RETRY_BASE_SECONDS * 2**attempt, SQUARE_RETRY_MAX_SECONDS))
+
+
+def _call_with_backoff(call: Callable[..., _T], **kwargs: Any) -> _T:
+    """
+    Invoke a Square SDK call, retrying throttled and transient failures.
+
+    Only the SDK call itself is retried, so writes keep the idempotency key
+    they were given and are never duplicated.
+    """
+    attempt = 0
+    while True:
+        try:
+            return call(**kwargs)
+        except _SQUARE_ERRORS as e:
+            attempt += 1
+            delay = _retry_delay(e, attempt) if attempt < SQUARE_RETRY_ATTEMPTS else None
+            if delay is None:
+                raise
+            logger.info("Retrying Square call after %s in %.2fs", _error_summary(e), delay)
+            time.sleep(delay)
+
+
+# Static parts of every terminal checkout request (shared, never mutated)
+_TIP_SETTINGS = {
+    "allow_tipping": True,
+    "separate_tip_screen": True,
+    "smart_tipping": True,
+}
+_PAYMENT_OPTIONS = {
+    "autocomplete": True,  # Automatically complete payment
+}
+
+# Largest page size the Square Devices API accepts
+DEVICE_PAGE_LIMIT = 100
+
+class TerminalCheckoutStatus(TypedDict):
+    """Terminal checkout as returned by get_terminal_checkout"""
+
+    checkout_id: str | None
+    status: str | None
+    payment_id: str | None
+    amount_money: Any
+    tip_money: Any
+    total_money: Any
+    receipt_url: str | None
+    created_at: str | None
+    updated_at: str | None
+
+
+class PaymentDetails(TypedDict):
+    """Payment as returned by get_payment"""
+
+    payment_id: str | None
+    status: str | None
+    amount_money: Any
+    tip_money: Any
+    total_money: Any
+    receipt_url: str | None
+
+
+# (response key, SDK attribute) pairs for mapping Square models to dicts
+_DEVICE_FIELDS = (
+    ("device_id", "id"),
+    ("name", "name"),
+    ("status", "status"),
+    ("location_id", "location_id"),
+)
+_LOCATION_FIELDS = (
+    ("location_id", "id"),
+    ("name", "name"),
+    ("address", "address"),
+    ("status", "status"),
+    ("merchant_id", "merchant_id"),
+)
+_DEVICE_CODE_FIELDS = (
+    ("device_code_id", "id"),
+    ("code", "code"),
+    ("expires_at", "created_at"),
+    ("status", "status"),
+    ("location_id", "location_id"),
+)
+_CHECKOUT_FIELDS = (
+    ("checkout_id", "id"),
+    ("status", "status"),
+    ("amount_money", "amount_money"),
+    ("tip_money", "tip_money"),
+    ("total_money", "total_money"),
+    ("receipt_url", "receipt_url"),
+    ("created_at", "created_at"),
+    ("updated_at", "updated_at"),
+)
+_PAYMENT_FIELDS = (
+    ("payment_id", "id"),
+    ("status", "status"),
+    ("amount_money", "amount_money"),
+    ("tip_money", "tip_money"),
+    ("total_money", "total_money"),
+    ("receipt_url", "receipt_url"),
+)
+
+
+def _project(obj: Any, fields: tuple[tuple[str, str], ...]) -> dict[str, Any]:
+    """Map SDK model attributes to a dict, treating missing attributes as None."""
+    return {key: getattr(obj, attr, None) for key, attr in fields}
+
+
+@lru_cache(maxsize=2)
+def _authorize_url_prefix(is_production: bool) -> str:
+    """Build the invariant part of the OAuth authorization URL (once per environment)."""
+    base_url = "https://connect.squareup.com/oauth2/authorize" if is_production else "https://connect.squareupsandbox.com/oauth2/authorize"
+    params = {
+        "client_id": settings.SQUARE_APP_ID,
+        "scope": "MERCHANT_PROFILE_READ PAYMENTS_READ PAYMENTS_WRITE DEVICE_CREDENTIAL_MANAGEMENT",
+        "session": "false",
+    }
+    return f"{base_url}?{urlencode(params)}"
+
+
+@lru_cache(maxsize=1)
+def _client_auth_options() -> dict[str, Any]:
+    """
+    Build the request options for application-authenticated OAuth calls (once).
+
+    RevokeToken is authorized with the application secret ("Client <secret>")
+    rather than the merchant's bearer token.
+    """
+    return {"additional_headers": {"Authorization": f"Client {settings.SQUARE_APP_SECRET}"}}
+
+
+def _obtained_token_expiry(result: Any) -> datetime:
+    """Read the token expiry from an ObtainToken response (30 days if absent)."""
+    expires_at_str = getattr(result, "expires_at", None)
+    if not expires_at_str:
+        return datetime.now(timezone.utc) + timedelta(days=30)
+    # Square sends a "Z" suffix, which fromisoformat only accepts from Python 3.11
+    if expires_at_str[-1] == "Z":
+        expires_at_str = f"{expires_at_str[:-1]}+00:00"
+    return datetime.fromisoformat(expires_at_str)
+
+
+# Square device codes must be paired within 5 minutes of creation; a pending
+# code is handed out again until shortly before then
+DEVICE_CODE_TTL_SECONDS = 300
+DEVICE_CODE_REUSE_MARGIN_SECONDS = 10
+
+# (merchant_id, location_id, device_name) -> (device code record, monotonic expiry)
+_device_code_cache: dict[tuple[str | None, str, str], tuple[dict[str, Any], float]] = {}
+_device_code_cache_lock = threading.Lock()
+
+
+def _forget_device_code(device_code_id: str) -> None:
+    """Stop reusing a device code once it has been paired or has lapsed."""
+    with _device_code_cache_lock:
+        for key, (record, _) in list(_device_code_cache.items()):
+            if record["device_code_id"] == device_code_id:
+                del _device_code_cache[key]
+
+
+# Idempotency keys drawn per os.urandom call
+IDEMPOTENCY_KEY_BATCH = 256
+
+_idempotency_keys: deque[str] = deque()
+# Forked workers must never reuse the parent's pre-generated keys
+os.register_at_fork(after_in_child=_idempotency_keys.clear)
+
+
+def _encode_key(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _next_idempotency_key() -> str:
+    """Return a random idempotency key (same format as secrets.token_urlsafe(32))."""
+    try:
+        return _idempotency_keys.popleft()
+    except IndexError:
+        raw = os.urandom(32 * IDEMPOTENCY_KEY_BATCH)
+        _idempotency_keys.extend(
+            _encode_key(raw[i:i + 32]) for i in range(32, len(raw), 32)
+        )
+        return _encode_key(raw[:32])
+
+
+# Worker threads for overlapping independent Square API calls
+_fanout = ThreadPoolExecutor(max_workers=8, thread_name_prefix="square-fanout")
+
 
 class SquarePaymentProvider(PaymentProviderInterface):
     """Square payment provider implementation."""
@@ -41,17 +278,21 @@ class SquarePaymentProvider(PaymentProviderInterface):
         self.client = self._create_client()
 
     def _create_client(self) -> Square:
-        """Create Square SDK client with current credentials."""
-        access_token = self.credentials.get("access_token")
+        """
+        Create Square SDK client bound to this provider's credentials.
 
+        The token is passed as a callable, so the client picks up refreshed
+        credentials on the next request without being rebuilt.
+        """
         return Square(
-            token=access_token,
+            token=self._access_token,
             environment=SquareEnvironment.PRODUCTION if self.is_production else SquareEnvironment.SANDBOX,
+            httpx_client=self._http,
         )
 
-    def _refresh_client(self) -> None:
-        """Refresh the Square client with updated credentials."""
-        self.client = self._create_client()
+    def _access_token(self) -> str | None:
+        """Return the current access token for the SDK's Authorization header."""
+        return self.credentials.get("access_token")
 
     def get_oauth_authorization_url(self, state: str, redirect_uri: str) -> str:
         """
@@ -67,16 +308,7 @@ class SquarePaymentProvider(PaymentProviderInterface):
         if not settings.SQUARE_APP_ID:
             raise ValueError("SQUARE_APP_ID not configured")
 
-        base_url = "https://connect.squareup.com/oauth2/authorize" if self.is_production else "https://connect.squareupsandbox.com/oauth2/authorize"
-
-        params = {
-            "client_id": settings.SQUARE_APP_ID,
-            "scope": "MERCHANT_PROFILE_READ PAYMENTS_READ PAYMENTS_WRITE DEVICE_CREDENTIAL_MANAGEMENT",
-            "session": "false",
-            "state": state,
-        }
-
-        return f"{base_url}?{urlencode(params)}"
+        return f"{_authorize_url_prefix(self.is_production)}&{urlencode({'state': state})}"
 
     def exchange_authorization_code(self, code: str, redirect_uri: str) -> dict[str, Any]:
         """
@@ -102,31 +334,24 @@ class SquarePaymentProvider(PaymentProviderInterface):
 
             # Square SDK raises exceptions on error, so if we're here it succeeded
             # Result attributes are directly on the object
-            # Calculate expiration time
-            expires_at_str = result.expires_at if hasattr(result, 'expires_at') else None
-            if expires_at_str:
-                # Square gives us an ISO timestamp string
-                expires_at = datetime.fromisoformat(expires_at_str.replace('Z', '+00:00'))
-            else:
-                # Fallback: assume 30 days if not provided
-                expires_at = datetime.now(timezone.utc) + timedelta(days=30)
+            expires_at = _obtained_token_expiry(result)
 
             credentials = {
                 "access_token": result.access_token,
-                "refresh_token": result.refresh_token if hasattr(result, 'refresh_token') else None,
+                "refresh_token": getattr(result, "refresh_token", None),
                 "expires_at": expires_at.isoformat(),
-                "merchant_id": result.merchant_id if hasattr(result, 'merchant_id') else None,
-                "token_type": result.token_type if hasattr(result, 'token_type') else "bearer",
+                "merchant_id": getattr(result, "merchant_id", None),
+                "token_type": getattr(result, "token_type", "bearer"),
             }
 
-            # Update our credentials and refresh client
+            # Update our credentials; the client reads the new token per request
             self.credentials.update(credentials)
-            self._refresh_client()
+            self._remember_expires_at(expires_at)
 
             return credentials
 
-        except Exception as e:
-            logger.error(f"Failed to exchange authorization code: {e}")
+        except _SQUARE_ERRORS as e:
+            logger.warning("Failed to exchange authorization code: %s", _error_summary(e))
             raise
 
     def refresh_access_token(self, refresh_token: str) -> dict[str, Any]:
@@ -151,27 +376,22 @@ class SquarePaymentProvider(PaymentProviderInterface):
             )
 
             # Square SDK raises exceptions on error, so if we're here it succeeded
-            # Calculate new expiration
-            expires_at_str = result.expires_at if hasattr(result, 'expires_at') else None
-            if expires_at_str:
-                expires_at = datetime.fromisoformat(expires_at_str.replace('Z', '+00:00'))
-            else:
-                expires_at = datetime.now(timezone.utc) + timedelta(days=30)
+            expires_at = _obtained_token_expiry(result)
 
             updated_credentials = {
                 "access_token": result.access_token,
                 "expires_at": expires_at.isoformat(),
-                "merchant_id": result.merchant_id if hasattr(result, 'merchant_id') else None,
+                "merchant_id": getattr(result, "merchant_id", None),
             }
 
-            # Update credentials and refresh client
+            # Update credentials; the client reads the new token per request
             self.credentials.update(updated_credentials)
-            self._refresh_client()
+            self._remember_expires_at(expires_at)
 
             return updated_credentials
 
-        except Exception as e:
-            logger.error(f"Failed to refresh access token: {e}")
+        except _SQUARE_ERRORS as e:
+            logger.warning("Failed to refresh access token: %s", _error_summary(e))
             raise
 
     def revoke_access(self) -> bool:
@@ -192,18 +412,23 @@ class SquarePaymentProvider(PaymentProviderInterface):
             self.client.o_auth.revoke_token(
                 client_id=settings.SQUARE_APP_ID,
                 access_token=access_token,
+                request_options=_client_auth_options(),
             )
             # Square SDK raises exceptions on error, so if we're here it succeeded
             return True
 
         except Exception as e:
-            logger.error(f"Failed to revoke access token: {e}")
+            logger.warning("Failed to revoke access token: %s", _error_summary(e))
             return False
 
     def create_device_code(self, device_name: str, location_id: str) -> dict[str, Any]:
         """
         Create a device code for Square Terminal pairing.
 
+        A still-pending code for the same merchant, location and device name
+        is returned again instead of creating a new one (e.g. when the pairing
+        screen is reloaded).
+
         Args:
             device_name: Human-readable name for the device
             location_id: Square location ID
@@ -211,12 +436,18 @@ class SquarePaymentProvider(PaymentProviderInterface):
         Returns:
             dict: Device code information
         """
+        cache_key = (self.credentials.get("merchant_id"), location_id, device_name)
+        with _device_code_cache_lock:
+            cached = _device_code_cache.get(cache_key)
+        if cached is not None and time.monotonic() < cached[1] - DEVICE_CODE_REUSE_MARGIN_SECONDS:
+            return dict(cached[0])
+
         self.ensure_valid_token()
 
         try:
             # Use devices.codes.create() - path is /v2/devices/codes
             result = self.client.devices.codes.create(
-                idempotency_key=secrets.token_urlsafe(32),
+                idempotency_key=_next_idempotency_key(),
                 device_code={
                     "name": device_name,
                     "product_type": "TERMINAL_API",
@@ -225,20 +456,20 @@ class SquarePaymentProvider(PaymentProviderInterface):
             )
 
             # Access device_code attribute directly
-            device_code = result.device_code if hasattr(result, 'device_code') else None
+            device_code = getattr(result, "device_code", None)
             if not device_code:
                 raise ValueError("No device code returned from Square")
 
-            return {
-                "device_code_id": device_code.id if hasattr(device_code, 'id') else None,
-                "code": device_code.code if hasattr(device_code, 'code') else None,
-                "expires_at": device_code.created_at if hasattr(device_code, 'created_at') else None,
-                "status": device_code.status if hasattr(device_code, 'status') else None,
-                "location_id": device_code.location_id if hasattr(device_code, 'location_id') else None,
-            }
+            record = _project(device_code, _DEVICE_CODE_FIELDS)
+            with _device_code_cache_lock:
+                _device_code_cache[cache_key] = (
+                    record,
+                    time.monotonic() + DEVICE_CODE_TTL_SECONDS,
+                )
+            return dict(record)
 
-        except Exception as e:
-            logger.error(f"Failed to create device code: {e}")
+        except _SQUARE_ERRORS as e:
+            logger.warning("Failed to create device code: %s", _error_summary(e))
             raise
 
     def get_device_code_status(self, device_code_id: str) -> dict[str, Any]:
@@ -258,22 +489,26 @@ class SquarePaymentProvider(PaymentProviderInterface):
             result = self.client.devices.codes.get(id=device_code_id)
 
             # Access device_code attribute directly
-            device_code = result.device_code if hasattr(result, 'device_code') else None
+            device_code = getattr(result, "device_code", None)
             if not device_code:
                 raise ValueError("No device code returned from Square")
 
+            code_status = getattr(device_code, "status", "UNKNOWN")
+            if code_status != "UNPAIRED":
+                _forget_device_code(device_code_id)
+
             return {
-                "status": device_code.status if hasattr(device_code, 'status') else "UNKNOWN",
-                "device_id": device_code.device_id if hasattr(device_code, 'device_id') else None,
-                "created_at": device_code.created_at if hasattr(device_code, 'created_at') else None,
-                "code": device_code.code if hasattr(device_code, 'code') else None,
+                "status": code_status,
+                "device_id": getattr(device_code, "device_id", None),
+                "created_at": getattr(device_code, "created_at", None),
+                "code": getattr(device_code, "code", None),
             }
 
-        except Exception as e:
-            logger.error(f"Failed to get device code status: {e}")
+        except _SQUARE_ERRORS as e:
+            logger.warning("Failed to get device code status: %s", _error_summary(e))
             raise
 
-    def get_device_info(self, device_id: str) -> dict[str, Any]:
+    def get_device_info(self, device_id: str) -> DeviceInfo:
         """
         Get information about a paired Square device.
 
@@ -289,22 +524,17 @@ class SquarePaymentProvider(PaymentProviderInterface):
             result = self.client.devices.get_device(id=device_id)
 
             # Access device attribute directly
-            device = result.device if hasattr(result, 'device') else None
+            device = getattr(result, "device", None)
             if not device:
                 raise ValueError("No device returned from Square")
 
-            return {
-                "device_id": device.id if hasattr(device, 'id') else None,
-                "name": device.name if hasattr(device, 'name') else None,
-                "status": device.status if hasattr(device, 'status') else None,
-                "location_id": device.location_id if hasattr(device, 'location_id') else None,
-            }
+            return _project(device, _DEVICE_FIELDS)
 
-        except Exception as e:
-            logger.error(f"Failed to get device info: {e}")
+        except _SQUARE_ERRORS as e:
+            logger.warning("Failed to get device info: %s", _error_summary(e))
             raise
 
-    def list_devices(self, location_id: str | None = None) -> list[dict[str, Any]]:
+    def list_devices(self, location_id: str | None = None) -> list[DeviceInfo]:
         """
         List all Square devices.
 
@@ -317,30 +547,27 @@ class SquarePaymentProvider(PaymentProviderInterface):
         self.ensure_valid_token()
 
         try:
-            params = {}
+            params = {"limit": DEVICE_PAGE_LIMIT}
             if location_id:
                 params["location_ids"] = [location_id]
 
-            result = self.client.devices.list(**params)
-
-            # Access devices attribute directly
-            devices = result.devices if hasattr(result, 'devices') else []
+            # Follow the cursor chain; full pages keep the round-trips few
+            devices = []
+            while True:
+                result = _call_with_backoff(self.client.devices.list, **params)
+                devices.extend(getattr(result, "devices", None) or [])
+                cursor = getattr(result, "cursor", None)
+                if not cursor:
+                    break
+                params["cursor"] = cursor
 
-            return [
-                {
-                    "device_id": device.id if hasattr(device, 'id') else None,
-                    "name": device.name if hasattr(device, 'name') else None,
-                    "status": device.status if hasattr(device, 'status') else None,
-                    "location_id": device.location_id if hasattr(device, 'location_id') else None,
-                }
-                for device in devices
-            ]
+            return [_project(device, _DEVICE_FIELDS) for device in devices]
 
-        except Exception as e:
-            logger.error(f"Failed to list devices: {e}")
+        except _SQUARE_ERRORS as e:
+            logger.warning("Failed to list devices: %s", _error_summary(e))
             raise
 
-    def get_locations(self) -> list[dict[str, Any]]:
+    def get_locations(self) -> list[LocationInfo]:
         """
         Get all locations for the Square merchant.
 
@@ -354,21 +581,12 @@ class SquarePaymentProvider(PaymentProviderInterface):
 
             # Square SDK raises exceptions on error, so if we're here it succeeded
             # Get locations from result (could be an attribute or in a locations list)
-            locations = result.locations if hasattr(result, 'locations') else []
-
-            return [
-                {
-                    "location_id": loc.id if hasattr(loc, 'id') else None,
-                    "name": loc.name if hasattr(loc, 'name') else None,
-                    "address": loc.address if hasattr(loc, 'address') else None,
-                    "status": loc.status if hasattr(loc, 'status') else None,
-                    "merchant_id": loc.merchant_id if hasattr(loc, 'merchant_id') else None,
-                }
-                for loc in locations
-            ]
+            locations = getattr(result, "locations", None) or []
 
-        except Exception as e:
-            logger.error(f"Failed to get locations: {e}")
+            return [_project(loc, _LOCATION_FIELDS) for loc in locations]
+
+        except _SQUARE_ERRORS as e:
+            logger.warning("Failed to get locations: %s", _error_summary(e))
             raise
 
     def create_terminal_checkout(
@@ -398,8 +616,6 @@ class SquarePaymentProvider(PaymentProviderInterface):
         self.ensure_valid_token()
 
         try:
-            import secrets
-
             checkout_body = {
                 "amount_money": {
                     "amount": amount_cents,
@@ -407,15 +623,9 @@ class SquarePaymentProvider(PaymentProviderInterface):
                 },
                 "device_options": {
                     "device_id": device_id,
-                    "tip_settings": {
-                        "allow_tipping": True,
-                        "separate_tip_screen": True,
-                        "smart_tipping": True
-                    }
+                    "tip_settings": _TIP_SETTINGS,
                 },
-                "payment_options": {
-                    "autocomplete": True  # Automatically complete payment
-                }
+                "payment_options": _PAYMENT_OPTIONS,
             }
 
             if reference_id:
@@ -423,48 +633,32 @@ class SquarePaymentProvider(PaymentProviderInterface):
             if note:
                 checkout_body["note"] = note
 
-            # Log the checkout body being sent to Square
-            logger.info("=" * 80)
-            logger.info("Creating Square Terminal Checkout")
-            logger.info(f"Checkout Body: {checkout_body}")
-            logger.info("=" * 80)
+            logger.debug("Creating Square Terminal checkout: %s", checkout_body)
 
-            result = self.client.terminal.checkouts.create(
-                idempotency_key=secrets.token_urlsafe(32),
-                checkout=checkout_body
+            result = _call_with_backoff(
+                self.client.terminal.checkouts.create,
+                idempotency_key=_next_idempotency_key(),
+                checkout=checkout_body,
             )
 
-            # Log what Square returned
-            logger.info("Square returned checkout:")
-            if hasattr(result, 'checkout'):
-                checkout_obj = result.checkout
-                logger.info(f"  ID: {checkout_obj.id if hasattr(checkout_obj, 'id') else None}")
-                logger.info(f"  Status: {checkout_obj.status if hasattr(checkout_obj, 'status') else None}")
-                logger.info(f"  Amount Money: {checkout_obj.amount_money if hasattr(checkout_obj, 'amount_money') else None}")
-                logger.info(f"  Device Options: {checkout_obj.device_options if hasattr(checkout_obj, 'device_options') else None}")
-                if hasattr(checkout_obj, 'device_options') and checkout_obj.device_options:
-                    dev_opts = checkout_obj.device_options
-                    logger.info(f"    Tip Settings: {dev_opts.tip_settings if hasattr(dev_opts, 'tip_settings') else None}")
-            logger.info("=" * 80)
-
-            checkout = result.checkout if hasattr(result, 'checkout') else None
+            checkout = getattr(result, "checkout", None)
             if not checkout:
                 raise ValueError("No checkout returned from Square")
 
             return {
-                "checkout_id": checkout.id if hasattr(checkout, 'id') else None,
-                "status": checkout.status if hasattr(checkout, 'status') else None,
-                "amount_money": checkout.amount_money if hasattr(checkout, 'amount_money') else None,
+                "checkout_id": getattr(checkout, "id", None),
+                "status": getattr(checkout, "status", None),
+                "amount_money": getattr(checkout, "amount_money", None),
                 "device_id": device_id,
-                "created_at": checkout.created_at if hasattr(checkout, 'created_at') else None,
-                "reference_id": checkout.reference_id if hasattr(checkout, 'reference_id') else None,
+                "created_at": getattr(checkout, "created_at", None),
+                "reference_id": getattr(checkout, "reference_id", None),
             }
 
-        except Exception as e:
-            logger.error(f"Failed to create terminal checkout: {e}")
+        except _SQUARE_ERRORS as e:
+            logger.warning("Failed to create terminal checkout: %s", _error_summary(e))
             raise
 
-    def get_terminal_checkout(self, checkout_id: str) -> dict[str, Any]:
+    def get_terminal_checkout(self, checkout_id: str) -> TerminalCheckoutStatus:
         """
         Get the status of a terminal checkout.
 
@@ -477,54 +671,27 @@ class SquarePaymentProvider(PaymentProviderInterface):
         self.ensure_valid_token()
 
         try:
-            result = self.client.terminal.checkouts.get(checkout_id=checkout_id)
+            result = _call_with_backoff(
+                self.client.terminal.checkouts.get, checkout_id=checkout_id
+            )
 
-            checkout = result.checkout if hasattr(result, 'checkout') else None
+            checkout = getattr(result, "checkout", None)
             if not checkout:
                 raise ValueError("No checkout returned from Square")
 
-            # Log the entire checkout object
-            logger.info("=" * 80)
-            logger.info(f"GET TERMINAL CHECKOUT RESPONSE (ID: {checkout_id})")
-            logger.info("=" * 80)
-            logger.info(f"Full checkout object: {checkout}")
-            if hasattr(checkout, '__dict__'):
-                logger.info(f"Checkout attributes: {checkout.__dict__}")
-            logger.info(f"Status: {checkout.status if hasattr(checkout, 'status') else None}")
-            logger.info(f"Amount Money: {checkout.amount_money if hasattr(checkout, 'amount_money') else None}")
-            logger.info(f"Tip Money: {checkout.tip_money if hasattr(checkout, 'tip_money') else None}")
-            logger.info(f"Total Money: {checkout.total_money if hasattr(checkout, 'total_money') else None}")
-            logger.info(f"Payment IDs: {checkout.payment_ids if hasattr(checkout, 'payment_ids') else None}")
-            logger.info(f"Receipt URL: {checkout.receipt_url if hasattr(checkout, 'receipt_url') else None}")
-            logger.info("=" * 80)
+            logger.debug("Square terminal checkout %s: %s", checkout_id, checkout)
 
+            result_dict = _project(checkout, _CHECKOUT_FIELDS)
             # Extract payment ID from payment_ids list if available
-            payment_id = None
-            if hasattr(checkout, 'payment_ids') and checkout.payment_ids:
-                payment_id = checkout.payment_ids[0]
-                logger.info(f"Extracted payment_id from payment_ids: {payment_id}")
-            else:
-                logger.warning("No payment_ids found in checkout")
-
-            result_dict = {
-                "checkout_id": checkout.id if hasattr(checkout, 'id') else None,
-                "status": checkout.status if hasattr(checkout, 'status') else None,
-                "payment_id": payment_id,
-                "amount_money": checkout.amount_money if hasattr(checkout, 'amount_money') else None,
-                "tip_money": checkout.tip_money if hasattr(checkout, 'tip_money') else None,
-                "total_money": checkout.total_money if hasattr(checkout, 'total_money') else None,
-                "receipt_url": checkout.receipt_url if hasattr(checkout, 'receipt_url') else None,
-                "created_at": checkout.created_at if hasattr(checkout, 'created_at') else None,
-                "updated_at": checkout.updated_at if hasattr(checkout, 'updated_at') else None,
-            }
-            logger.info(f"Returning checkout dict with payment_id: {result_dict.get('payment_id')}")
+            payment_ids = getattr(checkout, "payment_ids", None)
+            result_dict["payment_id"] = payment_ids[0] if payment_ids else None
             return result_dict
 
-        except Exception as e:
-            logger.error(f"Failed to get terminal checkout: {e}")
+        except _SQUARE_ERRORS as e:
+            logger.warning("Failed to get terminal checkout: %s", _error_summary(e))
             raise
 
-    def get_payment(self, payment_id: str) -> dict[str, Any]:
+    def get_payment(self, payment_id: str) -> PaymentDetails:
         """
         Get payment details from Square Payments API.
 
@@ -540,38 +707,55 @@ class SquarePaymentProvider(PaymentProviderInterface):
         self.ensure_valid_token()
 
         try:
-            result = self.client.payments.get(payment_id=payment_id)
+            result = _call_with_backoff(self.client.payments.get, payment_id=payment_id)
 
-            payment = result.payment if hasattr(result, 'payment') else None
+            payment = getattr(result, "payment", None)
             if not payment:
                 raise ValueError("No payment returned from Square")
 
-            # Log the full payment object to see what's available
-            logger.info("=" * 80)
-            logger.info(f"GET PAYMENT RESPONSE (ID: {payment_id})")
-            logger.info("=" * 80)
-            logger.info(f"Full payment object: {payment}")
-            if hasattr(payment, '__dict__'):
-                logger.info(f"Payment attributes: {payment.__dict__}")
-            logger.info(f"Amount Money: {payment.amount_money if hasattr(payment, 'amount_money') else None}")
-            logger.info(f"Tip Money: {payment.tip_money if hasattr(payment, 'tip_money') else None}")
-            logger.info(f"Total Money: {payment.total_money if hasattr(payment, 'total_money') else None}")
-            logger.info(f"Status: {payment.status if hasattr(payment, 'status') else None}")
-            logger.info("=" * 80)
+            logger.debug("Square payment %s: %s", payment_id, payment)
 
-            return {
-                "payment_id": payment.id if hasattr(payment, 'id') else None,
-                "status": payment.status if hasattr(payment, 'status') else None,
-                "amount_money": payment.amount_money if hasattr(payment, 'amount_money') else None,
-                "tip_money": payment.tip_money if hasattr(payment, 'tip_money') else None,
-                "total_money": payment.total_money if hasattr(payment, 'total_money') else None,
-                "receipt_url": payment.receipt_url if hasattr(payment, 'receipt_url') else None,
-            }
+            return _project(payment, _PAYMENT_FIELDS)
 
-        except Exception as e:
-            logger.error(f"Failed to get payment: {e}")
+        except _SQUARE_ERRORS as e:
+            logger.warning("Failed to get payment: %s", _error_summary(e))
             raise
 
+    def get_checkout_with_payment(
+        self, checkout_id: str, payment_id: str | None = None
+    ) -> tuple[TerminalCheckoutStatus, PaymentDetails | None]:
+        """
+        Get a terminal checkout together with its payment details.
+
+        When the payment ID is already known (e.g. from an earlier poll) both
+        requests run concurrently; otherwise the payment is fetched after the
+        checkout reports it as completed. Payment lookup failures are logged
+        and yield None, since the checkout alone is enough to make progress.
+
+        Args:
+            checkout_id: Square checkout ID
+            payment_id: Square payment ID, if already known
+
+        Returns:
+            tuple: (checkout status, payment details or None)
+        """
+        # Refresh once up front rather than racing in both requests
+        self.ensure_valid_token()
+
+        payment_future = _fanout.submit(self.get_payment, payment_id) if payment_id else None
+        checkout = self.get_terminal_checkout(checkout_id)
+
+        payment = None
+        try:
+            if payment_future is not None and checkout.get("payment_id") == payment_id:
+                payment = payment_future.result()
+            elif checkout.get("status") == "COMPLETED" and checkout.get("payment_id"):
+                payment = self.get_payment(checkout["payment_id"])
+        except Exception as e:
+            logger.warning("Could not fetch payment details: %s", _error_summary(e))
+
+        return checkout, payment
+
     def cancel_terminal_checkout(self, checkout_id: str) -> dict[str, Any]:
         """
         Cancel a pending terminal checkout.
@@ -587,15 +771,15 @@ class SquarePaymentProvider(PaymentProviderInterface):
         try:
             result = self.client.terminal.checkouts.cancel(checkout_id=checkout_id)
 
-            checkout = result.checkout if hasattr(result, 'checkout') else None
+            checkout = getattr(result, "checkout", None)
             if not checkout:
                 raise ValueError("No checkout returned from Square")
 
             return {
-                "checkout_id": checkout.id if hasattr(checkout, 'id') else None,
-                "status": checkout.status if hasattr(checkout, 'status') else None,
+                "checkout_id": getattr(checkout, "id", None),
+                "status": getattr(checkout, "status", None),
             }
 
-        except Exception as e:
-            logger.error(f"Failed to cancel terminal checkout: {e}")
+        except _SQUARE_ERRORS as e:
+            logger.warning("Failed to cancel terminal checkout: %s", _error_summary(e))
             raise
@@ -1,10 +1,11 @@
 """Service category service layer"""
 
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from app.models.service_category import ServiceCategory
 from app.schemas.service_category import ServiceCategoryCreate
+from app.services.service_service import invalidate_services_cache
 
 
 class ServiceCategoryError(Exception):
@@ -15,15 +16,62 @@ class ServiceCategoryError(Exception):
 
 def create_service_category(db: Session, business_id: int, data: ServiceCategoryCreate) -> ServiceCategory:
     """Create a service category for a business."""
-    category = ServiceCategory(business_id=business_id, name=data.name)
+    # A duplicate name inserts nothing and returns no row, so the unique
+    # violation never aborts the transaction
+    stmt = (
+        pg_insert(ServiceCategory)
+        .values(business_id=business_id, name=data.name)
+        .on_conflict_do_nothing(
+            index_elements=[ServiceCategory.business_id, ServiceCategory.name]
+        )
+        .returning(ServiceCategory)
+    )
     try:
-        db.add(category)
+        category = db.scalars(stmt).one_or_none()
+        if category is None:
+            raise ServiceCategoryError("A category with that name already exists for this business")
         db.commit()
-        db.refresh(category)
+        # Cached service listings embed their categories
+        invalidate_services_cache(business_id)
         return category
-    except IntegrityError:
-        db.rollback()
-        raise ServiceCategoryError("A category with that name already exists for this business")
+    except ServiceCategoryError:
+        raise
     except Exception as e:
         db.rollback()
         raise ServiceCategoryError(f"Failed to create service category: {e}")
+
+
+def create_service_categories(db: Session, business_id: int, names: list[str]) -> list[ServiceCategory]:
+    """
+    Create several service categories for a business in one INSERT.
+
+    Names that already exist for the business are skipped.
+
+    Args:
+        db: Database session
+        business_id: Business ID
+        names: Category names to create
+
+    Returns:
+        list[ServiceCategory]: The newly created categories
+    """
+    names = list(dict.fromkeys(names))
+    if not names:
+        return []
+
+    stmt = (
+        pg_insert(ServiceCategory)
+        .values([{"business_id": business_id, "name": name} for name in names])
+        .on_conflict_do_nothing(
+            index_elements=[ServiceCategory.business_id, ServiceCategory.name]
+        )
+        .returning(ServiceCategory)
+    )
+    try:
+        categories = list(db.scalars(stmt).all())
+        db.commit()
+        invalidate_services_cache(business_id)
+        return categories
+    except Exception as e:
+        db.rollback()
+        raise ServiceCategoryError(f"Failed to create service categories: {e}")
@@ -1,18 +1,47 @@
 """Service service for CRUD operations"""
 
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_
-
-from app.models.service import Service
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import and_, delete, exists, func, insert, lambda_stmt, select, update
+
+from app.models.service import (
+    Service,
+    service_animal_breeds,
+    service_animal_types,
+    service_staff,
+)
 from app.models.business_user import BusinessUser
 from app.models.animal_type import AnimalType
 from app.models.animal_breed import AnimalBreed
 from app.models.service_category import ServiceCategory
-from app.schemas.service import ServiceCreate, ServiceUpdate
+from app.schemas.service import Service as ServiceSchema, ServiceCreate, ServiceUpdate
 from app.core.logger import get_logger
 
 logger = get_logger("app.services.service_service")
 
+# Per-process cache of each business's service listing. Entries hold validated
+# response schemas rather than ORM objects (which are bound to the request's
+# session). The listing embeds staff and category data, so service, staff and
+# category writes all call invalidate_services_cache for the business.
+SERVICES_CACHE_TTL_SECONDS = 60
+SERVICES_CACHE_MAX_SIZE = 1024
+
+_services_cache: OrderedDict[int, tuple[float, list[ServiceSchema]]] = OrderedDict()
+_services_cache_lock = threading.Lock()
+
+# ServiceUpdate fields written through the association tables, not the row
+_ASSOCIATION_FIELDS = {"staff_member_ids", "animal_type_ids", "animal_breed_ids"}
+
+
+def invalidate_services_cache(business_id: int) -> None:
+    """Drop the cached service listing of a business"""
+    with _services_cache_lock:
+        _services_cache.pop(business_id, None)
+
 
 class ServiceError(Exception):
     """Base exception for service errors"""
@@ -20,25 +49,51 @@ class ServiceError(Exception):
     pass
 
 
-def get_services(db: Session, business_id: int) -> list[Service]:
+def get_services(db: Session, business_id: int) -> list[ServiceSchema]:
     """
-    Get all services for a specific business with eager loading of relationships.
+    Get all services for a specific business, with their relationships.
+
+    Served from a short-lived per-business cache; on a miss the services are
+    loaded with eager loading of relationships.
 
     Args:
         db: Database session
         business_id: Business ID to filter by
 
     Returns:
-        List of services with loaded relationships
+        List of services as response schemas
     """
+    now = time.monotonic()
+    with _services_cache_lock:
+        cached = _services_cache.get(business_id)
+        if cached is not None and cached[0] > now:
+            _services_cache.move_to_end(business_id)
+            return list(cached[1])
+
+    services = [
+        ServiceSchema.model_validate(service)
+        for service in _load_services(db, business_id)
+    ]
+
+    with _services_cache_lock:
+        _services_cache[business_id] = (now + SERVICES_CACHE_TTL_SECONDS, services)
+        _services_cache.move_to_end(business_id)
+        while len(_services_cache) > SERVICES_CACHE_MAX_SIZE:
+            _services_cache.popitem(last=False)
+
+    return list(services)
+
+
+def _load_services(db: Session, business_id: int) -> list[Service]:
+    """Load all services for a business with eager loading of relationships"""
     return (
         db.query(Service)
         .filter(Service.business_id == business_id)
         .options(
             joinedload(Service.category),
-            joinedload(Service.staff_members),
-            joinedload(Service.animal_types),
-            joinedload(Service.animal_breeds),
+            selectinload(Service.staff_members),
+            selectinload(Service.animal_types),
+            selectinload(Service.animal_breeds),
         )
         .order_by(Service.name.asc())
         .all()
@@ -57,22 +112,19 @@ def get_service_by_id(db: Session, service_id: int, business_id: int) -> Service
     Returns:
         Service if found, None otherwise
     """
-    return (
-        db.query(Service)
-        .filter(
-            and_(
-                Service.id == service_id,
-                Service.business_id == business_id,
-            )
-        )
+    # lambda_stmt caches the statement and its compiled form; the IDs are
+    # bound per call
+    stmt = lambda_stmt(
+        lambda: select(Service)
+        .where(Service.id == service_id, Service.business_id == business_id)
         .options(
             joinedload(Service.category),
-            joinedload(Service.staff_members),
-            joinedload(Service.animal_types),
-            joinedload(Service.animal_breeds),
+            selectinload(Service.staff_members),
+            selectinload(Service.animal_types),
+            selectinload(Service.animal_breeds),
         )
-        .first()
     )
+    return db.scalars(stmt).first()
 
 
 def get_services_by_category(
@@ -99,15 +151,96 @@ def get_services_by_category(
         )
         .options(
             joinedload(Service.category),
-            joinedload(Service.staff_members),
-            joinedload(Service.animal_types),
-            joinedload(Service.animal_breeds),
+            selectinload(Service.staff_members),
+            selectinload(Service.animal_types),
+            selectinload(Service.animal_breeds),
         )
         .order_by(Service.name.asc())
         .all()
     )
 
 
+def _validate_references(
+    db: Session,
+    business_id: int,
+    category_id: int | None = None,
+    staff_member_ids: list[int] | None = None,
+    animal_type_ids: list[int] | None = None,
+    animal_breed_ids: list[int] | None = None,
+) -> None:
+    """
+    Check that all referenced rows exist, in a single round-trip.
+
+    Raises:
+        ServiceError: If the category or any staff member, animal type or
+            breed is missing (or belongs to another business)
+    """
+    checks = {}
+    if category_id is not None:
+        # EXISTS stops at the first matching index entry instead of counting
+        checks["categories"] = exists().where(
+            ServiceCategory.id == category_id,
+            ServiceCategory.business_id == business_id,
+        )
+    if staff_member_ids:
+        checks["staff"] = (
+            select(func.count())
+            .select_from(BusinessUser)
+            .where(
+                BusinessUser.id.in_(staff_member_ids),
+                BusinessUser.business_id == business_id,
+            )
+            .scalar_subquery()
+        )
+    if animal_type_ids:
+        checks["animal_types"] = (
+            select(func.count())
+            .select_from(AnimalType)
+            .where(AnimalType.id.in_(animal_type_ids))
+            .scalar_subquery()
+        )
+    if animal_breed_ids:
+        checks["animal_breeds"] = (
+            select(func.count())
+            .select_from(AnimalBreed)
+            .where(AnimalBreed.id.in_(animal_breed_ids))
+            .scalar_subquery()
+        )
+    if not checks:
+        return
+
+    found = db.execute(
+        select(*(check.label(name) for name, check in checks.items()))
+    ).one()._mapping
+
+    if "categories" in found and not found["categories"]:
+        raise ServiceError(
+            f"Service category {category_id} not found for business {business_id}"
+        )
+    if "staff" in found and found["staff"] != len(staff_member_ids):
+        raise ServiceError(
+            "One or more staff members not found or do not belong to this business"
+        )
+    if "animal_types" in found and found["animal_types"] != len(animal_type_ids):
+        raise ServiceError("One or more animal types not found")
+    if "animal_breeds" in found and found["animal_breeds"] != len(animal_breed_ids):
+        raise ServiceError("One or more animal breeds not found")
+
+
+def _link(db: Session, table, column: str, service_id: int, ids: list[int]) -> None:
+    """Insert association rows linking a service to already validated IDs"""
+    if ids:
+        db.execute(
+            insert(table), [{"service_id": service_id, column: id_} for id_ in ids]
+        )
+
+
+def _relink(db: Session, table, column: str, service_id: int, ids: list[int]) -> None:
+    """Replace a service's association rows with the given IDs"""
+    db.execute(delete(table).where(table.c.service_id == service_id))
+    _link(db, table, column, service_id, ids)
+
+
 def create_service(db: Session, service_data: ServiceCreate, business_id: int) -> Service:
     """
     Create a new service.
@@ -123,21 +256,24 @@ def create_service(db: Session, service_data: ServiceCreate, business_id: int) -
     Raises:
         ServiceError: If validation fails or database error occurs
     """
-    # Validate category exists and belongs to business
-    category = (
-        db.query(ServiceCategory)
-        .filter(
-            and_(
-                ServiceCategory.id == service_data.category_id,
-                ServiceCategory.business_id == business_id,
-            )
-        )
-        .first()
+    animal_type_ids = (
+        service_data.animal_type_ids
+        if not service_data.applies_to_all_animal_types
+        else None
+    )
+    animal_breed_ids = (
+        service_data.animal_breed_ids if not service_data.applies_to_all_breeds else None
+    )
+
+    # Validate category, staff members, animal types and breeds together
+    _validate_references(
+        db,
+        business_id,
+        category_id=service_data.category_id,
+        staff_member_ids=service_data.staff_member_ids,
+        animal_type_ids=animal_type_ids,
+        animal_breed_ids=animal_breed_ids,
     )
-    if not category:
-        raise ServiceError(
-            f"Service category {service_data.category_id} not found for business {business_id}"
-        )
 
     # Create service
     db_service = Service(
@@ -154,49 +290,16 @@ def create_service(db: Session, service_data: ServiceCreate, business_id: int) -
     )
 
     try:
-        # Add staff members if provided
-        if service_data.staff_member_ids:
-            staff_members = (
-                db.query(BusinessUser)
-                .filter(
-                    and_(
-                        BusinessUser.id.in_(service_data.staff_member_ids),
-                        BusinessUser.business_id == business_id,
-                    )
-                )
-                .all()
-            )
-            if len(staff_members) != len(service_data.staff_member_ids):
-                raise ServiceError(
-                    "One or more staff members not found or do not belong to this business"
-                )
-            db_service.staff_members = staff_members
-
-        # Add animal types if not applying to all
-        if not service_data.applies_to_all_animal_types and service_data.animal_type_ids:
-            animal_types = (
-                db.query(AnimalType)
-                .filter(AnimalType.id.in_(service_data.animal_type_ids))
-                .all()
-            )
-            if len(animal_types) != len(service_data.animal_type_ids):
-                raise ServiceError("One or more animal types not found")
-            db_service.animal_types = animal_types
-
-        # Add animal breeds if not applying to all
-        if not service_data.applies_to_all_breeds and service_data.animal_breed_ids:
-            animal_breeds = (
-                db.query(AnimalBreed)
-                .filter(AnimalBreed.id.in_(service_data.animal_breed_ids))
-                .all()
-            )
-            if len(animal_breeds) != len(service_data.animal_breed_ids):
-                raise ServiceError("One or more animal breeds not found")
-            db_service.animal_breeds = animal_breeds
-
         db.add(db_service)
+        db.flush()
+
+        # Link staff members, animal types and breeds (IDs validated above)
+        _link(db, service_staff, "business_user_id", db_service.id, service_data.staff_member_ids)
+        _link(db, service_animal_types, "animal_type_id", db_service.id, animal_type_ids)
+        _link(db, service_animal_breeds, "animal_breed_id", db_service.id, animal_breed_ids)
+
         db.commit()
-        db.refresh(db_service)
+        invalidate_services_cache(business_id)
         logger.info(
             f"Created service {db_service.id} for business {business_id}: {db_service.name}"
         )
@@ -234,103 +337,45 @@ def update_service(
             f"Service {service_id} not found for business {business_id}"
         )
 
-    try:
-        # Update basic fields if provided
-        if service_data.name is not None:
-            db_service.name = service_data.name
-
-        if service_data.description is not None:
-            db_service.description = service_data.description
-
-        if service_data.category_id is not None:
-            # Validate category exists and belongs to business
-            category = (
-                db.query(ServiceCategory)
-                .filter(
-                    and_(
-                        ServiceCategory.id == service_data.category_id,
-                        ServiceCategory.business_id == business_id,
-                    )
-                )
-                .first()
-            )
-            if not category:
-                raise ServiceError(
-                    f"Service category {service_data.category_id} not found for business {business_id}"
-                )
-            db_service.category_id = service_data.category_id
-
-        if service_data.duration_minutes is not None:
-            db_service.duration_minutes = service_data.duration_minutes
-
-        if service_data.price is not None:
-            db_service.price = service_data.price
-
-        if service_data.tax_rate is not None:
-            db_service.tax_rate = service_data.tax_rate
-
-        if service_data.is_active is not None:
-            db_service.is_active = service_data.is_active
+    # Validate a new category and any replacement associations together
+    _validate_references(
+        db,
+        business_id,
+        category_id=service_data.category_id,
+        staff_member_ids=service_data.staff_member_ids,
+        animal_type_ids=service_data.animal_type_ids,
+        animal_breed_ids=service_data.animal_breed_ids,
+    )
 
-        if service_data.applies_to_all_animal_types is not None:
-            db_service.applies_to_all_animal_types = (
-                service_data.applies_to_all_animal_types
+    try:
+        # Update the provided fields in a single UPDATE; the loaded instance
+        # is synchronized in place. updated_at is set here so it is applied to
+        # the instance too rather than expired and re-selected.
+        values = service_data.model_dump(exclude_none=True, exclude=_ASSOCIATION_FIELDS)
+        if values:
+            db.execute(
+                update(Service)
+                .where(Service.id == service_id, Service.business_id == business_id)
+                .values(**values, updated_at=datetime.now(timezone.utc))
             )
 
-        if service_data.applies_to_all_breeds is not None:
-            db_service.applies_to_all_breeds = service_data.applies_to_all_breeds
-
-        # Update staff members if provided
+        # Replace associations if provided (IDs validated above)
+        stale = ["category"] if service_data.category_id is not None else []
         if service_data.staff_member_ids is not None:
-            if service_data.staff_member_ids:
-                staff_members = (
-                    db.query(BusinessUser)
-                    .filter(
-                        and_(
-                            BusinessUser.id.in_(service_data.staff_member_ids),
-                            BusinessUser.business_id == business_id,
-                        )
-                    )
-                    .all()
-                )
-                if len(staff_members) != len(service_data.staff_member_ids):
-                    raise ServiceError(
-                        "One or more staff members not found or do not belong to this business"
-                    )
-                db_service.staff_members = staff_members
-            else:
-                db_service.staff_members = []
-
-        # Update animal types if provided
+            _relink(db, service_staff, "business_user_id", service_id, service_data.staff_member_ids)
+            stale.append("staff_members")
         if service_data.animal_type_ids is not None:
-            if service_data.animal_type_ids:
-                animal_types = (
-                    db.query(AnimalType)
-                    .filter(AnimalType.id.in_(service_data.animal_type_ids))
-                    .all()
-                )
-                if len(animal_types) != len(service_data.animal_type_ids):
-                    raise ServiceError("One or more animal types not found")
-                db_service.animal_types = animal_types
-            else:
-                db_service.animal_types = []
-
-        # Update animal breeds if provided
+            _relink(db, service_animal_types, "animal_type_id", service_id, service_data.animal_type_ids)
+            stale.append("animal_types")
         if service_data.animal_breed_ids is not None:
-            if service_data.animal_breed_ids:
-                animal_breeds = (
-                    db.query(AnimalBreed)
-                    .filter(AnimalBreed.id.in_(service_data.animal_breed_ids))
-                    .all()
-                )
-                if len(animal_breeds) != len(service_data.animal_breed_ids):
-                    raise ServiceError("One or more animal breeds not found")
-                db_service.animal_breeds = animal_breeds
-            else:
-                db_service.animal_breeds = []
+            _relink(db, service_animal_breeds, "animal_breed_id", service_id, service_data.animal_breed_ids)
+            stale.append("animal_breeds")
 
         db.commit()
-        db.refresh(db_service)
+        if stale:
+            # Reload the changed relationships on next access
+            db.expire(db_service, stale)
+        invalidate_services_cache(business_id)
         logger.info(f"Updated service {service_id}")
         return db_service
     except ServiceError:
@@ -366,6 +411,7 @@ def delete_service(db: Session, service_id: int, business_id: int) -> Service:
     try:
         db.delete(db_service)
         db.commit()
+        invalidate_services_cache(business_id)
         logger.info(f"Deleted service {service_id}")
         return db_service
     except Exception as e:
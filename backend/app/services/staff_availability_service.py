@@ -2,7 +2,8 @@
 
 from datetime import time
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, insert, lambda_stmt, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from app.models.staff_availability import StaffAvailability
 from app.models.business_user import BusinessUser
@@ -67,12 +68,12 @@ def get_staff_availability(
             f"Staff member {business_user_id} not found for business {business_id}"
         )
 
-    return (
-        db.query(StaffAvailability)
-        .filter(StaffAvailability.business_user_id == business_user_id)
+    stmt = lambda_stmt(
+        lambda: select(StaffAvailability)
+        .where(StaffAvailability.business_user_id == business_user_id)
         .order_by(StaffAvailability.day_of_week)
-        .all()
     )
+    return list(db.scalars(stmt).all())
 
 
 def create_default_availability(
@@ -88,22 +89,20 @@ def create_default_availability(
     Returns:
         List of created StaffAvailability entries
     """
-    entries = []
-    for day_data in DEFAULT_AVAILABILITY:
-        entry = StaffAvailability(
-            business_user_id=business_user_id,
-            day_of_week=day_data["day_of_week"],
-            is_available=day_data["is_available"],
-            start_time=day_data["start_time"],
-            end_time=day_data["end_time"],
-        )
-        db.add(entry)
-        entries.append(entry)
-
     try:
+        # One multi-row INSERT ... RETURNING creates and loads all 7 days
+        entries = list(
+            db.scalars(
+                insert(StaffAvailability).returning(
+                    StaffAvailability, sort_by_parameter_order=True
+                ),
+                [
+                    {"business_user_id": business_user_id, **day_data}
+                    for day_data in DEFAULT_AVAILABILITY
+                ],
+            )
+        )
         db.commit()
-        for entry in entries:
-            db.refresh(entry)
         logger.info(f"Created default availability for staff {business_user_id}")
         return entries
     except Exception as e:
@@ -159,42 +158,40 @@ def bulk_update_availability(
             "Must provide availability for all 7 days (0-6)"
         )
 
-    # Get existing entries indexed by day
-    existing = {
-        entry.day_of_week: entry
-        for entry in db.query(StaffAvailability)
-        .filter(StaffAvailability.business_user_id == business_user_id)
-        .all()
-    }
-
-    updated_entries = []
-
-    for day_data in availability_data.availability:
-        if day_data.day_of_week in existing:
-            # Update existing entry
-            entry = existing[day_data.day_of_week]
-            entry.is_available = day_data.is_available
-            entry.start_time = day_data.start_time
-            entry.end_time = day_data.end_time
-        else:
-            # Create new entry
-            entry = StaffAvailability(
-                business_user_id=business_user_id,
-                day_of_week=day_data.day_of_week,
-                is_available=day_data.is_available,
-                start_time=day_data.start_time,
-                end_time=day_data.end_time,
-            )
-            db.add(entry)
-
-        updated_entries.append(entry)
+    # One INSERT ... ON CONFLICT writes all 7 days, returning the stored rows
+    stmt = pg_insert(StaffAvailability).values(
+        [
+            {
+                "business_user_id": business_user_id,
+                "day_of_week": day_data.day_of_week,
+                "is_available": day_data.is_available,
+                "start_time": day_data.start_time,
+                "end_time": day_data.end_time,
+            }
+            for day_data in availability_data.availability
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_staff_day",
+        set_={
+            "is_available": stmt.excluded.is_available,
+            "start_time": stmt.excluded.start_time,
+            "end_time": stmt.excluded.end_time,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
 
     try:
+        # Days were validated as exactly 0-6, so each row goes to its own slot
+        updated_entries: list[StaffAvailability] = [None] * 7
+        for entry in db.scalars(
+            stmt.returning(StaffAvailability),
+            execution_options={"populate_existing": True},
+        ):
+            updated_entries[entry.day_of_week] = entry
         db.commit()
-        for entry in updated_entries:
-            db.refresh(entry)
         logger.info(f"Updated availability for staff {business_user_id}")
-        return sorted(updated_entries, key=lambda x: x.day_of_week)
+        return updated_entries
     except Exception as e:
         db.rollback()
         logger.error(f"Error updating availability: {e}")
@@ -1,8 +1,23 @@
 """Time block service for CRUD operations"""
 
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, time, timedelta, timezone
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, cast, Date
+from sqlalchemy import (
+    CompoundSelect,
+    Select,
+    and_,
+    bindparam,
+    delete,
+    or_,
+    exists,
+    lambda_stmt,
+    literal,
+    literal_column,
+    null,
+    select,
+    union_all,
+    update,
+)
 
 from app.models.time_block import TimeBlock
 from app.models.appointment import Appointment
@@ -19,6 +34,67 @@ class TimeBlockServiceError(Exception):
     pass
 
 
+def _conflict_statements(exclude_block: bool) -> tuple[Select, CompoundSelect]:
+    """
+    Build the overlap queries for appointments and time blocks.
+
+    All inputs are named bind parameters (business_id, staff_id, start_dt,
+    end_dt and optionally exclude_block_id), so each statement is built and
+    compiled once and every booking attempt only binds new values.
+
+    Returns:
+        Tuple of (EXISTS check, conflicting rows query)
+    """
+    # Overlap check: new_start < existing_end AND new_end > existing_start
+    appointment_filters = [
+        Appointment.business_id == bindparam("business_id"),
+        Appointment.staff_id == bindparam("staff_id"),
+        Appointment.appointment_datetime < bindparam("end_dt"),
+        Appointment.appointment_end > bindparam("start_dt"),
+    ]
+    block_filters = [
+        TimeBlock.business_id == bindparam("business_id"),
+        TimeBlock.staff_id == bindparam("staff_id"),
+        TimeBlock.block_datetime < bindparam("end_dt"),
+        TimeBlock.block_end > bindparam("start_dt"),
+    ]
+    if exclude_block:
+        block_filters.append(TimeBlock.id != bindparam("exclude_block_id"))
+
+    # EXISTS stops at the first overlapping row
+    any_conflict = select(
+        or_(
+            exists().where(*appointment_filters),
+            exists().where(*block_filters),
+        )
+    )
+
+    # Both sources in one round-trip as plain rows
+    appointments = select(
+        literal("appointment").label("kind"),
+        null().label("reason"),
+        Appointment.appointment_datetime.label("start"),
+        Appointment.duration_minutes,
+    ).where(*appointment_filters)
+    blocks = select(
+        literal("block"),
+        TimeBlock.reason,
+        TimeBlock.block_datetime,
+        TimeBlock.duration_minutes,
+    ).where(*block_filters)
+    conflicting = union_all(appointments, blocks).order_by(
+        literal_column("kind"), literal_column("start")
+    )
+
+    return any_conflict, conflicting
+
+
+# Overlap queries, keyed by whether a time block is excluded
+_CONFLICT_STATEMENTS = {
+    exclude_block: _conflict_statements(exclude_block) for exclude_block in (False, True)
+}
+
+
 def check_schedule_conflicts(
     db: Session,
     business_id: int,
@@ -33,52 +109,28 @@ def check_schedule_conflicts(
     Returns:
         Tuple of (has_conflict, conflict_message)
     """
-    end_datetime = start_datetime + timedelta(minutes=duration_minutes)
-    conflicts = []
-
-    # Check appointment conflicts
-    appointment_query = db.query(Appointment).filter(
-        and_(
-            Appointment.business_id == business_id,
-            Appointment.staff_id == staff_id,
-            # Overlap check: new_start < existing_end AND new_end > existing_start
-            Appointment.appointment_datetime < end_datetime,
-            Appointment.appointment_datetime
-            + Appointment.duration_minutes * timedelta(minutes=1)
-            > start_datetime,
-        )
-    )
+    any_conflict, conflicting = _CONFLICT_STATEMENTS[bool(exclude_block_id)]
+    params = {
+        "business_id": business_id,
+        "staff_id": staff_id,
+        "start_dt": start_datetime,
+        "end_dt": start_datetime + timedelta(minutes=duration_minutes),
+    }
+    if exclude_block_id:
+        params["exclude_block_id"] = exclude_block_id
 
-    conflicting_appointments = appointment_query.all()
-    for appt in conflicting_appointments:
-        appt_end = appt.appointment_datetime + timedelta(minutes=appt.duration_minutes)
-        conflicts.append(
-            f"Appointment at {appt.appointment_datetime.strftime('%I:%M %p')}-{appt_end.strftime('%I:%M %p')}"
-        )
+    # Common case: no conflict, so nothing is transferred unless there is a
+    # message to build
+    if not db.scalar(any_conflict, params):
+        return False, None
 
-    # Check block conflicts
-    block_query = db.query(TimeBlock).filter(
-        and_(
-            TimeBlock.business_id == business_id,
-            TimeBlock.staff_id == staff_id,
-            # Overlap check
-            TimeBlock.block_datetime < end_datetime,
-            TimeBlock.block_datetime
-            + TimeBlock.duration_minutes * timedelta(minutes=1)
-            > start_datetime,
-        )
-    )
+    rows = db.execute(conflicting, params).all()
 
-    if exclude_block_id:
-        block_query = block_query.filter(TimeBlock.id != exclude_block_id)
-
-    conflicting_blocks = block_query.all()
-    for block in conflicting_blocks:
-        block_end = block.block_datetime + timedelta(minutes=block.duration_minutes)
-        reason_label = BLOCK_REASON_LABELS.get(block.reason, block.reason)
-        conflicts.append(
-            f"{reason_label} at {block.block_datetime.strftime('%I:%M %p')}-{block_end.strftime('%I:%M %p')}"
-        )
+    conflicts = []
+    for kind, reason, start, duration in rows:
+        end = start + timedelta(minutes=duration)
+        label = "Appointment" if kind == "appointment" else BLOCK_REASON_LABELS.get(reason, reason)
+        conflicts.append(f"{label} at {start.strftime('%I:%M %p')}-{end.strftime('%I:%M %p')}")
 
     if conflicts:
         return True, f"Conflicts with: {', '.join(conflicts)}"
@@ -140,9 +192,10 @@ def create_time_block(
         description=description,
     )
 
+    # The INSERT returns the new ID and the generated block_end (eager
+    # defaults), so the committed instance is complete without a refresh
     db.add(time_block)
     db.commit()
-    db.refresh(time_block)
 
     logger.info(
         f"Created time block {time_block.id} for staff {staff_id} "
@@ -156,12 +209,18 @@ def get_daily_time_blocks(
     db: Session, business_id: int, target_date: date
 ) -> list[TimeBlock]:
     """Get all time blocks for a specific date"""
+    # Half-open range instead of casting each row to a date, so the
+    # block_datetime index applies. Naive bounds are read in the session
+    # time zone, the same one the date cast used.
+    day_start = datetime.combine(target_date, time.min)
+    day_end = day_start + timedelta(days=1)
     return (
         db.query(TimeBlock)
         .filter(
             and_(
                 TimeBlock.business_id == business_id,
-                cast(TimeBlock.block_datetime, Date) == target_date,
+                TimeBlock.block_datetime >= day_start,
+                TimeBlock.block_datetime < day_end,
             )
         )
         .order_by(TimeBlock.block_datetime)
@@ -173,16 +232,12 @@ def get_time_block_by_id(
     db: Session, business_id: int, block_id: int
 ) -> TimeBlock:
     """Get a single time block by ID"""
-    block = (
-        db.query(TimeBlock)
-        .filter(
-            and_(
-                TimeBlock.id == block_id,
-                TimeBlock.business_id == business_id,
-            )
+    stmt = lambda_stmt(
+        lambda: select(TimeBlock).where(
+            TimeBlock.id == block_id, TimeBlock.business_id == business_id
         )
-        .first()
     )
+    block = db.scalars(stmt).first()
 
     if not block:
         raise TimeBlockServiceError(
@@ -207,17 +262,43 @@ def update_time_block(
     Returns:
         Tuple of (TimeBlock, has_conflict, conflict_message)
     """
-    block = get_time_block_by_id(db, business_id, block_id)
-
-    # Determine new values for conflict check
-    new_datetime = block_datetime if block_datetime is not None else block.block_datetime
-    new_duration = (
-        duration_minutes if duration_minutes is not None else block.duration_minutes
-    )
+    values = {
+        name: value
+        for name, value in (
+            ("block_datetime", block_datetime),
+            ("duration_minutes", duration_minutes),
+            ("reason", reason),
+            ("description", description),
+        )
+        if value is not None
+    }
+
+    if values:
+        # UPDATE ... RETURNING both checks ownership and loads the new row
+        block = db.scalars(
+            update(TimeBlock)
+            .where(TimeBlock.id == block_id, TimeBlock.business_id == business_id)
+            .values(**values, updated_at=datetime.now(timezone.utc))
+            .returning(TimeBlock),
+            execution_options={"populate_existing": True},
+        ).one_or_none()
+        if block is None:
+            raise TimeBlockServiceError(
+                f"Time block {block_id} not found for business {business_id}"
+            )
+    else:
+        block = get_time_block_by_id(db, business_id, block_id)
 
-    # Check for conflicts (excluding this block)
+    # Check the new slot for conflicts (excluding this block); they are a
+    # warning only, so checking after the write in the same transaction is
+    # equivalent
     has_conflict, conflict_message = check_schedule_conflicts(
-        db, business_id, block.staff_id, new_datetime, new_duration, exclude_block_id=block_id
+        db,
+        business_id,
+        block.staff_id,
+        block.block_datetime,
+        block.duration_minutes,
+        exclude_block_id=block_id,
     )
 
     if has_conflict:
@@ -225,18 +306,7 @@ def update_time_block(
             f"Updating time block {block_id} with conflict: {conflict_message}"
         )
 
-    # Update fields
-    if block_datetime is not None:
-        block.block_datetime = block_datetime
-    if duration_minutes is not None:
-        block.duration_minutes = duration_minutes
-    if reason is not None:
-        block.reason = reason
-    if description is not None:
-        block.description = description
-
     db.commit()
-    db.refresh(block)
 
     logger.info(f"Updated time block {block.id} for business {business_id}")
 
@@ -245,9 +315,16 @@ def update_time_block(
 
 def delete_time_block(db: Session, business_id: int, block_id: int) -> bool:
     """Delete a time block"""
-    block = get_time_block_by_id(db, business_id, block_id)
+    deleted_id = db.scalar(
+        delete(TimeBlock)
+        .where(TimeBlock.id == block_id, TimeBlock.business_id == business_id)
+        .returning(TimeBlock.id)
+    )
+    if deleted_id is None:
+        raise TimeBlockServiceError(
+            f"Time block {block_id} not found for business {business_id}"
+        )
 
-    db.delete(block)
     db.commit()
 
     logger.info(f"Deleted time block {block_id} for business {business_id}")
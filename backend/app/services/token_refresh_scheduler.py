@@ -0,0 +1,227 @@
+"""
+Background OAuth token refresh for payment providers.
+
+Access tokens are refreshed PAYMENT_TOKEN_REFRESH_LEAD_SECONDS before they
+expire by a single daemon thread, so request handlers only ever compare
+timestamps and never pay for the OAuth round-trip themselves. Refreshed
+credentials are persisted back to the payment configuration.
+
+Every PAYMENT_TOKEN_REFRESH_SWEEP_SECONDS the worker also re-reads the stored
+expiry of all active configurations, picking up configurations created or
+refreshed by other processes.
+"""
+
+import heapq
+import threading
+import time
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.encryption import decrypt_data_cached
+from app.core.logger import get_logger
+from app.models.payment_configuration import PaymentConfiguration
+from app.services.payment_provider_interface import token_expires_at, token_refresh_lock
+
+logger = get_logger("app.services.token_refresh")
+
+# Delay before retrying a refresh that failed
+REFRESH_RETRY_SECONDS = 60
+
+# Queue key of the periodic sweep (configuration IDs start at 1)
+_SWEEP = 0
+
+
+class TokenRefreshScheduler:
+    """Schedules provider token refreshes ahead of expiry on a worker thread"""
+
+    def __init__(self) -> None:
+        self._queue: list[tuple[float, int]] = []  # (run_at, config_id) heap
+        self._scheduled: dict[int, float] = {}  # config_id -> current run_at
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+
+    def start(self) -> None:
+        """Start the worker thread and schedule all active configurations"""
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(
+                target=self._run, name="payment-token-refresh", daemon=True
+            )
+            self._thread.start()
+
+        # The first sweep loads all active configurations on the worker thread
+        self._schedule_at(_SWEEP, time.time())
+
+    def stop(self) -> None:
+        """Stop the worker thread"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=5)
+
+    def schedule(self, config_id: int, expires_at: datetime | None) -> None:
+        """
+        Schedule a refresh for a configuration ahead of its token expiry.
+
+        Re-scheduling the same expiry is a no-op; a new expiry replaces the
+        previous entry.
+
+        Args:
+            config_id: Payment configuration ID
+            expires_at: Access token expiry (ignored if unknown)
+        """
+        if expires_at is None:
+            return
+        self._schedule_at(
+            config_id, expires_at.timestamp() - settings.PAYMENT_TOKEN_REFRESH_LEAD_SECONDS
+        )
+
+    def _schedule_at(self, config_id: int, run_at: float) -> None:
+        with self._condition:
+            if self._scheduled.get(config_id) == run_at:
+                return
+            self._scheduled[config_id] = run_at
+            heapq.heappush(self._queue, (run_at, config_id))
+            self._condition.notify()
+
+    def _next_due(self) -> int | None:
+        """Block until a refresh is due; returns its config ID (None when stopping)"""
+        with self._condition:
+            while not self._stopping:
+                if not self._queue:
+                    self._condition.wait()
+                    continue
+                run_at, config_id = self._queue[0]
+                delay = run_at - time.time()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                heapq.heappop(self._queue)
+                # Skip entries superseded by a later schedule() call
+                if self._scheduled.get(config_id) == run_at:
+                    del self._scheduled[config_id]
+                    return config_id
+            return None
+
+    def _run(self) -> None:
+        while (config_id := self._next_due()) is not None:
+            if config_id == _SWEEP:
+                self._sweep()
+            else:
+                self._refresh(config_id)
+
+    def _sweep(self) -> None:
+        """Schedule every active configuration from its stored token expiry"""
+        db = SessionLocal()
+        try:
+            configs = (
+                db.query(PaymentConfiguration)
+                .filter(PaymentConfiguration.is_active == True)
+                .all()
+            )
+            for config in configs:
+                credentials = decrypt_data_cached(config.encrypted_credentials)
+                self.schedule(config.id, token_expires_at(credentials))
+        except Exception as e:
+            logger.error(f"Failed to load payment configurations for token refresh: {e}")
+        finally:
+            db.close()
+            self._schedule_at(_SWEEP, time.time() + settings.PAYMENT_TOKEN_REFRESH_SWEEP_SECONDS)
+
+    def refresh_credentials(self, config_id: int) -> dict[str, Any]:
+        """
+        Refresh a configuration's access token now unless the stored one is fresh.
+
+        The configuration is re-read under the merchant's refresh lock and a
+        row lock, so a token another thread or process already rotated is
+        reused instead of spending a stale refresh token. New credentials are
+        persisted before the locks are released.
+
+        Args:
+            config_id: Payment configuration ID
+
+        Returns:
+            dict: Current stored credentials
+
+        Raises:
+            ValueError: If the configuration is missing, inactive or has no
+                refresh token
+        """
+        # Imported here: payment_service enqueues into this scheduler
+        from app.services.payment_service import (
+            create_or_update_payment_configuration,
+            get_provider_for_configuration,
+        )
+
+        db = SessionLocal()
+        try:
+            config = db.get(PaymentConfiguration, config_id)
+            if not config or not config.is_active:
+                raise ValueError(f"Payment configuration {config_id} is not active")
+
+            credentials = decrypt_data_cached(config.encrypted_credentials)
+            merchant_id = credentials.get("merchant_id") or f"config:{config_id}"
+            with token_refresh_lock(merchant_id):
+                # Lock the row so other worker processes wait, then re-read:
+                # if one of them already refreshed, just follow its new expiry
+                config = db.scalars(
+                    select(PaymentConfiguration)
+                    .where(PaymentConfiguration.id == config_id)
+                    .with_for_update()
+                    .execution_options(populate_existing=True)
+                ).one()
+                credentials = decrypt_data_cached(config.encrypted_credentials)
+                expires_at = token_expires_at(credentials)
+                if expires_at is not None and expires_at.timestamp() - time.time() > (
+                    settings.PAYMENT_TOKEN_REFRESH_LEAD_SECONDS
+                ):
+                    db.rollback()
+                    self.schedule(config_id, expires_at)
+                    return credentials
+
+                refresh_token = credentials.get("refresh_token")
+                if not refresh_token:
+                    db.rollback()
+                    raise ValueError(f"Payment configuration {config_id} has no refresh token")
+
+                provider = get_provider_for_configuration(config)
+                new_credentials = provider.refresh_access_token(refresh_token)
+                credentials = {**credentials, **new_credentials}
+
+                # Bumps updated_at, which also rolls the cached provider
+                # instance; the commit releases the row lock
+                updated = create_or_update_payment_configuration(
+                    db,
+                    config.business_id,
+                    config.provider,
+                    credentials,
+                    config.settings,
+                )
+            self.schedule(updated.id, token_expires_at(new_credentials))
+            logger.info(f"Refreshed access token for payment configuration {config_id}")
+            return credentials
+        finally:
+            db.close()
+
+    def _refresh(self, config_id: int) -> None:
+        """Refresh one configuration's token, retrying later on failure"""
+        try:
+            self.refresh_credentials(config_id)
+        except ValueError as e:
+            # Nothing a retry would fix
+            logger.warning(f"Skipping token refresh: {e}")
+        except Exception as e:
+            logger.error(f"Failed to refresh token for payment configuration {config_id}: {e}")
+            self._schedule_at(config_id, time.time() + REFRESH_RETRY_SECONDS)
+
+
+token_refresh_scheduler = TokenRefreshScheduler()
@@ -1,8 +1,7 @@
-import json
-import time
-import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 
+import anyio.to_thread
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
@@ -10,10 +9,27 @@ from fastapi.responses import JSONResponse
 
 from app.core.config import settings
 from app.core.logger import get_logger, setup_logging
+from app.core.query_detection import NPlusOneDetectionMiddleware, install_query_detection
+from app.core.request_logging import DebugLoggingMiddleware, dumps_json, loads_json
+from app.services.token_refresh_scheduler import token_refresh_scheduler
 from app.api import auth, business_users, agreements, animal_types, service_categories, services, customers, pets, appointments, time_blocks, payments
 
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Size the sync-endpoint threadpool and run background token refresh"""
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = settings.THREADPOOL_MAX_WORKERS
+
+    if settings.PAYMENT_TOKEN_REFRESH_ENABLED:
+        token_refresh_scheduler.start()
+    try:
+        yield
+    finally:
+        token_refresh_scheduler.stop()
+
+
 def create_app() -> FastAPI:
     """Create and configure FastAPI application"""
 
@@ -28,6 +44,7 @@ def create_app() -> FastAPI:
         description="API for the Groomify platform",
         version="0.1.0",
         redirect_slashes=False,  # Disable automatic trailing slash redirects (307)
+        lifespan=lifespan,
     )
 
     @app.exception_handler(RequestValidationError)
@@ -55,16 +72,16 @@ def create_app() -> FastAPI:
         try:
             body = exc.body
             if body:
-                if isinstance(body, bytes):
-                    body = body.decode()
-                if isinstance(body, str):
+                if isinstance(body, (bytes, str)):
                     try:
-                        body_json = json.loads(body)
+                        body_json = loads_json(body)
                         logger.error(
                             "Request Body (causing validation error):"
                         )
-                        logger.error(json.dumps(body_json, indent=2))
-                    except json.JSONDecodeError:
+                        logger.error(dumps_json(body_json))
+                    except ValueError:
+                        if isinstance(body, bytes):
+                            body = body.decode(errors="replace")
                         logger.error(f"Request Body (raw): {body}")
                 else:
                     logger.error(f"Request Body: {body}")
@@ -104,119 +121,17 @@ def create_app() -> FastAPI:
         },
     )
 
+    # N+1 query detection middleware (development and test runs)
+    if settings.NPLUSONE_DETECTION:
+        install_query_detection()
+        app.add_middleware(NPlusOneDetectionMiddleware)
+        logger.info(
+            f"N+1 query detection enabled (threshold={settings.NPLUSONE_THRESHOLD}, raise={settings.NPLUSONE_RAISE})"
+        )
+
     # Consolidated request/response logging middleware (only when DEBUG=true)
     if settings.DEBUG:
-        debug_logger = get_logger("app.debug")
-
-        @app.middleware("http")
-        async def consolidated_request_logging_middleware(request: Request, call_next):
-            """Consolidated middleware for request and response logging when DEBUG=true"""
-            request_id = str(uuid.uuid4())
-
-            # Log request start
-            debug_logger.info("=" * 80)
-            debug_logger.info(f"[{request_id}] REQUEST START: {request.method} {request.url.path}")
-            debug_logger.info(f"[{request_id}] Full URL: {request.url}")
-            debug_logger.info(f"[{request_id}] Client: {request.client.host if request.client else 'Unknown'}")
-
-            # Log headers (excluding sensitive ones)
-            sensitive_headers = {"authorization", "cookie", "x-api-key"}
-            headers_to_log = {
-                k: v for k, v in request.headers.items()
-                if k.lower() not in sensitive_headers
-            }
-
-            # Log authorization header presence (but not the token value)
-            auth_header = request.headers.get("authorization", "")
-            if auth_header:
-                debug_logger.info(f"[{request_id}] Authorization: Bearer <token present>")
-            else:
-                debug_logger.info(f"[{request_id}] Authorization: <missing>")
-
-            if headers_to_log:
-                debug_logger.info(f"[{request_id}] Headers: {json.dumps(headers_to_log, indent=2)}")
-
-            # Log query parameters
-            if request.query_params:
-                debug_logger.info(f"[{request_id}] Query Params: {dict(request.query_params)}")
-
-            # Log request body for POST, PUT, PATCH (consume body only once)
-            if request.method in ["POST", "PUT", "PATCH"]:
-                try:
-                    body = await request.body()
-
-                    if body:
-                        # Try to parse as JSON for pretty printing
-                        try:
-                            body_json = json.loads(body.decode())
-                            debug_logger.info(f"[{request_id}] Request Body (JSON):\n{json.dumps(body_json, indent=2)}")
-                        except (json.JSONDecodeError, UnicodeDecodeError):
-                            # If not JSON or can't decode, log as string (limit to 1000 chars)
-                            debug_logger.info(f"[{request_id}] Request Body (raw): {body[:1000]}...")
-                    else:
-                        debug_logger.info(f"[{request_id}] Request Body: <empty>")
-
-                    # Cache body so downstream `await request.body()` returns it
-                    request._body = body
-                except Exception as e:
-                    debug_logger.error(f"[{request_id}] Failed to read request body: {e}")
-
-            debug_logger.info(f"[{request_id}] " + "-" * 60)
-
-            # Process request and measure time
-            start_time = time.time()
-
-            try:
-                response = await call_next(request)
-                process_time = time.time() - start_time
-
-                # Log response details
-                debug_logger.info(f"[{request_id}] RESPONSE")
-                debug_logger.info(f"[{request_id}] Status Code: {response.status_code}")
-                debug_logger.info(f"[{request_id}] Process Time: {process_time:.4f}s")
-                debug_logger.info(f"[{request_id}] Response Headers: {dict(response.headers)}")
-
-                # Log response body for error status codes
-                if response.status_code >= 400:
-                    try:
-                        if hasattr(response, "body"):
-                            response_body = response.body
-                            if response_body:
-                                try:
-                                    body_json = json.loads(response_body.decode())
-                                    debug_logger.info(
-                                        f"[{request_id}] Response Body: {json.dumps(body_json, indent=2)}"
-                                    )
-                                except Exception:
-                                    debug_logger.info(
-                                        f"[{request_id}] Response Body: {response_body.decode()}"
-                                    )
-                            else:
-                                debug_logger.info(f"[{request_id}] Response Body: <empty>")
-                        else:
-                            # Try to read streaming response for payment-terms errors
-                            if response.status_code == 400 and "payment-terms" in str(request.url):
-                                try:
-                                    body_bytes = b""
-                                    async for chunk in response.body_iterator:
-                                        body_bytes += chunk
-                                    debug_logger.error(f"[{request_id}] 400 ERROR Response Body: {body_bytes.decode()}")
-                                except Exception as stream_err:
-                                    debug_logger.error(f"[{request_id}] Could not read streaming body: {stream_err}")
-                            debug_logger.info(f"[{request_id}] Response Body: <streaming response>")
-                    except Exception as e:
-                        debug_logger.error(f"[{request_id}] Could not read response body: {e}")
-
-                debug_logger.info(f"[{request_id}] REQUEST END")
-                debug_logger.info("=" * 80)
-
-                return response
-            except Exception as e:
-                process_time = time.time() - start_time
-                debug_logger.error(f"[{request_id}] REQUEST FAILED after {process_time:.4f}s: {e}")
-                debug_logger.info("=" * 80)
-                raise
-
+        app.add_middleware(DebugLoggingMiddleware)
         logger.info("Consolidated request logging middleware enabled (DEBUG=true)")
     else:
         logger.info("Debug request logging disabled (DEBUG=false)")
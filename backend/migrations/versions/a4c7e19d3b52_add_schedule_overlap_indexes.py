@@ -0,0 +1,29 @@
+"""add_schedule_overlap_indexes
+
+Revision ID: a4c7e19d3b52
+Revises: f3b8d52c6a19
+Create Date: 2026-10-16 13:05:42.771093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c7e19d3b52'
+down_revision: Union[str, Sequence[str], None] = 'f3b8d52c6a19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_appointments_business_staff_datetime', 'appointments', ['business_id', 'staff_id', 'appointment_datetime'], unique=False, postgresql_include=['duration_minutes'])
+    op.create_index('ix_time_blocks_business_staff_datetime', 'time_blocks', ['business_id', 'staff_id', 'block_datetime'], unique=False, postgresql_include=['duration_minutes'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_time_blocks_business_staff_datetime', table_name='time_blocks')
+    op.drop_index('ix_appointments_business_staff_datetime', table_name='appointments')
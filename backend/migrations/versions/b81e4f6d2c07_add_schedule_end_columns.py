@@ -0,0 +1,34 @@
+"""add_schedule_end_columns
+
+Revision ID: b81e4f6d2c07
+Revises: a4c7e19d3b52
+Create Date: 2026-10-16 15:21:08.436512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81e4f6d2c07'
+down_revision: Union[str, Sequence[str], None] = 'a4c7e19d3b52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('appointments', sa.Column('appointment_end', sa.DateTime(timezone=True), sa.Computed("((appointment_datetime AT TIME ZONE 'UTC') + duration_minutes * interval '1 minute') AT TIME ZONE 'UTC'", persisted=True), nullable=True))
+    op.add_column('time_blocks', sa.Column('block_end', sa.DateTime(timezone=True), sa.Computed("((block_datetime AT TIME ZONE 'UTC') + duration_minutes * interval '1 minute') AT TIME ZONE 'UTC'", persisted=True), nullable=True))
+    op.create_index('ix_appointments_business_staff_end', 'appointments', ['business_id', 'staff_id', 'appointment_end'], unique=False)
+    op.create_index('ix_time_blocks_business_staff_end', 'time_blocks', ['business_id', 'staff_id', 'block_end'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_time_blocks_business_staff_end', table_name='time_blocks')
+    op.drop_index('ix_appointments_business_staff_end', table_name='appointments')
+    op.drop_column('time_blocks', 'block_end')
+    op.drop_column('appointments', 'appointment_end')
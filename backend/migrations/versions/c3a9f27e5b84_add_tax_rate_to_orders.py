@@ -0,0 +1,36 @@
+"""add_tax_rate_to_orders
+
+Revision ID: c3a9f27e5b84
+Revises: b7e41c2d9a10
+Create Date: 2026-10-16 10:03:18.274915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a9f27e5b84'
+down_revision: Union[str, Sequence[str], None] = 'b7e41c2d9a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('orders', sa.Column('tax_rate', sa.Numeric(precision=5, scale=4), nullable=False, server_default='0'))
+    # Backfill from the tax charged on the discounted subtotal
+    op.execute(
+        """
+        UPDATE orders
+        SET tax_rate = LEAST(ROUND(tax / (subtotal - discount_amount), 4), 1)
+        WHERE subtotal - discount_amount > 0
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('orders', 'tax_rate')
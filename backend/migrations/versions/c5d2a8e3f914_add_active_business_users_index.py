@@ -0,0 +1,28 @@
+"""add_active_business_users_index
+
+Revision ID: c5d2a8e3f914
+Revises: b81e4f6d2c07
+Create Date: 2026-10-16 15:48:27.190354
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d2a8e3f914'
+down_revision: Union[str, Sequence[str], None] = 'b81e4f6d2c07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_business_users_active', 'business_users', ['id', 'business_id'], unique=False, postgresql_where=sa.text('is_active'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_business_users_active', table_name='business_users', postgresql_where=sa.text('is_active'))
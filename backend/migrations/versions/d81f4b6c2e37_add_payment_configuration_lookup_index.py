@@ -0,0 +1,27 @@
+"""add_payment_configuration_lookup_index
+
+Revision ID: d81f4b6c2e37
+Revises: c3a9f27e5b84
+Create Date: 2026-10-16 11:27:05.618342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81f4b6c2e37'
+down_revision: Union[str, Sequence[str], None] = 'c3a9f27e5b84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_payment_configurations_business_provider_active', 'payment_configurations', ['business_id', 'provider', 'is_active'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_payment_configurations_business_provider_active', table_name='payment_configurations')
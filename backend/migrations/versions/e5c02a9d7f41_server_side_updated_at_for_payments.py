@@ -0,0 +1,30 @@
+"""server_side_updated_at_for_payments
+
+Revision ID: e5c02a9d7f41
+Revises: d81f4b6c2e37
+Create Date: 2026-10-16 11:58:44.902176
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5c02a9d7f41'
+down_revision: Union[str, Sequence[str], None] = 'd81f4b6c2e37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('payment_configurations', 'updated_at', server_default=sa.text('now()'))
+    op.alter_column('payment_devices', 'updated_at', server_default=sa.text('now()'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('payment_devices', 'updated_at', server_default=None)
+    op.alter_column('payment_configurations', 'updated_at', server_default=None)
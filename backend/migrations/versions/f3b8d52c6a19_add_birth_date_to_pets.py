@@ -0,0 +1,28 @@
+"""add_birth_date_to_pets
+
+Revision ID: f3b8d52c6a19
+Revises: e5c02a9d7f41
+Create Date: 2026-10-16 12:41:07.318524
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8d52c6a19'
+down_revision: Union[str, Sequence[str], None] = 'e5c02a9d7f41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('pets', sa.Column('birth_date', sa.Date(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('pets', 'birth_date')
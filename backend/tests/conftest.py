@@ -1,6 +1,13 @@
 """Pytest configuration and fixtures"""
 
 import os
+
+# Fail requests that repeat a query past the N+1 threshold (read at app import)
+os.environ.setdefault("NPLUSONE_DETECTION", "true")
+os.environ.setdefault("NPLUSONE_RAISE", "true")
+# No background OAuth refresh against the application database
+os.environ.setdefault("PAYMENT_TOKEN_REFRESH_ENABLED", "false")
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine, text
@@ -19,7 +26,20 @@ TEST_DATABASE_URL = os.getenv(
 )
 
 engine = create_engine(TEST_DATABASE_URL, echo=False)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_password_verification():
+    """Start each test with no cached verifications or login attempts"""
+    from app.core import security
+
+    with security._verify_lock:
+        security._verify_cache.clear()
+        security._verify_attempts.clear()
+    yield
 
 
 @pytest.fixture(scope="function")
@@ -69,3 +89,23 @@ def client(db_session):
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def auth_headers(client):
+    """Register a business and return the owner's authorization header"""
+    client.post(
+        "/api/auth/register",
+        json={
+            "business_name": "Pawsome Groomers",
+            "first_name": "John",
+            "last_name": "Doe",
+            "email": "john@example.com",
+            "password": "SecurePass123",
+        },
+    )
+    response = client.post(
+        "/api/auth/login",
+        json={"email": "john@example.com", "password": "SecurePass123"},
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
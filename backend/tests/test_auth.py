@@ -447,3 +447,59 @@ class TestLogin:
         data = response.json()
         assert data["role"] == "staff"
         assert data["email"] == "staff@example.com"
+
+    def test_login_repeated_attempts(self, client):
+        """Test that repeated logins reuse cached verification without changing outcomes"""
+        registration_data = {
+            "business_name": "Pawsome Groomers",
+            "first_name": "John",
+            "last_name": "Doe",
+            "email": "john@example.com",
+            "password": "SecurePass123",
+        }
+        client.post("/api/auth/register", json=registration_data)
+
+        login_data = {
+            "email": "john@example.com",
+            "password": "SecurePass123",
+        }
+        for _ in range(3):
+            response = client.post("/api/auth/login", json=login_data)
+            assert response.status_code == status.HTTP_200_OK
+
+        # A wrong password must still be rejected after successful attempts
+        login_data["password"] = "WrongPassword123"
+        for _ in range(2):
+            response = client.post("/api/auth/login", json=login_data)
+            assert response.status_code == status.HTTP_401_UNAUTHORIZED
+            assert "Invalid email or password" in response.json()["detail"]
+
+    def test_login_rate_limited_after_repeated_misses(self, client):
+        """Test that the login past the verification budget gets 429, not 401"""
+        from app.core.security import VERIFY_RATE_LIMIT_ATTEMPTS
+
+        registration_data = {
+            "business_name": "Pawsome Groomers",
+            "first_name": "John",
+            "last_name": "Doe",
+            "email": "john@example.com",
+            "password": "SecurePass123",
+        }
+        client.post("/api/auth/register", json=registration_data)
+
+        # Distinct wrong passwords are all cache misses
+        for attempt in range(VERIFY_RATE_LIMIT_ATTEMPTS):
+            response = client.post(
+                "/api/auth/login",
+                json={"email": "john@example.com", "password": f"WrongPassword{attempt}"},
+            )
+            assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        response = client.post(
+            "/api/auth/login",
+            json={"email": "john@example.com", "password": "SecurePass123"},
+        )
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert "Too many login attempts" in response.json()["detail"]
+        assert 0 < int(response.headers["Retry-After"]) <= 60
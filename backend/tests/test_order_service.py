@@ -0,0 +1,69 @@
+"""Tests for order service"""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import order_service
+from app.services.order_service import OrderService
+
+
+def _freeze_day(monkeypatch, year: int, month: int, day: int) -> None:
+    """Make generate_order_number see the given UTC day"""
+    frozen = time.struct_time((year, month, day, 12, 0, 0, 0, 1, 0))
+    monkeypatch.setattr(order_service, "time", SimpleNamespace(gmtime=lambda: frozen))
+
+
+@pytest.fixture
+def second_business(client, auth_headers):
+    """Register a second business (ID 2) after the first"""
+    client.post(
+        "/api/auth/register",
+        json={
+            "business_name": "Happy Tails",
+            "first_name": "Jane",
+            "last_name": "Roe",
+            "email": "jane@example.com",
+            "password": "SecurePass123",
+        },
+    )
+    return 2
+
+
+class TestGenerateOrderNumber:
+    """Test cases for per-business daily order numbers"""
+
+    def test_same_day_numbers_are_consecutive(self, db_session, auth_headers, monkeypatch):
+        """Test that orders on the same day get consecutive sequence numbers"""
+        _freeze_day(monkeypatch, 2025, 12, 5)
+
+        first = OrderService.generate_order_number(db_session, 1)
+        second = OrderService.generate_order_number(db_session, 1)
+
+        assert first == "ORD-20251205-1-00001"
+        assert second == "ORD-20251205-1-00002"
+
+    def test_other_business_starts_at_one(
+        self, db_session, auth_headers, second_business, monkeypatch
+    ):
+        """Test that each business has its own sequence"""
+        _freeze_day(monkeypatch, 2025, 12, 5)
+
+        OrderService.generate_order_number(db_session, 1)
+        OrderService.generate_order_number(db_session, 1)
+
+        assert (
+            OrderService.generate_order_number(db_session, second_business)
+            == "ORD-20251205-2-00001"
+        )
+
+    def test_next_day_starts_at_one(self, db_session, auth_headers, monkeypatch):
+        """Test that the sequence restarts on a new UTC day"""
+        _freeze_day(monkeypatch, 2025, 12, 5)
+        OrderService.generate_order_number(db_session, 1)
+        OrderService.generate_order_number(db_session, 1)
+
+        _freeze_day(monkeypatch, 2025, 12, 6)
+
+        assert OrderService.generate_order_number(db_session, 1) == "ORD-20251206-1-00001"
@@ -0,0 +1,162 @@
+"""Tests for payment processing service"""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.services import payment_processing_service
+from app.services.payment_processing_service import PaymentProcessingService
+
+
+class StubTerminalProvider:
+    """Provider double reporting a fixed Square checkout status"""
+
+    def __init__(self, status: str):
+        self.status = status
+        self.calls = 0
+
+    def get_checkout_with_payment(self, checkout_id: str, payment_id: str | None = None):
+        self.calls += 1
+        checkout = {
+            "checkout_id": checkout_id,
+            "status": self.status,
+            "payment_id": "sq-payment-1" if self.status == "COMPLETED" else None,
+            "amount_money": None,
+            "tip_money": None,
+            "total_money": None,
+            "receipt_url": None,
+            "created_at": None,
+            "updated_at": None,
+        }
+        return checkout, None
+
+
+@pytest.fixture(autouse=True)
+def clear_poll_cache():
+    """Start each test with no cached in-flight checkouts"""
+    payment_processing_service._poll_cache.clear()
+    yield
+    payment_processing_service._poll_cache.clear()
+
+
+@pytest.fixture
+def terminal_payment(db_session, auth_headers):
+    """A pending terminal payment on an active device of business 1"""
+    from app.models.order import Order
+    from app.models.payment import Payment
+    from app.models.payment_configuration import PaymentConfiguration, PaymentProvider
+    from app.models.payment_device import PaymentDevice
+
+    config = PaymentConfiguration(
+        business_id=1, provider=PaymentProvider.SQUARE, encrypted_credentials="unused"
+    )
+    db_session.add(config)
+    db_session.flush()
+    device = PaymentDevice(
+        business_id=1,
+        configuration_id=config.id,
+        device_id="device-1",
+        device_name="Front desk",
+        location_id="location-1",
+        paired_at=datetime.now(timezone.utc),
+    )
+    order = Order(
+        business_id=1,
+        order_number="ORD-20251205-1-00001",
+        subtotal=Decimal("50.00"),
+        tax=Decimal("0.00"),
+        tax_rate=Decimal("0.00"),
+        tip=Decimal("0.00"),
+        total=Decimal("50.00"),
+        discount_amount=Decimal("0.00"),
+        service_title="Bath",
+        groomer_name="John Doe",
+        pet_name="Rex",
+        payment_status="pending",
+    )
+    db_session.add_all([device, order])
+    db_session.flush()
+    payment = Payment(
+        business_id=1,
+        order_id=order.id,
+        payment_device_id=device.id,
+        amount=order.total,
+        status="pending",
+        square_checkout_id="checkout-1",
+        payment_metadata={"square_status": "PENDING"},
+    )
+    db_session.add(payment)
+    db_session.commit()
+    return payment
+
+
+def _use_provider(monkeypatch, provider: StubTerminalProvider) -> None:
+    """Serve the stub for any configuration on the database path"""
+    monkeypatch.setattr(
+        payment_processing_service,
+        "get_provider_for_configuration",
+        lambda config: provider,
+    )
+
+
+class TestPollPaymentStatusCache:
+    """Test cases for the in-process poll cache of pending checkouts"""
+
+    def test_unchanged_status_skips_database(self, terminal_payment):
+        """Test that a poll with no Square status change is answered from the cache"""
+        provider = StubTerminalProvider("PENDING")
+        PaymentProcessingService._cache_in_flight(
+            terminal_payment, provider, "PENDING", "pending"
+        )
+
+        # No session: any database access would fail
+        result = PaymentProcessingService.poll_payment_status(None, terminal_payment.id, 1)
+
+        assert provider.calls == 1
+        assert result["status"] == "pending"
+        assert result["square_status"] == "PENDING"
+        assert result["payment_status"] == "pending"
+
+    def test_status_change_records_transition(
+        self, db_session, terminal_payment, monkeypatch
+    ):
+        """Test that a changed Square status is written and the cache refreshed"""
+        provider = StubTerminalProvider("IN_PROGRESS")
+        _use_provider(monkeypatch, provider)
+        PaymentProcessingService._cache_in_flight(
+            terminal_payment, provider, "PENDING", "pending"
+        )
+
+        result = PaymentProcessingService.poll_payment_status(
+            db_session, terminal_payment.id, 1
+        )
+
+        assert provider.calls == 1
+        assert result["square_status"] == "IN_PROGRESS"
+        db_session.refresh(terminal_payment)
+        assert terminal_payment.payment_metadata["square_status"] == "IN_PROGRESS"
+        cached = PaymentProcessingService._get_in_flight(terminal_payment.id, 1)
+        assert cached is not None
+        assert cached.square_status == "IN_PROGRESS"
+
+    @pytest.mark.parametrize(
+        "square_status, payment_status",
+        [("COMPLETED", "completed"), ("CANCELED", "cancelled")],
+    )
+    def test_finished_payment_drops_cache_entry(
+        self, db_session, terminal_payment, monkeypatch, square_status, payment_status
+    ):
+        """Test that a completed or cancelled checkout leaves the cache"""
+        provider = StubTerminalProvider(square_status)
+        _use_provider(monkeypatch, provider)
+        PaymentProcessingService._cache_in_flight(
+            terminal_payment, provider, "PENDING", "pending"
+        )
+
+        result = PaymentProcessingService.poll_payment_status(
+            db_session, terminal_payment.id, 1
+        )
+
+        assert result["status"] == payment_status
+        assert terminal_payment.id not in payment_processing_service._poll_cache
@@ -0,0 +1,115 @@
+"""Tests for pet endpoints"""
+
+from datetime import date
+
+import pytest
+from fastapi import status
+
+
+@pytest.fixture
+def customer(db_session, auth_headers):
+    """A customer of the registered business"""
+    from app.models.customer import Customer
+
+    customer = Customer(business_id=1, account_name="Smith Family")
+    db_session.add(customer)
+    db_session.commit()
+    return customer
+
+
+@pytest.fixture
+def pet(db_session, customer):
+    """A pet with a known birth date, owned by the registered business"""
+    from app.models.pet import Pet
+
+    pet = Pet(
+        customer_id=customer.id,
+        business_id=1,
+        name="Rex",
+        species="Dog",
+        birth_date=date(2020, 1, 15),
+    )
+    db_session.add(pet)
+    db_session.commit()
+    return pet
+
+
+class TestUpdatePet:
+    """Test cases for the pet update endpoint"""
+
+    def test_update_pet_round_trip_keeps_birth_date(self, client, auth_headers, pet):
+        """Test that sending back a fetched pet unchanged keeps its birth date"""
+        fetched = client.get(f"/api/pets/{pet.id}", headers=auth_headers).json()
+        update_data = {
+            field: fetched[field]
+            for field in ("name", "species", "breed", "birth_date", "age", "weight")
+        }
+
+        response = client.put(f"/api/pets/{pet.id}", json=update_data, headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["birth_date"] == "2020-01-15"
+        assert data["age"] == fetched["age"]
+
+    def test_update_pet_derived_age_keeps_birth_date(self, client, auth_headers, pet):
+        """Test that echoing back only the derived age does not clear the birth date"""
+        fetched = client.get(f"/api/pets/{pet.id}", headers=auth_headers).json()
+
+        response = client.put(
+            f"/api/pets/{pet.id}", json={"age": fetched["age"]}, headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["birth_date"] == "2020-01-15"
+
+    def test_update_pet_new_age_replaces_birth_date(self, client, auth_headers, pet):
+        """Test that an age contradicting the birth date replaces it"""
+        response = client.put(
+            f"/api/pets/{pet.id}", json={"age": 1}, headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["birth_date"] is None
+        assert data["age"] == 1
+
+
+class TestAddPetsBulk:
+    """Test cases for the bulk pet creation endpoint"""
+
+    def test_add_pets_bulk_success(self, client, db_session, auth_headers, customer):
+        """Test that all pets are created in request order"""
+        from app.models.animal_type import AnimalType
+
+        dog = AnimalType(name="Dog")
+        db_session.add(dog)
+        db_session.commit()
+
+        response = client.post(
+            f"/api/customers/{customer.id}/pets/bulk",
+            json=[
+                {"name": "Rex", "animal_type_id": dog.id, "birth_date": "2020-01-15"},
+                {"name": "Fido", "animal_type_id": dog.id},
+            ],
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        data = response.json()
+        assert [pet["name"] for pet in data] == ["Rex", "Fido"]
+        assert all(pet["species"] == "Dog" for pet in data)
+        assert all(pet["customer_id"] == customer.id for pet in data)
+        assert data[0]["birth_date"] == "2020-01-15"
+
+    def test_add_pets_bulk_unknown_animal_type(self, client, auth_headers, customer):
+        """Test that an unknown animal type creates nothing"""
+        response = client.post(
+            f"/api/customers/{customer.id}/pets/bulk",
+            json=[{"name": "Rex", "animal_type_id": 999}],
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        pets = client.get(f"/api/customers/{customer.id}/pets", headers=auth_headers)
+        assert pets.json() == []
@@ -0,0 +1,90 @@
+"""Tests for N+1 query detection"""
+
+import pytest
+from fastapi import FastAPI, status
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.query_detection import (
+    NPlusOneDetectionMiddleware,
+    NPlusOneError,
+    install_query_detection,
+)
+
+
+@pytest.fixture
+def pets(db_session, auth_headers):
+    """One pet per customer, so loading each pet's customer repeats a query"""
+    from app.models.customer import Customer
+    from app.models.pet import Pet
+
+    for i in range(settings.NPLUSONE_THRESHOLD):
+        customer = Customer(business_id=1, account_name=f"Family {i}")
+        db_session.add(customer)
+        db_session.flush()
+        db_session.add(
+            Pet(customer_id=customer.id, business_id=1, name=f"Pet {i}", species="Dog")
+        )
+    db_session.commit()
+
+
+@pytest.fixture
+def detection_client(db_session, monkeypatch):
+    """A client for a bare app whose routes lazy-load pet customers"""
+    from app.models.pet import Pet
+
+    monkeypatch.setattr(settings, "NPLUSONE_RAISE", True)
+    install_query_detection()
+
+    def customer_names():
+        # Start from an empty identity map so every access is a lazy load
+        db_session.expunge_all()
+        for pet in db_session.scalars(select(Pet)).all():
+            yield pet.customer.account_name + "\n"
+
+    detection_app = FastAPI()
+    detection_app.add_middleware(NPlusOneDetectionMiddleware)
+
+    @detection_app.get("/names")
+    def list_names():
+        return list(customer_names())
+
+    @detection_app.get("/names/stream")
+    def stream_names():
+        return StreamingResponse(customer_names(), media_type="text/plain")
+
+    @detection_app.get("/names/broken")
+    def broken_names():
+        list(customer_names())
+        raise RuntimeError("endpoint failed")
+
+    with TestClient(detection_app) as test_client:
+        yield test_client
+
+
+class TestNPlusOneDetection:
+    """Test cases for the N+1 detection middleware"""
+
+    def test_repeated_lazy_load_raises(self, detection_client, pets):
+        """Test that a lazy load repeated inside a request fails it"""
+        with pytest.raises(NPlusOneError):
+            detection_client.get("/names")
+
+    def test_repeated_lazy_load_in_streamed_body_raises(self, detection_client, pets):
+        """Test that queries run while streaming the response are counted"""
+        with pytest.raises(NPlusOneError):
+            detection_client.get("/names/stream")
+
+    def test_endpoint_error_is_not_replaced(self, detection_client, pets):
+        """Test that the endpoint's own exception wins over the N+1 report"""
+        with pytest.raises(RuntimeError, match="endpoint failed"):
+            detection_client.get("/names/broken")
+
+    def test_queries_below_threshold_pass(self, detection_client, db_session, auth_headers):
+        """Test that a request without repeated queries succeeds"""
+        response = detection_client.get("/names")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == []
@@ -0,0 +1,46 @@
+"""Tests for service category endpoints"""
+
+from fastapi import status
+
+
+class TestCreateServiceCategoriesBulk:
+    """Test cases for the bulk service category endpoint"""
+
+    def test_create_categories_bulk_success(self, client, auth_headers):
+        """Test that every new name is created once"""
+        response = client.post(
+            "/api/service-categories/bulk",
+            json={"names": ["Bath", "Haircut", "Bath"]},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        data = response.json()
+        assert sorted(category["name"] for category in data) == ["Bath", "Haircut"]
+        assert all(category["business_id"] == 1 for category in data)
+
+    def test_create_categories_bulk_skips_existing(self, client, auth_headers):
+        """Test that names the business already has are skipped"""
+        client.post(
+            "/api/service-categories", json={"name": "Bath"}, headers=auth_headers
+        )
+
+        response = client.post(
+            "/api/service-categories/bulk",
+            json={"names": ["Bath", "Nail Trim"]},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert [category["name"] for category in response.json()] == ["Nail Trim"]
+
+        listing = client.get("/api/service-categories", headers=auth_headers)
+        assert [category["name"] for category in listing.json()] == ["Bath", "Nail Trim"]
+
+    def test_create_categories_bulk_empty_list(self, client, auth_headers):
+        """Test that an empty name list is rejected"""
+        response = client.post(
+            "/api/service-categories/bulk", json={"names": []}, headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY